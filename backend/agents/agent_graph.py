@@ -1,57 +1,206 @@
-from langgraph.graph import StateGraph, END
+import asyncio
+import threading
+import uuid
 from .agent_state import AgentState, create_initial_state
 from .vehicle_agents import VehicleAgents
+from .pipeline_profiles import PIPELINE_PROFILES, DEFAULT_PROFILE
+from .checkpoints import get_checkpoint_store
+from .skip_policies import enabled_policies, policies_after, exit_node_name, make_early_exit_node
+from services.profiler import thread_scope
+from services.tracing import span
 
-def create_agent_workflow():
+# Node order per pipeline profile; each node runs after the one before it
+PROFILE_NODES = {
+    "full": [
+        ("vision_agent", VehicleAgents.vision_agent),
+        ("measurement_agent", VehicleAgents.measurement_agent),
+        ("location_agent", VehicleAgents.location_agent),
+        ("bridge_query_agent", VehicleAgents.bridge_query_agent),
+        ("weather_agent", VehicleAgents.weather_agent),
+        ("risk_assessment_agent", VehicleAgents.risk_assessment_agent),
+        ("recommendation_agent", VehicleAgents.recommendation_agent)
+    ],
+    # Spec lookup + one multimodal call, deterministic risk and recommendations
+    "fast": [
+        ("vision_measurement_agent", VehicleAgents.vision_measurement_agent),
+        ("location_agent", VehicleAgents.location_agent),
+        ("bridge_query_agent", VehicleAgents.bridge_query_agent),
+        ("weather_agent", VehicleAgents.weather_agent),
+        ("risk_assessment_agent", VehicleAgents.rule_based_risk_agent),
+        ("recommendation_agent", VehicleAgents.rule_based_recommendation_agent)
+    ]
+}
+
+# Nodes that make an LLM call, for counting the calls an early exit avoids
+PROFILE_LLM_NODES = {
+    "full": {"vision_agent", "measurement_agent", "risk_assessment_agent", "recommendation_agent"},
+    "fast": {"vision_measurement_agent"}
+}
+
+def checkpointed(node_name: str, agent, can_fail: bool = True):
+    """
+    Wrap an agent so the state it produces is checkpointed under the run ID
+    A node counts as failed if it added to state["errors"]; early exits never
+    do, since re-running them can't change the outcome
+    """
+    def run(state: AgentState) -> AgentState:
+        errors_before = len(state.get("errors") or [])
+        with span(node_name, "agent") as agent_span:
+            state = agent(state)
+            failed = can_fail and len(state.get("errors") or []) > errors_before
+            if agent_span is not None and failed:
+                agent_span.error = state["errors"][-1]
+            if state.get("run_id"):
+                with span("checkpoint", "serialization"):
+                    get_checkpoint_store().save(state["run_id"], node_name, state, failed)
+        return state
+    return run
+
+def create_agent_workflow(profile: str = DEFAULT_PROFILE, start_at: str = None, skip_policies: tuple = None):
     """
-    Create LangGraph workflow with all agents
+    Create LangGraph workflow with all agents for a pipeline profile
+    start_at: begin at this node (resuming a run) instead of the first
+    skip_policies: early-exit policy names (default: AGENT_SKIP_POLICIES)
     """
-    
+    # Deferred: langgraph is the heaviest import in the app
+    from langgraph.graph import StateGraph, END
+
+    nodes = PROFILE_NODES[profile]
+    if start_at:
+        nodes = nodes[[name for name, _ in nodes].index(start_at):]
+
     # Create graph
     workflow = StateGraph(AgentState)
-    
+
     # Add nodes (agents)
-    workflow.add_node("vision_agent", VehicleAgents.vision_agent)
-    workflow.add_node("measurement_agent", VehicleAgents.measurement_agent)
-    workflow.add_node("location_agent", VehicleAgents.location_agent)
-    workflow.add_node("bridge_query_agent", VehicleAgents.bridge_query_agent)
-    workflow.add_node("weather_agent", VehicleAgents.weather_agent)
-    workflow.add_node("risk_assessment_agent", VehicleAgents.risk_assessment_agent)
-    workflow.add_node("recommendation_agent", VehicleAgents.recommendation_agent)
-    
-    # Define edges (workflow)
-    workflow.set_entry_point("vision_agent")
-    workflow.add_edge("vision_agent", "measurement_agent")
-    workflow.add_edge("measurement_agent", "location_agent")
-    workflow.add_edge("location_agent", "bridge_query_agent")
-    workflow.add_edge("bridge_query_agent", "weather_agent")
-    workflow.add_edge("weather_agent", "risk_assessment_agent")
-    workflow.add_edge("risk_assessment_agent", "recommendation_agent")
-    workflow.add_edge("recommendation_agent", END)
-    
+    for name, agent in nodes:
+        workflow.add_node(name, checkpointed(name, agent))
+
+    # Define edges (workflow): straight through, unless a skip policy routes
+    # to its early-exit node when the state can't support the rest of the run
+    if skip_policies is None:
+        skip_policies = enabled_policies()
+    names = [name for name, _ in nodes]
+    workflow.set_entry_point(names[0])
+    for i, name in enumerate(names):
+        next_node = names[i + 1] if i + 1 < len(names) else END
+        policies = policies_after(name, skip_policies)
+        if not policies:
+            workflow.add_edge(name, next_node)
+            continue
+
+        routes = {"continue": next_node}
+        for policy in policies:
+            exit_name = exit_node_name(policy)
+            skipped = names[i + 1:]
+            llm_calls = len(PROFILE_LLM_NODES[profile].intersection(skipped))
+            early_exit = make_early_exit_node(policy, skipped, llm_calls)
+            workflow.add_node(exit_name, checkpointed(exit_name, early_exit, can_fail=False))
+            workflow.add_edge(exit_name, END)
+            routes[exit_name] = exit_name
+
+        def route(state: AgentState, policies=policies) -> str:
+            for policy in policies:
+                if policy.condition(state):
+                    return exit_node_name(policy)
+            return "continue"
+
+        workflow.add_conditional_edges(name, route, routes)
+
     # Compile
     app = workflow.compile()
-    
+
     return app
 
-# Create singleton instance
-agent_workflow = create_agent_workflow()
+# Compiled workflows keyed by (profile, start node, skip policies), built on
+# first use or by warmup_agent_workflows()
+_agent_workflows = {}
+_compile_lock = threading.Lock()
+
+def get_agent_workflow(profile: str = DEFAULT_PROFILE, start_at: str = None):
+    """
+    Compiled workflow for a profile, compiled on first use
+    """
+    skip_policies = enabled_policies()
+    key = (profile, start_at, skip_policies)
+    workflow = _agent_workflows.get(key)
+    if workflow is None:
+        with _compile_lock:
+            if key not in _agent_workflows:
+                _agent_workflows[key] = create_agent_workflow(profile, start_at, skip_policies)
+            workflow = _agent_workflows[key]
+    return workflow
+
+def warmup_agent_workflows() -> None:
+    """
+    Compile every profile's workflow ahead of the first request
+    """
+    for name in PIPELINE_PROFILES:
+        get_agent_workflow(name)
+
+def invoke_agent_workflow(
+    image_base64: str = None,
+    image_media_type: str = "image/jpeg",
+    user_location: str = "Boston, MA",
+    profile: str = DEFAULT_PROFILE,
+    vehicle_description: str = None,
+    narrative: bool = False,
+    destination: str = None
+) -> AgentState:
+    """
+    Run the complete agent workflow (blocking), checkpointing after each node
+    """
+    initial_state = create_initial_state(
+        image_base64=image_base64,
+        image_media_type=image_media_type,
+        user_location=user_location,
+        pipeline_profile=profile,
+        vehicle_description=vehicle_description,
+        run_id=uuid.uuid4().hex,
+        narrative=narrative,
+        destination=destination
+    )
+    with thread_scope():
+        get_checkpoint_store().start_run(initial_state["run_id"], profile, initial_state)
+        return get_agent_workflow(profile).invoke(initial_state)
+
+def resume_agent_workflow(run_id: str) -> AgentState:
+    """
+    Re-run a checkpointed run from its first failed node (blocking)
+    Raises KeyError for an unknown or expired run, ValueError if no node failed
+    """
+    resume = get_checkpoint_store().resume_point(run_id)
+    if resume is None:
+        raise KeyError(run_id)
+    if resume["node"] is None:
+        raise ValueError(f"Run {run_id} has no failed node to resume from")
+
+    state = resume["state"]
+    state["resumed_from"] = resume["node"]
+    with thread_scope():
+        return get_agent_workflow(resume["profile"], start_at=resume["node"]).invoke(state)
 
 async def run_agent_workflow(
     image_base64: str = None,
     image_media_type: str = "image/jpeg",
-    user_location: str = "Boston, MA"
+    user_location: str = "Boston, MA",
+    profile: str = DEFAULT_PROFILE,
+    vehicle_description: str = None,
+    narrative: bool = False,
+    destination: str = None
 ) -> AgentState:
     """
     Run the complete agent workflow
+    The graph's agents block on LLM and HTTP calls, so it runs in a worker
+    thread to keep the event loop serving other requests.
     """
-    initial_state = create_initial_state(
+    return await asyncio.to_thread(
+        invoke_agent_workflow,
         image_base64=image_base64,
         image_media_type=image_media_type,
-        user_location=user_location
+        user_location=user_location,
+        profile=profile,
+        vehicle_description=vehicle_description,
+        narrative=narrative,
+        destination=destination
     )
-    
-    # Run the workflow
-    final_state = agent_workflow.invoke(initial_state)
-    
-    return final_state
\ No newline at end of file
@@ -9,6 +9,14 @@ class AgentState(TypedDict, total=False):
     image_base64: Optional[str]
     image_media_type: Optional[str]
     user_location: Optional[str]
+    destination: Optional[str]
+    vehicle_description: Optional[str]
+    pipeline_profile: Optional[str]
+    narrative: Optional[bool]
+
+    # Checkpointing
+    run_id: Optional[str]
+    resumed_from: Optional[str]
     
     # Vision Agent Output
     vehicle_detected: Optional[bool]
@@ -38,6 +46,7 @@ class AgentState(TypedDict, total=False):
     weather_conditions: Optional[Dict[str, Any]]
     clearance_adjustment: Optional[int]
     weather_warnings: Optional[List[str]]
+    route_weather: Optional[Dict[str, Any]]
     
     # Risk Assessment Agent Output
     dangerous_bridges: Optional[List[Dict[str, Any]]]
@@ -50,6 +59,10 @@ class AgentState(TypedDict, total=False):
     safe_routes: Optional[List[str]]
     avoid_routes: Optional[List[str]]
     final_report: Optional[str]
+
+    # Early exit (skip policies)
+    early_exit_reason: Optional[str]
+    skipped_nodes: Optional[List[str]]
     
     # Agent Execution Log
     agent_log: List[Dict[str, Any]]
@@ -60,13 +73,23 @@ class AgentState(TypedDict, total=False):
 def create_initial_state(
     image_base64: str = None,
     image_media_type: str = None,
-    user_location: str = None
+    user_location: str = None,
+    pipeline_profile: str = None,
+    vehicle_description: str = None,
+    run_id: str = None,
+    narrative: bool = False,
+    destination: str = None
 ) -> AgentState:
     """Create initial state for agent graph"""
     return {
         "image_base64": image_base64,
         "image_media_type": image_media_type,
         "user_location": user_location,
+        "pipeline_profile": pipeline_profile,
+        "vehicle_description": vehicle_description,
+        "run_id": run_id,
+        "narrative": narrative,
+        "destination": destination,
         "agent_log": [],
         "errors": []
     }
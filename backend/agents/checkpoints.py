@@ -0,0 +1,146 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Checkpoints only need to outlive a client's retry window, so the default
+# lives in the temp dir rather than next to the committed data files
+CHECKPOINT_DB_PATH = os.getenv(
+    "CHECKPOINT_DB_PATH",
+    os.path.join(tempfile.gettempdir(), "bridgeguardian_checkpoints.db")
+)
+CHECKPOINT_TTL_SECONDS = float(os.getenv("CHECKPOINT_TTL_SECONDS", "86400"))
+
+# Stored once per run instead of in every node's checkpoint
+IMAGE_KEY = "image_base64"
+
+class CheckpointStore:
+    """
+    SQLite store of AgentState snapshots, one row per completed node, keyed by run ID
+    """
+
+    def __init__(self, db_path: str = CHECKPOINT_DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                profile TEXT NOT NULL,
+                image_base64 TEXT,
+                initial_state TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                resume_count INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                run_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                node TEXT NOT NULL,
+                failed INTEGER NOT NULL,
+                state TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (run_id, seq)
+            );
+            CREATE INDEX IF NOT EXISTS runs_created_at ON runs (created_at);
+        """)
+        self._conn.commit()
+
+    @staticmethod
+    def _dump_state(state: Dict[str, Any]) -> str:
+        return json.dumps({k: v for k, v in state.items() if k != IMAGE_KEY}, default=str)
+
+    def start_run(self, run_id: str, profile: str, initial_state: Dict[str, Any]) -> None:
+        """Record a new run with its input image and initial state"""
+        now = time.time()
+        with self._lock:
+            self._purge_expired(now)
+            self._conn.execute(
+                "INSERT INTO runs (run_id, profile, image_base64, initial_state, created_at) VALUES (?, ?, ?, ?, ?)",
+                (run_id, profile, initial_state.get(IMAGE_KEY), self._dump_state(initial_state), now)
+            )
+            self._conn.commit()
+
+    def save(self, run_id: str, node: str, state: Dict[str, Any], failed: bool) -> None:
+        """Checkpoint the state a node produced"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO checkpoints (run_id, seq, node, failed, state, created_at) "
+                "VALUES (?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM checkpoints WHERE run_id = ?), ?, ?, ?, ?)",
+                (run_id, run_id, node, int(failed), self._dump_state(state), time.time())
+            )
+            self._conn.commit()
+
+    def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Run metadata and node checkpoints (without state bodies), or None"""
+        with self._lock:
+            run = self._conn.execute(
+                "SELECT profile, created_at, resume_count FROM runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+            if not run:
+                return None
+            rows = self._conn.execute(
+                "SELECT seq, node, failed, created_at FROM checkpoints WHERE run_id = ? ORDER BY seq", (run_id,)
+            ).fetchall()
+        return {
+            "run_id": run_id,
+            "profile": run[0],
+            "created_at": run[1],
+            "resume_count": run[2],
+            "checkpoints": [
+                {"seq": seq, "node": node, "failed": bool(failed), "created_at": created_at}
+                for seq, node, failed, created_at in rows
+            ]
+        }
+
+    def resume_point(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """
+        First failed node of a run and the state it started from
+        Drops the failed node's checkpoint and everything after it, since they are about to re-run.
+        Returns None if the run is unknown; "node" is None if nothing failed.
+        """
+        with self._lock:
+            run = self._conn.execute(
+                "SELECT profile, image_base64, initial_state FROM runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+            if not run:
+                return None
+            profile, image_base64, initial_state = run
+            failed = self._conn.execute(
+                "SELECT seq, node FROM checkpoints WHERE run_id = ? AND failed = 1 ORDER BY seq LIMIT 1", (run_id,)
+            ).fetchone()
+            if not failed:
+                return {"profile": profile, "node": None, "state": None}
+            seq, node = failed
+            previous = self._conn.execute(
+                "SELECT state FROM checkpoints WHERE run_id = ? AND seq < ? ORDER BY seq DESC LIMIT 1", (run_id, seq)
+            ).fetchone()
+            self._conn.execute("DELETE FROM checkpoints WHERE run_id = ? AND seq >= ?", (run_id, seq))
+            self._conn.execute("UPDATE runs SET resume_count = resume_count + 1 WHERE run_id = ?", (run_id,))
+            self._conn.commit()
+
+        state = json.loads(previous[0] if previous else initial_state)
+        state[IMAGE_KEY] = image_base64
+        return {"profile": profile, "node": node, "state": state}
+
+    def _purge_expired(self, now: float) -> None:
+        cutoff = now - CHECKPOINT_TTL_SECONDS
+        expired = "SELECT run_id FROM runs WHERE created_at < ?"
+        self._conn.execute(f"DELETE FROM checkpoints WHERE run_id IN ({expired})", (cutoff,))
+        self._conn.execute("DELETE FROM runs WHERE created_at < ?", (cutoff,))
+
+# Singleton instance
+_checkpoint_store: Optional[CheckpointStore] = None
+_store_lock = threading.Lock()
+
+def get_checkpoint_store() -> CheckpointStore:
+    """Get or create the checkpoint store"""
+    global _checkpoint_store
+    with _store_lock:
+        if _checkpoint_store is None:
+            _checkpoint_store = CheckpointStore()
+    return _checkpoint_store
@@ -0,0 +1,97 @@
+import json
+from typing import Any, Callable, Dict, Iterable, Optional
+
+def parse_json_response(text: str) -> Any:
+    """Parse a complete LLM reply that may wrap its JSON in ``` fences"""
+    if "```json" in text:
+        json_str = text.split("```json")[1].split("```")[0].strip()
+    elif "```" in text:
+        json_str = text.split("```")[1].split("```")[0].strip()
+    else:
+        json_str = text.strip()
+    return json.loads(json_str)
+
+class IncrementalJSONParser:
+    """
+    Incremental parser for a streamed JSON object
+
+    Text before the first "{" (prose, ```json fences) is skipped. Each
+    top-level member is parsed as soon as its value is complete, so callers
+    can act on fields while the rest of the reply is still generating.
+    """
+
+    def __init__(self, on_field: Optional[Callable[[str, Any], None]] = None):
+        self.on_field = on_field
+        self.fields: Dict[str, Any] = {}
+        self.text = ""
+        self.started = False
+        self.done = False
+        # Offset of the opening "{" in text, once started
+        self.object_start = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start = 0
+
+    def feed(self, chunk: str) -> None:
+        """Consume the next chunk of streamed text"""
+        if self.done:
+            return
+        base = len(self.text)
+        self.text += chunk
+        for offset, ch in enumerate(chunk):
+            pos = base + offset
+            if not self.started:
+                if ch == "{":
+                    self.started = True
+                    self.object_start = pos
+                    self._depth = 1
+                    self._member_start = pos + 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._complete_member(pos)
+                    self.done = True
+                    # Anything after the closing brace is trailing prose
+                    self.text = self.text[:pos + 1]
+                    return
+            elif ch == "," and self._depth == 1:
+                self._complete_member(pos)
+                self._member_start = pos + 1
+
+    def _complete_member(self, end: int) -> None:
+        member = self.text[self._member_start:end].strip()
+        if not member:
+            return
+        try:
+            parsed = json.loads("{" + member + "}")
+        except json.JSONDecodeError:
+            # Malformed member; the full-text fallback parse still gets a chance
+            return
+        for key, value in parsed.items():
+            self.fields[key] = value
+            if self.on_field:
+                self.on_field(key, value)
+
+    def object_text(self) -> str:
+        """The complete object's text without leading prose or fences (only meaningful once done)"""
+        return self.text[self.object_start:]
+
+    def has_fields(self, required: Iterable[str]) -> bool:
+        """True once every required top-level field has been parsed"""
+        return all(key in self.fields for key in required)
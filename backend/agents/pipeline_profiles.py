@@ -0,0 +1,38 @@
+from typing import Dict, Any, Optional
+
+# Selectable /analyze-vehicle pipelines.
+# expected_latency_ms is the typical end-to-end time, used to pick a profile from a latency SLO.
+PIPELINE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "full": {
+        "description": "Separate vision and measurement calls, LLM risk assessment and recommendations",
+        "llm_calls": 4,
+        "expected_latency_ms": 25000
+    },
+    "fast": {
+        "description": "Spec lookup first, one vision+measurement call, rule-based risk and recommendations",
+        "llm_calls": 1,
+        "expected_latency_ms": 8000
+    }
+}
+
+DEFAULT_PROFILE = "full"
+
+def select_profile(profile: Optional[str] = None, latency_slo_ms: Optional[int] = None) -> str:
+    """
+    Resolve the pipeline profile for a request
+    An explicit profile wins; otherwise pick the most thorough profile that fits the SLO
+    """
+    if profile:
+        if profile not in PIPELINE_PROFILES:
+            raise ValueError(f"Unknown pipeline profile '{profile}'. Options: {', '.join(PIPELINE_PROFILES)}")
+        return profile
+
+    if latency_slo_ms is None:
+        return DEFAULT_PROFILE
+
+    by_thoroughness = sorted(PIPELINE_PROFILES.items(), key=lambda p: p[1]["llm_calls"], reverse=True)
+    for name, config in by_thoroughness:
+        if config["expected_latency_ms"] <= latency_slo_ms:
+            return name
+    # Nothing fits: the fastest profile is the best we can do
+    return by_thoroughness[-1][0]
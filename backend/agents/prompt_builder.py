@@ -0,0 +1,131 @@
+import json
+import math
+from typing import Any, Dict, Iterable, List, Optional
+
+# Rough chars-per-token ratio for Llama-family tokenizers on English + JSON.
+# Deliberately a little low so estimates err on the side of more tokens.
+CHARS_PER_TOKEN = 3.5
+
+# Tokens for JSON punctuation, braces and key names around the values
+RESPONSE_OVERHEAD_TOKENS = 40
+# Headroom on top of the schema estimate so valid answers aren't truncated
+RESPONSE_MARGIN = 1.25
+
+# Per-field generation budgets (tokens) for each agent's JSON response.
+# List fields are budgeted per item; pass the expected item count to max_tokens_for().
+RESPONSE_SCHEMAS = {
+    "vision_agent": {
+        "vehicle_detected": 3,
+        "vehicle_type": 20,
+        "make_model_estimate": 20,
+        "base_height_estimate_inches": 5,
+        "estimation_method": 80,
+        "visible_items[]": 120,
+        "total_height_estimate_inches": 5,
+        "uncertainty_range_inches": 5,
+        "overall_confidence": 5,
+        "reference_objects_used": 30,
+        "perspective_notes": 60,
+        "reasoning": 200
+    },
+    "vision_measurement_agent": {
+        "vehicle_detected": 3,
+        "vehicle_type": 20,
+        "make_model_estimate": 20,
+        "visible_items[]": 60,
+        "overall_confidence": 5,
+        "reference_objects_used": 30,
+        "base_height_inches": 5,
+        "base_height_source": 5,
+        "roof_equipment[]": 45,
+        "total_height_inches": 5,
+        "uncertainty_inches": 5,
+        "reasoning": 200
+    },
+    "measurement_agent": {
+        "base_height_inches": 5,
+        "base_height_source": 5,
+        "roof_equipment[]": 45,
+        "total_height_inches": 5,
+        "uncertainty_inches": 5,
+        "reasoning": 160
+    },
+    "risk_assessment_agent": {
+        "dangerous_bridges[]": 70,
+        "overall_risk": 5,
+        "detailed_reasoning": 160
+    },
+    "recommendation_agent": {
+        "recommendations[]": 35,
+        "safe_routes": 60,
+        "avoid_routes": 60,
+        "summary": 90
+    }
+}
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count for a prompt (no tokenizer dependency)"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def max_tokens_for(schema_name: str, list_items: int = 4) -> int:
+    """
+    Size max_tokens from the response schema instead of a fixed guess
+    list_items: expected number of items in the schema's list fields
+    """
+    total = RESPONSE_OVERHEAD_TOKENS
+    for field, budget in RESPONSE_SCHEMAS[schema_name].items():
+        total += budget * max(list_items, 1) if field.endswith("[]") else budget
+    return math.ceil(total * RESPONSE_MARGIN)
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+def prune(data: Any) -> Any:
+    """Recursively drop None / empty values that add prompt tokens but no information"""
+    if isinstance(data, dict):
+        pruned = {k: prune(v) for k, v in data.items()}
+        return {k: v for k, v in pruned.items() if not _is_empty(v)}
+    if isinstance(data, list):
+        return [prune(v) for v in data if not _is_empty(v)]
+    return data
+
+def select_fields(data: Any, fields: Iterable[str]) -> Any:
+    """Keep only the listed keys of a dict, or of every dict in a list"""
+    fields = list(fields)
+    if isinstance(data, list):
+        return [select_fields(item, fields) for item in data]
+    if isinstance(data, dict):
+        return {k: data[k] for k in fields if k in data}
+    return data
+
+def compact_json(data: Any, fields: Optional[List[str]] = None) -> str:
+    """
+    Serialize context for a prompt: optional field selection, empty values
+    dropped, no indentation or spaces after separators
+    """
+    if fields is not None:
+        data = select_fields(data, fields)
+    return json.dumps(prune(data), separators=(",", ":"), ensure_ascii=False, default=str)
+
+def trim_to_token_budget(items: List[Any], budget_tokens: int, fields: Optional[List[str]] = None) -> List[Any]:
+    """Keep leading list items while their compact serialization fits the token budget"""
+    kept = []
+    used = 0
+    for item in items:
+        cost = estimate_tokens(compact_json(item, fields)) + 1
+        if kept and used + cost > budget_tokens:
+            break
+        kept.append(item)
+        used += cost
+    return kept
+
+def usage_summary(prompt: str, max_tokens: int, usage: Any = None) -> Dict[str, Any]:
+    """Token accounting for the agent log: estimate before sending, measured after"""
+    summary = {
+        "prompt_tokens_estimated": estimate_tokens(prompt),
+        "max_tokens": max_tokens
+    }
+    if usage is not None:
+        summary["prompt_tokens"] = getattr(usage, "prompt_tokens", None)
+        summary["completion_tokens"] = getattr(usage, "completion_tokens", None)
+    return summary
@@ -0,0 +1,178 @@
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+from .rule_based import CAUTION_MARGIN
+
+# Most analyses end in one of a few outcomes; these render them without an LLM call.
+# Anything outside them (unknown levels, many bridges, inconsistent risk) goes to the LLM.
+MAX_TEMPLATE_BRIDGES = 3
+BLOCKER_LEVELS = {"CRITICAL", "DANGER"}
+TIGHT_LEVELS = {"CAUTION"}
+CLEAR_RISK_LEVELS = {"SAFE", "LOW"}
+PROHIBITED_WARNING = "commercial vehicles prohibited"
+
+SAFE_ROUTE_ADVICE = "Interstate highways with 14'+ clearances"
+
+def _format_height(inches: Any) -> str:
+    return f"{int(inches) // 12}'{int(inches) % 12}\"" if inches else "unknown height"
+
+class CorridorIndex:
+    """
+    Road -> warnings from the bridge store, rebuilt when the store reloads
+    Roads with a "Commercial vehicles prohibited" warning are prohibited corridors.
+    """
+
+    def __init__(self):
+        self._version = None
+        self.warnings: Dict[str, List[str]] = {}
+        self.prohibited: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def refresh(self) -> None:
+        from tools.bridge_store import get_bridge_store
+
+        store = get_bridge_store()
+        with self._lock:
+            if self._version == store.records_version:
+                return
+            warnings: Dict[str, List[str]] = {}
+            for bridge in store.all():
+                road = (bridge.get("road_name") or "").strip().lower()
+                if not road:
+                    continue
+                road_warnings = warnings.setdefault(road, [])
+                for warning in bridge.get("warnings") or []:
+                    if warning not in road_warnings:
+                        road_warnings.append(warning)
+            self.warnings = warnings
+            self.prohibited = {
+                road for road, items in warnings.items()
+                if any(item.lower() == PROHIBITED_WARNING for item in items)
+            }
+            self._version = store.records_version
+
+    def corridor_for(self, bridge_name: str) -> Optional[str]:
+        """Prohibited road a bridge is on, matched by road name within the bridge name"""
+        name = (bridge_name or "").lower()
+        for road in self.prohibited:
+            if road in name:
+                return road
+        return None
+
+corridor_index = CorridorIndex()
+
+def classify(state: Dict[str, Any]) -> Optional[str]:
+    """
+    Risk pattern for the state, or None if no template covers it
+    """
+    dangerous = state.get("dangerous_bridges") or []
+    risk_level = state.get("risk_level")
+    if not state.get("total_height_inches") or len(dangerous) > MAX_TEMPLATE_BRIDGES:
+        return None
+
+    levels = [bridge.get("risk_level") for bridge in dangerous]
+    if any(level not in BLOCKER_LEVELS | TIGHT_LEVELS for level in levels):
+        return None
+    if not dangerous:
+        # "HIGH" with nothing dangerous listed is inconsistent; let the LLM explain
+        return "all_clear" if risk_level in CLEAR_RISK_LEVELS else None
+
+    corridor_index.refresh()
+    if any(corridor_index.corridor_for(bridge.get("bridge_name")) for bridge in dangerous):
+        return "prohibited_corridor"
+    blockers = sum(1 for level in levels if level in BLOCKER_LEVELS)
+    tight = len(levels) - blockers
+    if blockers and tight:
+        return "blockers_and_tight"
+    if blockers:
+        return "single_blocker" if blockers == 1 else "multiple_blockers"
+    return "single_tight" if tight == 1 else "multiple_tight"
+
+def render(pattern: str, state: Dict[str, Any]) -> Dict[str, Any]:
+    """Recommendations in the recommendation_agent response format"""
+    height = state.get("total_height_inches")
+    risk_level = state.get("risk_level") or "UNKNOWN"
+    dangerous = state.get("dangerous_bridges") or []
+    location = (state.get("geocoding_result") or {}).get("place_name") or state.get("user_location") or "your area"
+
+    recommendations: List[str] = []
+    avoid_routes: List[str] = []
+    corridors: List[str] = []
+
+    for bridge in dangerous:
+        name = bridge.get("bridge_name", "Unnamed Bridge")
+        clearance = bridge.get("clearance")
+        corridor = corridor_index.corridor_for(name) if pattern == "prohibited_corridor" else None
+        if corridor and corridor not in corridors:
+            corridors.append(corridor)
+        if bridge.get("risk_level") in BLOCKER_LEVELS:
+            recommendations.append(f"Do NOT drive under {name} ({clearance}) - your vehicle will not clear it safely")
+            avoid_routes.append(name)
+        else:
+            recommendations.append(f"Slow down at {name} ({clearance}) - less than {CAUTION_MARGIN}\" of margin; check the posted sign")
+
+    for corridor in corridors:
+        road = corridor.title()
+        notes = [w for w in corridor_index.warnings.get(corridor, []) if w.lower() != PROHIBITED_WARNING][:2]
+        detail = f" ({'; '.join(notes)})" if notes else ""
+        recommendations.insert(0, f"Stay off {road} entirely - commercial vehicles are prohibited{detail}")
+        if road not in avoid_routes:
+            avoid_routes.append(road)
+
+    if pattern == "all_clear":
+        recommendations.append(f"No bridges near {location} are within {CAUTION_MARGIN}\" of your {_format_height(height)} height")
+        recommendations.append("Still watch for posted clearance signs - bridge data can be incomplete")
+
+    recommendations.extend(state.get("weather_warnings") or [])
+
+    summary = f"Vehicle height {height}\" ({_format_height(height)}) - overall risk {risk_level}."
+    if corridors:
+        summary += f" Avoid {', '.join(c.title() for c in corridors)}: commercial vehicles prohibited and bridges too low."
+    elif avoid_routes:
+        summary += f" Do not drive under: {', '.join(avoid_routes)}."
+    elif dangerous:
+        summary += f" {len(dangerous)} bridge(s) are tight; slow down and check signs."
+    else:
+        summary += " No low-clearance bridges nearby."
+
+    return {
+        "recommendations": recommendations,
+        "safe_routes": [SAFE_ROUTE_ADVICE] if avoid_routes else [],
+        "avoid_routes": avoid_routes,
+        "summary": summary
+    }
+
+def template_recommendations(state: Dict[str, Any]) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """(pattern, recommendations) if a template covers the state, else None"""
+    pattern = classify(state)
+    if pattern is None:
+        return None
+    return pattern, render(pattern, state)
+
+class RecommendationCounters:
+    """Template hits per pattern vs LLM fallbacks per reason"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.template_hits: Dict[str, int] = {}
+        self.llm_fallbacks: Dict[str, int] = {}
+
+    def record_template(self, pattern: str) -> None:
+        with self._lock:
+            self.template_hits[pattern] = self.template_hits.get(pattern, 0) + 1
+
+    def record_llm(self, reason: str) -> None:
+        with self._lock:
+            self.llm_fallbacks[reason] = self.llm_fallbacks.get(reason, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = sum(self.template_hits.values())
+            total = hits + sum(self.llm_fallbacks.values())
+            return {
+                "template_hits": dict(self.template_hits),
+                "llm_fallbacks": dict(self.llm_fallbacks),
+                "total": total,
+                "template_hit_rate": round(hits / total, 3) if total else 0.0
+            }
+
+recommendation_counters = RecommendationCounters()
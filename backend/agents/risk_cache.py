@@ -0,0 +1,107 @@
+import copy
+import hashlib
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from .prompt_builder import compact_json
+
+# Heights are rounded UP to the bucket edge and the risk is assessed for that
+# taller vehicle, so a cached answer is never less cautious than a fresh one
+HEIGHT_BUCKET_INCHES = int(os.getenv("RISK_CACHE_BUCKET_INCHES", "2"))
+RISK_CACHE_SIZE = int(os.getenv("RISK_CACHE_SIZE", "512"))
+RISK_CACHE_TTL_SECONDS = float(os.getenv("RISK_CACHE_TTL_SECONDS", "3600"))
+
+def bucket_height(height_inches: float, bucket: int = HEIGHT_BUCKET_INCHES) -> int:
+    """Smallest bucket edge at or above the height"""
+    return int(math.ceil(height_inches / bucket) * bucket)
+
+def conservative_inputs(height_inches: float, uncertainty_inches: Any, weather_impact: Any) -> Tuple[int, int, int]:
+    """
+    Quantize risk inputs toward more risk: height and uncertainty round up,
+    the weather clearance adjustment rounds down
+    """
+    return (
+        bucket_height(height_inches),
+        int(math.ceil(uncertainty_inches if uncertainty_inches is not None else 3)),
+        int(math.floor(weather_impact or 0))
+    )
+
+def bridge_set_hash(bridges: List[Dict[str, Any]], fields: List[str]) -> str:
+    """Order-independent hash of the bridge fields the risk prompt sees"""
+    rows = sorted(compact_json(bridge, fields) for bridge in bridges)
+    return hashlib.sha1("\n".join(rows).encode("utf-8")).hexdigest()
+
+class RiskCache:
+    """
+    LRU + TTL cache of risk assessment results, shared across requests
+    """
+
+    def __init__(self, max_entries: int = RISK_CACHE_SIZE, ttl_seconds: float = RISK_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: tuple) -> Optional[Dict[str, Any]]:
+        """Cached result for a key (a copy, safe to mutate), or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry[0] > self.ttl_seconds:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+    def put(self, key: tuple, result: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (time.time(), copy.deepcopy(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *_args) -> None:
+        """Drop every entry; called when bridge data changes"""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "height_bucket_inches": HEIGHT_BUCKET_INCHES,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+# Singleton instance
+_risk_cache: Optional[RiskCache] = None
+_cache_lock = threading.Lock()
+
+def get_risk_cache() -> RiskCache:
+    """Shared RiskCache, invalidated whenever the bridge store reloads"""
+    global _risk_cache
+    with _cache_lock:
+        if _risk_cache is None:
+            from tools.bridge_store import get_bridge_store
+
+            _risk_cache = RiskCache()
+            get_bridge_store().subscribe(_risk_cache.invalidate)
+    return _risk_cache
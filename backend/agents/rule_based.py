@@ -0,0 +1,133 @@
+import re
+from typing import Dict, Any, List, Optional
+
+# Margin thresholds in inches, matching CLEARANCE_THRESHOLDS in the frontend
+CRITICAL_MARGIN = 0
+DANGER_MARGIN = 4
+CAUTION_MARGIN = 6
+
+_FEET_INCHES_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(?:'|ft|feet)\s*(?:(\d+(?:\.\d+)?)\s*(?:\"|in|inches)?)?\s*$", re.I)
+_METERS_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(?:m|meters?)?\s*$", re.I)
+
+def parse_clearance_inches(value: Any) -> Optional[float]:
+    """
+    Clearance in inches from a bridge record value
+    Handles numbers (inches) and OSM maxheight strings: 10'6", 11 ft, 3.5 m, 3.5
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip()
+    match = _FEET_INCHES_RE.match(text)
+    if match:
+        return float(match.group(1)) * 12 + float(match.group(2) or 0)
+    match = _METERS_RE.match(text)
+    if match:
+        # OSM maxheight without a unit is meters
+        return float(match.group(1)) * 39.3701
+    return None
+
+def bridge_clearance_inches(bridge: Dict[str, Any]) -> Optional[float]:
+    """Clearance of a bridge from either the bridge store or OSM format"""
+    if bridge.get("clearance_inches") is not None:
+        return float(bridge["clearance_inches"])
+    return parse_clearance_inches(bridge.get("maxheight"))
+
+def bridge_risk_level(margin: float) -> str:
+    """Per-bridge risk from the worst-case margin in inches"""
+    if margin < CRITICAL_MARGIN:
+        return "CRITICAL"
+    if margin < DANGER_MARGIN:
+        return "DANGER"
+    if margin < CAUTION_MARGIN:
+        return "CAUTION"
+    return "SAFE"
+
+def assess_risk(
+    vehicle_height: float,
+    bridges: List[Dict[str, Any]],
+    uncertainty: float = 3,
+    weather_impact: float = 0
+) -> Dict[str, Any]:
+    """
+    Deterministic risk assessment in the risk_assessment_agent response format
+    Worst case = tallest plausible vehicle under the weather-reduced clearance
+    """
+    dangerous = []
+    unparsed = []
+    min_margin = None
+    worst_height = vehicle_height + (uncertainty or 0)
+
+    for bridge in bridges:
+        clearance = bridge_clearance_inches(bridge)
+        if clearance is None:
+            unparsed.append(bridge.get("name", "Unnamed Bridge"))
+            continue
+        margin = clearance + (weather_impact or 0) - worst_height
+        min_margin = margin if min_margin is None else min(min_margin, margin)
+        level = bridge_risk_level(margin)
+        if level == "SAFE":
+            continue
+        dangerous.append({
+            "bridge_name": bridge.get("name", "Unnamed Bridge"),
+            "clearance": bridge.get("maxheight") or f"{int(clearance) // 12}'{int(clearance) % 12}\"",
+            "risk_level": level,
+            "margin_inches": round(margin, 1),
+            "reasoning": f"Worst-case margin {margin:.1f}\" (vehicle {worst_height:.0f}\" incl. ±{uncertainty}\" uncertainty)"
+        })
+
+    levels = {b["risk_level"] for b in dangerous}
+    if "CRITICAL" in levels:
+        overall = "CRITICAL"
+    elif "DANGER" in levels:
+        overall = "HIGH"
+    elif "CAUTION" in levels:
+        overall = "MEDIUM"
+    elif min_margin is not None and min_margin < 12:
+        overall = "LOW"
+    else:
+        overall = "SAFE"
+
+    reasoning = f"{len(dangerous)} of {len(bridges)} bridges have less than {CAUTION_MARGIN}\" worst-case margin."
+    if unparsed:
+        reasoning += f" Clearance unknown for: {', '.join(unparsed)} - verify before driving."
+
+    return {
+        "dangerous_bridges": dangerous,
+        "overall_risk": overall,
+        "detailed_reasoning": reasoning
+    }
+
+def build_recommendations(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Deterministic recommendations in the recommendation_agent response format"""
+    height = state.get("total_height_inches")
+    dangerous = state.get("dangerous_bridges") or []
+    risk_level = state.get("risk_level") or "UNKNOWN"
+
+    recommendations = []
+    avoid_routes = []
+    for bridge in dangerous:
+        name = bridge.get("bridge_name", "Unnamed Bridge")
+        if bridge.get("risk_level") in ("CRITICAL", "DANGER"):
+            recommendations.append(f"Avoid {name} ({bridge.get('clearance')}) - your vehicle will not clear it safely")
+            avoid_routes.append(name)
+        else:
+            recommendations.append(f"Use extreme caution at {name} ({bridge.get('clearance')}) - very little margin")
+    for warning in state.get("weather_warnings") or []:
+        recommendations.append(warning)
+    if not recommendations:
+        recommendations.append("No low-clearance bridges found nearby - still watch for posted clearance signs")
+
+    summary = f"Vehicle height {height}\" - overall risk {risk_level}."
+    if avoid_routes:
+        summary += f" Do not drive under: {', '.join(avoid_routes)}."
+    elif dangerous:
+        summary += " Some bridges are tight; slow down and check signs."
+
+    return {
+        "recommendations": recommendations,
+        "safe_routes": ["Interstate highways with 14'+ clearances"] if avoid_routes else [],
+        "avoid_routes": avoid_routes,
+        "summary": summary
+    }
@@ -0,0 +1,145 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from .agent_state import AgentState, log_agent_action
+from .rule_based import build_recommendations
+
+class SkipPolicy:
+    """
+    Short-circuit to a terminal node when a node's output can't support the rest of the pipeline
+    """
+
+    def __init__(
+        self,
+        name: str,
+        after: Tuple[str, ...],
+        condition: Callable[[AgentState], bool],
+        message: str,
+        fatal: bool,
+        advice: Optional[str] = None
+    ):
+        self.name = name
+        self.after = after
+        self.condition = condition
+        self.message = message
+        self.advice = advice
+        # Fatal exits are reported as errors; non-fatal ones still answer the request
+        self.fatal = fatal
+
+SKIP_POLICIES: Dict[str, SkipPolicy] = {
+    policy.name: policy for policy in [
+        SkipPolicy(
+            "no_vehicle",
+            after=("vision_agent", "vision_measurement_agent"),
+            condition=lambda state: not state.get("vehicle_detected"),
+            message="No vehicle detected - cannot measure",
+            fatal=True,
+            advice="Upload a photo showing the whole vehicle, or check clearance with a known height"
+        ),
+        SkipPolicy(
+            "no_height",
+            after=("measurement_agent", "vision_measurement_agent"),
+            condition=lambda state: not state.get("total_height_inches"),
+            message="No vehicle height - cannot assess bridge clearances",
+            fatal=True,
+            advice="Measure the vehicle including roof equipment and check clearance with that height"
+        ),
+        SkipPolicy(
+            "no_bridges",
+            after=("weather_agent",),
+            condition=lambda state: not state.get("nearby_bridges"),
+            message="No bridges found nearby - skipped risk assessment",
+            fatal=False
+        )
+    ]
+}
+
+def enabled_policies(setting: Optional[str] = None) -> Tuple[str, ...]:
+    """
+    Policy names switched on by AGENT_SKIP_POLICIES: "all" (default), "none",
+    or a comma-separated list of names
+    """
+    setting = (setting if setting is not None else os.getenv("AGENT_SKIP_POLICIES", "all")).strip().lower()
+    if setting == "all":
+        return tuple(SKIP_POLICIES)
+    if setting in ("", "none"):
+        return ()
+    names = tuple(name.strip() for name in setting.split(",") if name.strip())
+    unknown = [name for name in names if name not in SKIP_POLICIES]
+    if unknown:
+        raise ValueError(f"Unknown skip policies: {', '.join(unknown)}. Options: {', '.join(SKIP_POLICIES)}")
+    return names
+
+def policies_after(node: str, names: Tuple[str, ...]) -> List[SkipPolicy]:
+    """Enabled policies checked once a node finishes, in priority order"""
+    return [SKIP_POLICIES[name] for name in names if node in SKIP_POLICIES[name].after]
+
+def exit_node_name(policy: SkipPolicy) -> str:
+    return f"early_exit_{policy.name}"
+
+class SkipCounters:
+    """Process-wide tally of early exits and the work they avoided"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.early_exits: Dict[str, int] = {}
+        self.nodes_skipped = 0
+        self.llm_calls_avoided = 0
+
+    def record(self, policy: str, nodes_skipped: int, llm_calls_avoided: int) -> None:
+        with self._lock:
+            self.early_exits[policy] = self.early_exits.get(policy, 0) + 1
+            self.nodes_skipped += nodes_skipped
+            self.llm_calls_avoided += llm_calls_avoided
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "early_exits": dict(self.early_exits),
+                "total_early_exits": sum(self.early_exits.values()),
+                "nodes_skipped": self.nodes_skipped,
+                "llm_calls_avoided": self.llm_calls_avoided
+            }
+
+skip_counters = SkipCounters()
+
+def make_early_exit_node(policy: SkipPolicy, skipped_nodes: List[str], skipped_llm_calls: int):
+    """
+    Terminal node for a policy: deterministic recommendations, no LLM call
+    """
+    def early_exit(state: AgentState) -> AgentState:
+        start_time = time.time()
+        agent_name = "EarlyExit"
+
+        if not state.get("risk_level"):
+            state["dangerous_bridges"] = []
+            state["risk_level"] = "UNKNOWN"
+
+        if policy.fatal:
+            state["errors"].append(policy.message)
+            state["recommendations"] = [policy.advice]
+            state["safe_routes"] = []
+            state["avoid_routes"] = []
+            state["final_report"] = policy.message
+        else:
+            recommendations = build_recommendations(state)
+            state["recommendations"] = recommendations["recommendations"]
+            state["safe_routes"] = recommendations["safe_routes"]
+            state["avoid_routes"] = recommendations["avoid_routes"]
+            state["final_report"] = recommendations["summary"]
+        state["early_exit_reason"] = policy.name
+        state["skipped_nodes"] = skipped_nodes
+
+        skip_counters.record(policy.name, len(skipped_nodes), skipped_llm_calls)
+
+        duration = time.time() - start_time
+        state = log_agent_action(
+            state,
+            agent_name,
+            f"{policy.message}; skipped {len(skipped_nodes)} agents ({skipped_llm_calls} LLM calls)",
+            {"policy": policy.name, "skipped_nodes": skipped_nodes, "llm_calls_avoided": skipped_llm_calls},
+            duration
+        )
+        return state
+    return early_exit
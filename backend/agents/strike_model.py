@@ -0,0 +1,195 @@
+import math
+import os
+import time
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence
+from .rule_based import bridge_clearance_inches
+from services.tracing import traced
+
+# Error sources between "measured height vs posted clearance" and what actually happens
+# under the bridge. Strike when vehicle + bounce > clearance - losses + weather.
+#   Closed form (normal + two uniforms):
+#     measurement error   Normal(0, measurement_uncertainty / 2)  (± is read as a 95% bound)
+#     sign error          Normal(0, SIGN_SD + SIGN_SD_LOW_CONFIDENCE * (1 - confidence))
+#     suspension bounce   Uniform(SUSPENSION_MIN, SUSPENSION_MAX) added to the vehicle
+#     resurfacing loss    Uniform(0, RESURFACING_MAX) of clearance since the sign was set
+#   Monte Carlo:
+#     settlement          Exponential, mean SETTLEMENT_PER_YEAR x years since last verified
+STRIKE_SUSPENSION_MIN_INCHES = float(os.getenv("STRIKE_SUSPENSION_MIN_INCHES", "1"))
+STRIKE_SUSPENSION_MAX_INCHES = float(os.getenv("STRIKE_SUSPENSION_MAX_INCHES", "3"))
+STRIKE_RESURFACING_MAX_INCHES = float(os.getenv("STRIKE_RESURFACING_MAX_INCHES", "4"))
+STRIKE_SETTLEMENT_PER_YEAR_INCHES = float(os.getenv("STRIKE_SETTLEMENT_PER_YEAR_INCHES", "0.1"))
+STRIKE_SETTLEMENT_MAX_MEAN_INCHES = float(os.getenv("STRIKE_SETTLEMENT_MAX_MEAN_INCHES", "1.5"))
+STRIKE_SIGN_SD_INCHES = float(os.getenv("STRIKE_SIGN_SD_INCHES", "0.5"))
+STRIKE_SIGN_SD_LOW_CONFIDENCE_INCHES = float(os.getenv("STRIKE_SIGN_SD_LOW_CONFIDENCE_INCHES", "6"))
+# OSM maxheight tags carry no confidence or verification date
+DEFAULT_SIGN_CONFIDENCE = 0.8
+DEFAULT_YEARS_SINCE_VERIFIED = 5.0
+
+STRIKE_MODEL_SAMPLES = int(os.getenv("STRIKE_MODEL_SAMPLES", "16"))
+STRIKE_MODEL_SEED = int(os.getenv("STRIKE_MODEL_SEED", "7"))
+# Beyond this many standard deviations the outcome is certain to double precision
+CERTAIN_Z = 8.5
+
+def _numpy():
+    """numpy, imported on the first estimate to keep it off the startup path"""
+    import numpy
+    return numpy
+
+def _tail_and_density(z):
+    """
+    (P(Z > z), phi(z)) for a standard normal, elementwise, sharing one exp()
+    Abramowitz & Stegun 7.1.26 erfc (absolute error < 1.5e-7), since numpy has no erf
+    """
+    np = _numpy()
+    gauss = np.exp(-0.5 * z * z)
+    t = 1.0 / (1.0 + (0.3275911 / math.sqrt(2)) * np.abs(z))
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    tail = 0.5 * poly * gauss
+    return np.where(z >= 0, tail, 1.0 - tail), gauss * (1 / math.sqrt(2 * math.pi))
+
+def normal_tail(z):
+    """P(Z > z) for a standard normal, elementwise"""
+    return _tail_and_density(z)[0]
+
+def _tail_second_integral(z):
+    """Second antiderivative of P(Z > z): ((z^2 + 1) Q(z) - z phi(z)) / 2"""
+    tail, density = _tail_and_density(z)
+    return ((z * z + 1) * tail - z * density) / 2
+
+def years_since(verified: Any, today: Optional[date] = None) -> float:
+    """Years since a YYYY-MM-DD verification date; the default age if missing or unparseable"""
+    try:
+        verified_on = date.fromisoformat(str(verified)[:10])
+    except ValueError:
+        return DEFAULT_YEARS_SINCE_VERIFIED
+    return max(((today or date.today()) - verified_on).days / 365.25, 0.0)
+
+def _uniform_box_tail(margins, sigma):
+    """
+    P(N(0, sigma^2) + bounce + resurfacing > margin), exactly
+    Q integrated twice over the (bounce, resurfacing) rectangle, evaluated at its corners
+    """
+    low_1, high_1 = STRIKE_SUSPENSION_MIN_INCHES, STRIKE_SUSPENSION_MAX_INCHES
+    high_2 = STRIKE_RESURFACING_MAX_INCHES
+    # Zero-width ranges would divide by zero; a hundredth of an inch is indistinguishable
+    width_1, width_2 = max(high_1 - low_1, 0.01), max(high_2, 0.01)
+    corners = (
+        _tail_second_integral((margins - low_1) / sigma)
+        - _tail_second_integral((margins - low_1 - width_2) / sigma)
+        - _tail_second_integral((margins - low_1 - width_1) / sigma)
+        + _tail_second_integral((margins - low_1 - width_1 - width_2) / sigma)
+    )
+    return _numpy().clip(corners * sigma ** 2 / (width_1 * width_2), 0.0, 1.0)
+
+def strike_probabilities(
+    vehicle_height: float,
+    clearances: Sequence[float],
+    uncertainty: float = 3,
+    confidences: Optional[Sequence[float]] = None,
+    settlement_means: Optional[Sequence[float]] = None,
+    weather_impacts: Any = 0,
+    samples: int = STRIKE_MODEL_SAMPLES,
+    seed: int = STRIKE_MODEL_SEED
+):
+    """
+    P(strike) for each bridge as a numpy array
+
+    The Gaussian terms fold into one normal per bridge, and normal + bounce +
+    resurfacing (two uniforms) has an exact tail, so bridges without settlement
+    are closed form. Settlement is Monte Carlo: one seeded, stratified set of
+    exponential samples shared by all bridges and scaled by each bridge's mean,
+    averaging the exact tail over a bridges x samples grid. Bridges whose
+    outcome is certain either way skip the grid.
+    """
+    np = _numpy()
+    clearances = np.asarray(clearances, dtype=np.float64)
+    count = len(clearances)
+    confidences = np.clip(np.asarray(
+        confidences if confidences is not None else [DEFAULT_SIGN_CONFIDENCE] * count, dtype=np.float64
+    ), 0.0, 1.0)
+    settlement_means = np.asarray(
+        settlement_means if settlement_means is not None else [0.0] * count, dtype=np.float64
+    )
+    # Clearance left over the vehicle if every error term were zero
+    margins = clearances + np.broadcast_to(np.asarray(weather_impacts, dtype=np.float64), (count,)) - vehicle_height
+
+    sign_sd = STRIKE_SIGN_SD_INCHES + STRIKE_SIGN_SD_LOW_CONFIDENCE_INCHES * (1.0 - confidences)
+    sigma = np.sqrt((max(uncertainty or 0, 0) / 2.0) ** 2 + sign_sd ** 2)
+
+    # Stratified: one exponential draw from each of `samples` equal-probability slices
+    rng = np.random.default_rng(seed)
+    settlement = -np.log1p(-(np.arange(samples) + rng.random(samples)) / samples)
+    # Certain strike: even the smallest loss (minimum bounce) leaves the normal term no room.
+    # Certain clear: the largest loss (maximum bounce + resurfacing + the largest settlement
+    # sample the grid would use) still leaves CERTAIN_Z standard deviations of room.
+    best_case = (margins - STRIKE_SUSPENSION_MIN_INCHES) / sigma
+    worst_loss = (STRIKE_SUSPENSION_MAX_INCHES + STRIKE_RESURFACING_MAX_INCHES
+                  + np.maximum(settlement_means, 0.0) * settlement.max())
+    worst_case = (margins - worst_loss) / sigma
+    certain_strike = best_case < -CERTAIN_Z
+    probabilities = np.where(certain_strike, 1.0, 0.0)
+    active = ~certain_strike & (worst_case <= CERTAIN_Z)
+    closed = active & (settlement_means <= 0)
+    sampled = active & (settlement_means > 0)
+
+    if closed.any():
+        probabilities[closed] = _uniform_box_tail(margins[closed], sigma[closed])
+    if sampled.any():
+        shifted = margins[sampled, None] - settlement_means[sampled, None] * settlement[None, :]
+        probabilities[sampled] = _uniform_box_tail(shifted, sigma[sampled, None]).mean(axis=1)
+    return probabilities
+
+def warmup_strike_model() -> None:
+    """Import numpy and run both paths once"""
+    strike_probabilities(150, [150.0, 150.0], settlement_means=[0.0, 0.5])
+
+def bridge_strike_probabilities(
+    vehicle_height: float,
+    bridges: List[Dict[str, Any]],
+    uncertainty: float = 3,
+    weather_impact: float = 0
+) -> List[Optional[float]]:
+    """P(strike) per bridge record (bridge store or OSM format); None where the clearance is unknown"""
+    rows = [(i, bridge_clearance_inches(bridge)) for i, bridge in enumerate(bridges)]
+    rows = [(i, clearance) for i, clearance in rows if clearance is not None]
+    result: List[Optional[float]] = [None] * len(bridges)
+    if not rows:
+        return result
+    known = [bridges[i] for i, _ in rows]
+    today = date.today()
+    probabilities = strike_probabilities(
+        vehicle_height,
+        [clearance for _, clearance in rows],
+        uncertainty=uncertainty,
+        confidences=[b.get("confidence", DEFAULT_SIGN_CONFIDENCE) for b in known],
+        settlement_means=[
+            min(STRIKE_SETTLEMENT_PER_YEAR_INCHES * years_since(b.get("last_verified"), today),
+                STRIKE_SETTLEMENT_MAX_MEAN_INCHES)
+            for b in known
+        ],
+        weather_impacts=weather_impact or 0
+    )
+    for (i, _), probability in zip(rows, probabilities):
+        result[i] = round(float(probability), 4)
+    return result
+
+@traced("tool")
+def strike_summary(
+    vehicle_height: float,
+    bridges: List[Dict[str, Any]],
+    uncertainty: float = 3,
+    weather_impact: float = 0
+) -> Dict[str, Any]:
+    """Per-bridge probabilities plus the worst one, for the agent log and state"""
+    start = time.perf_counter()
+    probabilities = bridge_strike_probabilities(vehicle_height, bridges, uncertainty, weather_impact)
+    known = [p for p in probabilities if p is not None]
+    return {
+        "strike_probability": max(known) if known else None,
+        "per_bridge": [
+            {"bridge_name": bridge.get("name", "Unnamed Bridge"), "strike_probability": probability}
+            for bridge, probability in zip(bridges, probabilities)
+        ],
+        "model_ms": round((time.perf_counter() - start) * 1000, 2)
+    }
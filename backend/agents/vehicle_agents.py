@@ -1,53 +1,92 @@
-from openai import OpenAI
-import os
 import json
+import os
 import time
 from typing import Dict, Any
 from .agent_state import AgentState, log_agent_action
+from .prompt_builder import (
+    compact_json, estimate_tokens, max_tokens_for, select_fields, trim_to_token_budget, usage_summary
+)
+from .json_stream import IncrementalJSONParser, parse_json_response
+from .rule_based import assess_risk, build_recommendations
+from .risk_cache import get_risk_cache, conservative_inputs, bridge_set_hash
+from .strike_model import strike_summary
+from .recommendation_templates import template_recommendations, recommendation_counters
 from tools.external_tools import ExternalTools
+from tools.route_weather import route_weather
+from tools.vehicle_index import get_vehicle_index
+from services.llm_client import get_llm_client
+from services.llm_scheduler import llm_scheduler
+from services.model_router import model_router
+from services.tracing import span, record_llm_phases
 
-client = OpenAI(
-    base_url="https://integrate.api.nvidia.com/v1",
-    api_key=os.getenv("NVIDIA_API_KEY")
-)
 tools = ExternalTools()
 
-class VehicleAgents:
-    """Collection of specialized agents for vehicle analysis"""
-    
-    @staticmethod
-    def vision_agent(state: AgentState) -> AgentState:
-        """
-        Agent 1: Vision Analysis
-        Analyzes image to identify vehicle type and visible features
-        """
-        start_time = time.time()
-        agent_name = "VisionAgent"
-        
-        try:
-            state = log_agent_action(state, agent_name, "Starting image analysis")
-            
-            if not state.get("image_base64"):
-                state["errors"].append("No image provided")
-                state["vehicle_detected"] = False
-                return state
-            
-            # Call Nemotron for vision analysis
-            response = client.chat.completions.create(
-                model="nvidia/llama-3.1-nemotron-70b-instruct-v1",
-                max_tokens=2000,
-                messages=[{
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:{state.get('image_media_type', 'image/jpeg')};base64,{state['image_base64']}"
-                            }
-                        },
-                        {
-                            "type": "text",
-                            "text": """You are an expert at analyzing vehicle dimensions from photos.
+# Prompt budget for variable-length context (bridge lists, detections)
+CONTEXT_TOKEN_BUDGET = 1200
+# Once the fields are in, how long to keep reading for the usage chunk before closing the stream
+LLM_USAGE_GRACE_SECONDS = float(os.getenv("LLM_USAGE_GRACE_SECONDS", "0.5"))
+
+# Fields each downstream agent actually reasons over; everything else is dropped from prompts
+SPEC_FIELDS = ["found", "vehicle_name", "base_height_inches", "typical_mods"]
+DETECTION_FIELDS = ["item", "height_estimate_inches", "estimation_confidence"]
+BRIDGE_FIELDS = ["name", "maxheight", "clearance_inches"]
+EQUIPMENT_FIELDS = ["item", "height_added_inches"]
+DANGEROUS_BRIDGE_FIELDS = ["bridge_name", "clearance", "risk_level"]
+
+# Response field -> (state field, default if the model omits it).
+# State fields are filled as each response field finishes streaming.
+VISION_FIELDS = {
+    "vehicle_detected": ("vehicle_detected", False),
+    "vehicle_type": ("vehicle_type", None),
+    "make_model_estimate": ("make_model_estimate", None),
+    "base_height_estimate_inches": ("base_height_estimate", None),
+    "visible_items": ("visual_detections", []),
+    "overall_confidence": ("vision_confidence", 0.8),
+    "reasoning": ("vision_reasoning", None),
+    "estimation_method": ("visual_estimation_method", None),
+    "perspective_notes": ("perspective_notes", None),
+    "reference_objects_used": ("reference_objects_used", []),
+    "total_height_estimate_inches": ("total_height_visual_estimate", None),
+    "uncertainty_range_inches": ("uncertainty_range", 5)
+}
+
+MEASUREMENT_FIELDS = {
+    "base_height_inches": ("base_height_inches", None),
+    "roof_equipment": ("roof_equipment", []),
+    "total_height_inches": ("total_height_inches", None),
+    "uncertainty_inches": ("measurement_uncertainty", 3),
+    "reasoning": ("measurement_reasoning", None)
+}
+
+RISK_FIELDS = {
+    "dangerous_bridges": ("dangerous_bridges", []),
+    "overall_risk": ("risk_level", "UNKNOWN"),
+    "detailed_reasoning": ("risk_reasoning", None)
+}
+
+RECOMMENDATION_FIELDS = {
+    "recommendations": ("recommendations", []),
+    "safe_routes": ("safe_routes", []),
+    "avoid_routes": ("avoid_routes", []),
+    "summary": ("final_report", None)
+}
+
+# Fast profile: one call fills both the vision and the measurement fields
+VISION_MEASUREMENT_FIELDS = {
+    "vehicle_detected": ("vehicle_detected", False),
+    "vehicle_type": ("vehicle_type", None),
+    "make_model_estimate": ("make_model_estimate", None),
+    "visible_items": ("visual_detections", []),
+    "overall_confidence": ("vision_confidence", 0.8),
+    "reference_objects_used": ("reference_objects_used", []),
+    "base_height_inches": ("base_height_inches", None),
+    "roof_equipment": ("roof_equipment", []),
+    "total_height_inches": ("total_height_inches", None),
+    "uncertainty_inches": ("measurement_uncertainty", 3),
+    "reasoning": ("measurement_reasoning", None)
+}
+
+VISION_PROMPT = """You are an expert at analyzing vehicle dimensions from photos.
 
 CRITICAL TASK: Estimate vehicle height as accurately as possible using ALL visual cues.
 
@@ -92,33 +131,214 @@ RESPOND WITH VALID JSON ONLY:
 }
 
 BE PRECISE: Look for any visual clues about scale. Compare equipment sizes to vehicle proportions. Use multiple reference points."""
-                        }
-                    ]
-                }]
+
+def call_nemotron_json(
+    state: AgentState,
+    agent_name: str,
+    prompt: str,
+    max_tokens: int,
+    fields: Dict[str, tuple],
+    call_site: str,
+    image_url: str = None
+) -> Dict[str, Any]:
+    """
+    Stream one prompt to Nemotron and parse the JSON reply incrementally
+
+    Each response field in `fields` is written to its state field as soon as
+    it has streamed in. After that the stream is read for at most
+    LLM_USAGE_GRACE_SECONDS more, for the usage chunk, before it is closed
+    instead of waiting for trailing prose. If any field is missing, the whole
+    reply is parsed again (raising on invalid JSON); fields it also lacks get
+    their defaults and are listed in the agent log.
+    The model comes from the call site's route (services.model_router).
+    Token counts and model metrics are written to the agent log; counts are
+    marked estimated when the stream was closed before usage arrived.
+    """
+    content: Any = prompt
+    if image_url:
+        content = [
+            {"type": "image_url", "image_url": {"url": image_url}},
+            {"type": "text", "text": prompt}
+        ]
+
+    def on_field(key: str, value: Any) -> None:
+        if key in fields:
+            state[fields[key][0]] = value
+
+    start_time = time.time()
+    first_token_seconds = None
+    usage = None
+    cancelled = False
+    parser = IncrementalJSONParser(on_field=on_field)
+
+    model, route_reason = model_router.route(call_site)
+    with span(f"llm {call_site}", "llm", model=model, max_tokens=max_tokens) as llm_span, \
+            llm_scheduler.slot("pipeline", estimate_tokens(prompt) + max_tokens, flow=state.get("run_id")) as slot:
+        queue_wait_seconds = slot.queue_wait_seconds
+        call_start = time.time()
+        try:
+            stream = get_llm_client().chat.completions.create(
+                model=model,
+                max_tokens=max_tokens,
+                messages=[{"role": "user", "content": content}],
+                stream=True,
+                stream_options={"include_usage": True}
             )
+            fields_at = None
+            try:
+                for chunk in stream:
+                    if getattr(chunk, "usage", None):
+                        usage = chunk.usage
+                    if fields_at is not None:
+                        # Everything needed is parsed; only waiting for usage (the last chunk)
+                        if usage is not None:
+                            break
+                        if time.time() - fields_at > LLM_USAGE_GRACE_SECONDS:
+                            cancelled = True
+                            break
+                        continue
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content or ""
+                    if delta and first_token_seconds is None:
+                        first_token_seconds = time.time() - start_time
+                    parser.feed(delta)
+                    if parser.done or parser.has_fields(fields):
+                        fields_at = time.time()
+            finally:
+                if hasattr(stream, "close"):
+                    stream.close()
+                if usage is not None and getattr(usage, "total_tokens", None):
+                    slot.tokens_used = usage.total_tokens
+                else:
+                    slot.tokens_used = estimate_tokens(prompt) + estimate_tokens(parser.text)
+        except Exception:
+            model_router.record(call_site, model, time.time() - call_start, ok=False, completeness=0.0)
+            raise
+        model_seconds = time.time() - call_start
+        record_llm_phases(
+            llm_span, call_start - queue_wait_seconds, call_start,
+            start_time + first_token_seconds if first_token_seconds is not None else None, time.time()
+        )
+
+    result = parser.fields
+    if not parser.has_fields(fields):
+        # Stream ended without a complete object, or a member didn't parse on its
+        # own; parse the whole reply so bad JSON raises like a plain json.loads
+        result = json.loads(parser.object_text()) if parser.done else parse_json_response(parser.text)
+        if not isinstance(result, dict):
+            raise ValueError(f"Expected a JSON object from {call_site}, got {type(result).__name__}")
+        for key, value in result.items():
+            on_field(key, value)
+
+    completeness = sum(1 for key in fields if key in result) / len(fields)
+    missing_fields = [key for key in fields if key not in result]
+    for key, (state_key, default) in fields.items():
+        if key not in result:
+            state[state_key] = default
+
+    token_usage = usage_summary(prompt, max_tokens, usage)
+    token_usage["model"] = model
+    token_usage["route_reason"] = route_reason
+    token_usage["field_completeness"] = round(completeness, 3)
+    if missing_fields:
+        token_usage["missing_fields"] = missing_fields
+    token_usage["model_metrics"] = model_router.record(call_site, model, model_seconds, ok=True, completeness=completeness)
+    if token_usage.get("completion_tokens") is None:
+        token_usage["completion_tokens_estimated"] = estimate_tokens(parser.text)
+    token_usage["usage_measured"] = usage is not None
+    token_usage["stream_cancelled_early"] = cancelled
+    token_usage["queue_wait_seconds"] = round(queue_wait_seconds, 3)
+    token_usage["time_to_first_token_seconds"] = round(first_token_seconds or 0, 3)
+    token_usage["time_to_result_seconds"] = round(time.time() - start_time, 3)
+    if "completion_tokens_estimated" not in token_usage:
+        counts = f"{token_usage.get('prompt_tokens')} prompt / {token_usage.get('completion_tokens')} completion tokens"
+    else:
+        counts = (f"~{token_usage['prompt_tokens_estimated']} prompt / ~{token_usage['completion_tokens_estimated']} "
+                  f"completion tokens (estimated, no usage reported)")
+    if missing_fields:
+        counts += f", {len(missing_fields)} field(s) missing, defaults used"
+    log_agent_action(state, agent_name, f"LLM call ({model}): {counts}", token_usage)
+
+    return result
+
+def apply_strike_model(state: AgentState, vehicle_height: float, bridges: list) -> Dict[str, Any]:
+    """
+    Set strike_probability from the uncertainty model (worst bridge) and tag
+    each dangerous bridge with its own; returns the model output for the log
+    """
+    summary = strike_summary(
+        vehicle_height, bridges,
+        uncertainty=state.get("measurement_uncertainty", 3),
+        weather_impact=state.get("clearance_adjustment", 0)
+    )
+    state["strike_probability"] = summary["strike_probability"]
+    by_name = {row["bridge_name"]: row["strike_probability"] for row in summary["per_bridge"]}
+    for bridge in state.get("dangerous_bridges") or []:
+        if by_name.get(bridge.get("bridge_name")) is not None:
+            bridge["strike_probability"] = by_name[bridge["bridge_name"]]
+    return summary
+
+VISION_MEASUREMENT_PROMPT = """You are an expert at measuring vehicle height from photos.
+
+CRITICAL TASK: Identify the vehicle and give its total height in ONE answer, combining
+visual cues with the database specs below.
+
+DATABASE SPECS:
+{specs}
+
+STEPS:
+1. Identify vehicle type and model (proportions, logos, design)
+2. Use reference objects for scale (wheels 24-40", cab doors 60-72")
+3. Detect ALL roof-mounted equipment (AC 8-12", antennas 4-10", racks 3-8")
+4. If the vehicle matches a database entry, use its base height as the baseline
+5. Add equipment heights; account for camera angle
+
+RESPOND WITH VALID JSON ONLY:
+{{
+  "vehicle_detected": boolean,
+  "vehicle_type": "specific type/model",
+  "make_model_estimate": "if logos/design visible",
+  "visible_items": [{{"item": "string", "height_estimate_inches": number, "estimation_confidence": 0.0-1.0}}],
+  "overall_confidence": 0.0-1.0,
+  "reference_objects_used": ["string"],
+  "base_height_inches": number,
+  "base_height_source": "visual/database/combined",
+  "roof_equipment": [{{"item": "string", "height_added_inches": number, "source": "visual_measurement/typical_value", "confidence": 0.0-1.0}}],
+  "total_height_inches": number,
+  "uncertainty_inches": number,
+  "reasoning": "how you combined visual cues, database specs and equipment"
+}}"""
+
+class VehicleAgents:
+    """Collection of specialized agents for vehicle analysis"""
+    
+    @staticmethod
+    def vision_agent(state: AgentState) -> AgentState:
+        """
+        Agent 1: Vision Analysis
+        Analyzes image to identify vehicle type and visible features
+        """
+        start_time = time.time()
+        agent_name = "VisionAgent"
+        
+        try:
+            state = log_agent_action(state, agent_name, "Starting image analysis")
             
-            # Parse response
-            response_text = response.choices[0].message.content
-            if "```json" in response_text:
-                json_str = response_text.split("```json")[1].split("```")[0].strip()
-            else:
-                json_str = response_text.strip()
-            
-            result = json.loads(json_str)
-            
-            # Update state with enhanced visual measurements
-            state["vehicle_detected"] = result.get("vehicle_detected", False)
-            state["vehicle_type"] = result.get("vehicle_type")
-            state["make_model_estimate"] = result.get("make_model_estimate")
-            state["base_height_estimate"] = result.get("base_height_estimate_inches")
-            state["visual_detections"] = result.get("visible_items", [])
-            state["vision_confidence"] = result.get("overall_confidence", 0.8)
-            state["vision_reasoning"] = result.get("reasoning")
-            state["visual_estimation_method"] = result.get("estimation_method")
-            state["perspective_notes"] = result.get("perspective_notes")
-            state["reference_objects_used"] = result.get("reference_objects_used", [])
-            state["total_height_visual_estimate"] = result.get("total_height_estimate_inches")
-            state["uncertainty_range"] = result.get("uncertainty_range_inches", 5)
+            if not state.get("image_base64"):
+                state["errors"].append("No image provided")
+                state["vehicle_detected"] = False
+                return state
+            
+            # Call Nemotron for vision analysis
+            image_url = f"data:{state.get('image_media_type', 'image/jpeg')};base64,{state['image_base64']}"
+            result = call_nemotron_json(
+                state, agent_name, VISION_PROMPT,
+                max_tokens=max_tokens_for("vision_agent"),
+                fields=VISION_FIELDS,
+                call_site="vision_agent",
+                image_url=image_url
+            )
             
             duration = time.time() - start_time
             state = log_agent_action(
@@ -157,6 +377,9 @@ BE PRECISE: Look for any visual clues about scale. Compare equipment sizes to ve
             state = log_agent_action(state, agent_name, f"Looking up specs for: {vehicle_type}")
             
             vehicle_specs = tools.lookup_vehicle_specs(vehicle_type)
+            detections = trim_to_token_budget(
+                state.get('visual_detections') or [], CONTEXT_TOKEN_BUDGET, DETECTION_FIELDS
+            )
             
             # Call Nemotron for measurement reasoning
             prompt = f"""You are a vehicle measurement expert combining visual analysis with database knowledge.
@@ -171,10 +394,10 @@ VISUAL ANALYSIS FROM IMAGE:
 
 DATABASE LOOKUP:
 - Vehicle type: {vehicle_type}
-- Standard specs: {json.dumps(vehicle_specs, indent=2)}
+- Standard specs: {compact_json(vehicle_specs, SPEC_FIELDS)}
 
 DETECTED EQUIPMENT:
-{json.dumps(state.get('visual_detections', []), indent=2)}
+{compact_json(detections, DETECTION_FIELDS)}
 
 TASK:
 Provide the MOST ACCURATE height estimate by combining visual analysis with database knowledge.
@@ -202,27 +425,13 @@ Return ONLY valid JSON:
   "reasoning": "explain how you combined visual + database + equipment measurements"
 }}"""
             
-            message = client.chat.completions.create(
-                model="nvidia/llama-3.1-nemotron-70b-instruct-v1",
-                max_tokens=1500,
-                messages=[{"role": "user", "content": prompt}]
+            result = call_nemotron_json(
+                state, agent_name, prompt,
+                max_tokens=max_tokens_for("measurement_agent", len(detections) + len(vehicle_specs.get("typical_mods", []))),
+                fields=MEASUREMENT_FIELDS,
+                call_site="measurement_agent"
             )
             
-            response_text = message.choices[0].message.content
-            if "```json" in response_text:
-                json_str = response_text.split("```json")[1].split("```")[0].strip()
-            else:
-                json_str = response_text.strip()
-            
-            result = json.loads(json_str)
-            
-            # Update state
-            state["base_height_inches"] = result.get("base_height_inches")
-            state["roof_equipment"] = result.get("roof_equipment", [])
-            state["total_height_inches"] = result.get("total_height_inches")
-            state["measurement_uncertainty"] = result.get("uncertainty_inches", 3)
-            state["measurement_reasoning"] = result.get("reasoning")
-            
             duration = time.time() - start_time
             state = log_agent_action(
                 state, agent_name,
@@ -343,7 +552,8 @@ Return ONLY valid JSON:
     def weather_agent(state: AgentState) -> AgentState:
         """
         Agent 5: Weather Check
-        Gets weather conditions that might affect clearance
+        Gets weather conditions that might affect clearance; with a destination,
+        also the forecast at each bridge on the way at the time the truck reaches it
         """
         start_time = time.time()
         agent_name = "WeatherAgent"
@@ -366,6 +576,16 @@ Return ONLY valid JSON:
                 state["weather_conditions"] = weather_result
                 state["clearance_adjustment"] = weather_result.get("clearance_impact_inches", 0)
                 state["weather_warnings"] = weather_result.get("warnings", [])
+
+                if state.get("destination"):
+                    # Straight line to the destination until a routing engine supplies the geometry
+                    destination = tools.geocode_location(state["destination"])
+                    route = route_weather([(lat, lon), (destination["latitude"], destination["longitude"])])
+                    state["route_weather"] = route
+                    state["clearance_adjustment"] = min(
+                        state["clearance_adjustment"], route["clearance_impact_inches"]
+                    )
+                    state["weather_warnings"] = state["weather_warnings"] + route["warnings"]
                 
                 duration = time.time() - start_time
                 state = log_agent_action(
@@ -406,16 +626,39 @@ Return ONLY valid JSON:
                 state["risk_level"] = "UNKNOWN"
                 return state
             
+            prompt_bridges = trim_to_token_budget(bridges, CONTEXT_TOKEN_BUDGET, BRIDGE_FIELDS)
+
+            # Same area + similar height + same weather = same answer; the
+            # cached result was assessed for the top of this height bucket
+            height_bucket, uncertainty, weather_bucket = conservative_inputs(
+                vehicle_height, state.get('measurement_uncertainty', 3), weather_impact
+            )
+            cache_key = (height_bucket, uncertainty, weather_bucket, bridge_set_hash(prompt_bridges, BRIDGE_FIELDS))
+            risk_cache = get_risk_cache()
+            cached = risk_cache.get(cache_key)
+            if cached is not None:
+                for key, (state_key, default) in RISK_FIELDS.items():
+                    state[state_key] = cached.get(key, default)
+                strike_model = apply_strike_model(state, vehicle_height, bridges)
+                duration = time.time() - start_time
+                state = log_agent_action(
+                    state, agent_name,
+                    f"Risk: {state['risk_level']} ({len(state['dangerous_bridges'])} dangerous bridges, cached for {height_bucket}\" bucket)",
+                    {"cache_hit": True, "height_bucket_inches": height_bucket, "strike_model": strike_model},
+                    duration
+                )
+                return state
+
             # Call Nemotron for risk reasoning
             prompt = f"""You are a bridge clearance safety expert.
 
 VEHICLE:
-- Height: {vehicle_height} inches ({vehicle_height/12:.1f} feet)
-- Uncertainty: ±{state.get('measurement_uncertainty', 3)} inches
-- Weather impact: {weather_impact} inches
+- Height: {height_bucket} inches ({height_bucket/12:.1f} feet)
+- Uncertainty: ±{uncertainty} inches
+- Weather impact: {weather_bucket} inches
 
 NEARBY BRIDGES:
-{json.dumps(bridges, indent=2)}
+{compact_json(prompt_bridges, BRIDGE_FIELDS)}
 
 TASK:
 Assess which bridges are dangerous for this vehicle.
@@ -437,35 +680,24 @@ Return ONLY valid JSON:
     }}
   ],
   "overall_risk": "SAFE/LOW/MEDIUM/HIGH/CRITICAL",
-  "strike_probability": 0.0-1.0,
   "detailed_reasoning": "overall safety assessment"
 }}"""
             
-            message = client.chat.completions.create(
-                model="nvidia/llama-3.1-nemotron-70b-instruct-v1",
-                max_tokens=2000,
-                messages=[{"role": "user", "content": prompt}]
+            result = call_nemotron_json(
+                state, agent_name, prompt,
+                max_tokens=max_tokens_for("risk_assessment_agent", len(prompt_bridges)),
+                fields=RISK_FIELDS,
+                call_site="risk_assessment_agent"
             )
-            
-            response_text = message.choices[0].message.content
-            if "```json" in response_text:
-                json_str = response_text.split("```json")[1].split("```")[0].strip()
-            else:
-                json_str = response_text.strip()
-            
-            result = json.loads(json_str)
-            
-            # Update state
-            state["dangerous_bridges"] = result.get("dangerous_bridges", [])
-            state["risk_level"] = result.get("overall_risk", "UNKNOWN")
-            state["strike_probability"] = result.get("strike_probability", 0.0)
-            state["risk_reasoning"] = result.get("detailed_reasoning")
+            if all(key in result for key in RISK_FIELDS):
+                risk_cache.put(cache_key, {key: result[key] for key in RISK_FIELDS})
+            strike_model = apply_strike_model(state, vehicle_height, bridges)
             
             duration = time.time() - start_time
             state = log_agent_action(
                 state, agent_name,
                 f"Risk: {state['risk_level']} ({len(state['dangerous_bridges'])} dangerous bridges)",
-                result,
+                {**result, "strike_model": strike_model},
                 duration
             )
             
@@ -487,23 +719,46 @@ Return ONLY valid JSON:
         
         try:
             state = log_agent_action(state, agent_name, "Generating recommendations")
-            
+
+            # Common outcomes come from templates; the LLM handles novel
+            # patterns and requests that asked for a narrative
+            if state.get("narrative"):
+                recommendation_counters.record_llm("narrative_requested")
+            else:
+                templated = template_recommendations(state)
+                if templated:
+                    pattern, result = templated
+                    for key, (state_key, default) in RECOMMENDATION_FIELDS.items():
+                        state[state_key] = result.get(key, default)
+                    recommendation_counters.record_template(pattern)
+                    duration = time.time() - start_time
+                    state = log_agent_action(
+                        state, agent_name,
+                        f"Recommendations generated from '{pattern}' template",
+                        result,
+                        duration
+                    )
+                    return state
+                recommendation_counters.record_llm("novel_pattern")
+            
+            analysis = {
+                'vehicle': {
+                    'type': state.get('vehicle_type'),
+                    'height': state.get('total_height_inches'),
+                    'equipment': select_fields(state.get('roof_equipment') or [], EQUIPMENT_FIELDS)
+                },
+                'location': (state.get('geocoding_result') or {}).get('place_name'),
+                'bridges_found': state.get('bridge_count'),
+                'dangerous_bridges': select_fields(state.get('dangerous_bridges') or [], DANGEROUS_BRIDGE_FIELDS),
+                'risk_level': state.get('risk_level'),
+                'weather': (state.get('weather_conditions') or {}).get('condition')
+            }
+
             # Call Nemotron to synthesize everything
             prompt = f"""You are a route safety advisor.
 
 COMPLETE ANALYSIS:
-{json.dumps({
-    'vehicle': {
-        'type': state.get('vehicle_type'),
-        'height': state.get('total_height_inches'),
-        'equipment': state.get('roof_equipment')
-    },
-    'location': state.get('geocoding_result', {}).get('place_name'),
-    'bridges_found': state.get('bridge_count'),
-    'dangerous_bridges': state.get('dangerous_bridges', []),
-    'risk_level': state.get('risk_level'),
-    'weather': state.get('weather_conditions', {}).get('condition')
-}, indent=2)}
+{compact_json(analysis)}
 
 TASK:
 Generate clear, actionable recommendations for the driver.
@@ -519,26 +774,13 @@ Return ONLY valid JSON:
   "summary": "2-3 sentence summary of the situation"
 }}"""
             
-            message = client.chat.completions.create(
-                model="nvidia/llama-3.1-nemotron-70b-instruct-v1",
-                max_tokens=1500,
-                messages=[{"role": "user", "content": prompt}]
+            result = call_nemotron_json(
+                state, agent_name, prompt,
+                max_tokens=max_tokens_for("recommendation_agent", len(analysis['dangerous_bridges']) + 2),
+                fields=RECOMMENDATION_FIELDS,
+                call_site="recommendation_agent"
             )
             
-            response_text = message.choices[0].message.content
-            if "```json" in response_text:
-                json_str = response_text.split("```json")[1].split("```")[0].strip()
-            else:
-                json_str = response_text.strip()
-            
-            result = json.loads(json_str)
-            
-            # Update state
-            state["recommendations"] = result.get("recommendations", [])
-            state["safe_routes"] = result.get("safe_routes", [])
-            state["avoid_routes"] = result.get("avoid_routes", [])
-            state["final_report"] = result.get("summary")
-            
             duration = time.time() - start_time
             state = log_agent_action(
                 state, agent_name,
@@ -552,4 +794,130 @@ Return ONLY valid JSON:
             duration = time.time() - start_time
             state = log_agent_action(state, agent_name, f"Failed: {str(e)}", None, duration)
         
-        return state
\ No newline at end of file
+        return state
+
+    @staticmethod
+    def vision_measurement_agent(state: AgentState) -> AgentState:
+        """
+        Fast profile Agent 1+2: Vision + Measurement
+        Looks up specs first, then identifies and measures the vehicle in one call
+        """
+        start_time = time.time()
+        agent_name = "VisionMeasurementAgent"
+
+        try:
+            state = log_agent_action(state, agent_name, "Starting combined image analysis and measurement")
+
+            if not state.get("image_base64"):
+                state["errors"].append("No image provided")
+                state["vehicle_detected"] = False
+                return state
+
+            # Spec lookup runs before the LLM call, from the caller's description if given
+            hint = state.get("vehicle_description")
+            vehicle_specs = tools.lookup_vehicle_specs(hint) if hint else {"found": False}
+            if vehicle_specs.get("found"):
+                specs = compact_json(vehicle_specs, SPEC_FIELDS)
+            else:
+                catalog = [
+                    {"name": e.get("name"), "base_height_inches": e.get("base_height_inches")}
+                    for e in get_vehicle_index().entries()
+                ]
+                specs = compact_json(trim_to_token_budget(catalog, CONTEXT_TOKEN_BUDGET))
+            state = log_agent_action(
+                state, agent_name,
+                f"Spec lookup: {vehicle_specs.get('vehicle_name') if vehicle_specs.get('found') else 'catalog reference table'}"
+            )
+
+            prompt = VISION_MEASUREMENT_PROMPT.format(specs=specs)
+            image_url = f"data:{state.get('image_media_type', 'image/jpeg')};base64,{state['image_base64']}"
+            result = call_nemotron_json(
+                state, agent_name, prompt,
+                max_tokens=max_tokens_for("vision_measurement_agent"),
+                fields=VISION_MEASUREMENT_FIELDS,
+                call_site="vision_measurement_agent",
+                image_url=image_url
+            )
+            state["vision_reasoning"] = state.get("measurement_reasoning")
+
+            duration = time.time() - start_time
+            state = log_agent_action(
+                state, agent_name,
+                f"Identified: {state['vehicle_type']}, height: {state['total_height_inches']} inches",
+                result,
+                duration
+            )
+
+        except Exception as e:
+            state["errors"].append(f"Vision measurement agent error: {str(e)}")
+            state["vehicle_detected"] = False
+            duration = time.time() - start_time
+            state = log_agent_action(state, agent_name, f"Failed: {str(e)}", None, duration)
+
+        return state
+
+    @staticmethod
+    def rule_based_risk_agent(state: AgentState) -> AgentState:
+        """
+        Fast profile Agent 6: Risk Assessment without an LLM call
+        Worst-case clearance margins per bridge
+        """
+        start_time = time.time()
+        agent_name = "RuleBasedRiskAgent"
+
+        try:
+            vehicle_height = state.get("total_height_inches")
+            bridges = state.get("nearby_bridges", [])
+
+            if not vehicle_height or not bridges:
+                state["dangerous_bridges"] = []
+                state["risk_level"] = "UNKNOWN"
+                return state
+
+            result = assess_risk(
+                vehicle_height,
+                bridges,
+                uncertainty=state.get("measurement_uncertainty", 3),
+                weather_impact=state.get("clearance_adjustment", 0)
+            )
+            for key, (state_key, default) in RISK_FIELDS.items():
+                state[state_key] = result.get(key, default)
+            result["strike_model"] = apply_strike_model(state, vehicle_height, bridges)
+
+            duration = time.time() - start_time
+            state = log_agent_action(
+                state, agent_name,
+                f"Risk: {state['risk_level']} ({len(state['dangerous_bridges'])} dangerous bridges)",
+                result,
+                duration
+            )
+
+        except Exception as e:
+            state["errors"].append(f"Rule-based risk agent error: {str(e)}")
+            duration = time.time() - start_time
+            state = log_agent_action(state, agent_name, f"Failed: {str(e)}", None, duration)
+
+        return state
+
+    @staticmethod
+    def rule_based_recommendation_agent(state: AgentState) -> AgentState:
+        """
+        Fast profile Agent 7: Recommendations without an LLM call
+        """
+        start_time = time.time()
+        agent_name = "RuleBasedRecommendationAgent"
+
+        try:
+            result = build_recommendations(state)
+            for key, (state_key, default) in RECOMMENDATION_FIELDS.items():
+                state[state_key] = result.get(key, default)
+
+            duration = time.time() - start_time
+            state = log_agent_action(state, agent_name, "Recommendations generated", result, duration)
+
+        except Exception as e:
+            state["errors"].append(f"Rule-based recommendation agent error: {str(e)}")
+            duration = time.time() - start_time
+            state = log_agent_action(state, agent_name, f"Failed: {str(e)}", None, duration)
+
+        return state
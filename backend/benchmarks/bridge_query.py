@@ -0,0 +1,86 @@
+"""
+Bridge database query benchmark: indexed keyset pages vs filter-and-sort per request
+
+Run from backend/:  python -m benchmarks.bridge_query
+"""
+import random
+import time
+from tools.bridge_query import BridgeIndex, SORT_FIELDS
+
+SEED = 42
+BRIDGE_COUNT = 600000
+PAGE_SIZE = 50
+REPEATS = 200
+# Continental US bounding box
+LAT_RANGE = (25.0, 49.0)
+LON_RANGE = (-124.0, -67.0)
+
+def make_bridges(rng: random.Random):
+    return [
+        {
+            "bridge_id": f"synthetic_{i:06d}",
+            "name": f"Bridge {i}",
+            "road_name": f"Route {rng.randint(1, 999)}",
+            "latitude": rng.uniform(*LAT_RANGE),
+            "longitude": rng.uniform(*LON_RANGE),
+            "clearance_inches": rng.randint(120, 240),
+            "incident_count": int(rng.expovariate(0.5)),
+            "warnings": []
+        }
+        for i in range(BRIDGE_COUNT)
+    ]
+
+def naive_page(bridges, sort_field, descending, predicate):
+    """What the Bridge Database page did in the browser: filter, sort, slice"""
+    key = SORT_FIELDS[sort_field]
+    rows = sorted((b for b in bridges if predicate(b)), key=lambda b: (key(b), b["bridge_id"]), reverse=descending)
+    return rows[:PAGE_SIZE]
+
+def timed_ms(fn, repeats=REPEATS):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1000
+
+def main():
+    rng = random.Random(SEED)
+    bridges = make_bridges(rng)
+
+    start = time.perf_counter()
+    index = BridgeIndex(bridges, version=1)
+    build_seconds = time.perf_counter() - start
+
+    # Walk 20 pages deep, then time the next page from that cursor
+    cursor = None
+    for _ in range(20):
+        cursor = index.query(sort="-incidents", limit=PAGE_SIZE, cursor=cursor)["next_cursor"]
+
+    cases = [
+        ("first page, -incidents", dict(sort="-incidents"),
+         ("incidents", True, lambda b: True)),
+        ("page 21, -incidents", dict(sort="-incidents", cursor=cursor), None),
+        ("clearance 150-160\", by clearance", dict(sort="clearance", min_clearance=150, max_clearance=160),
+         ("clearance", False, lambda b: 150 <= b["clearance_inches"] <= 160)),
+        ("25 mi radius, by clearance", dict(sort="clearance", near=(40.7, -74.0, 25.0)), None),
+        ("state-sized bbox, -incidents", dict(sort="-incidents", bbox=(40.5, -80.5, 42.0, -75.0)),
+         ("incidents", True, lambda b: 40.5 <= b["latitude"] <= 42.0 and -80.5 <= b["longitude"] <= -75.0)),
+    ]
+
+    print(f"Index build: {BRIDGE_COUNT} bridges in {build_seconds:.2f} s")
+    for label, params, naive in cases:
+        indexed_ms = timed_ms(lambda: index.query(limit=PAGE_SIZE, **params))
+        line = f"{label:36s} {indexed_ms:8.3f} ms"
+        if naive:
+            naive_ms = timed_ms(lambda: naive_page(bridges, *naive), repeats=3)
+            line += f"   (filter+sort: {naive_ms:.0f} ms)"
+        print(line)
+
+    # A recorded strike: one bridge's incident count goes up by one
+    patched = rng.sample(bridges, REPEATS)
+    start = time.perf_counter()
+    for version, bridge in enumerate(patched, start=2):
+        index.patch([{**bridge, "recorded_incidents": 1}], version)
+    print(f"Incident count patch: {(time.perf_counter() - start) / REPEATS * 1000:.1f} ms (full rebuild: {build_seconds:.2f} s)")
+
+if __name__ == "__main__":
+    main()
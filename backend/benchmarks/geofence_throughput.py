@@ -0,0 +1,76 @@
+"""
+Fleet geofence throughput benchmark
+
+Run from backend/:  python -m benchmarks.geofence_throughput
+Single process, so the reported fixes/sec is a per-core figure.
+"""
+import random
+import time
+from tools.geofence import GeofenceEngine, HEIGHT_CLASSES
+
+SEED = 42
+BRIDGE_COUNT = 20000
+VEHICLE_COUNT = 5000
+TICKS = 20
+# Continental US bounding box
+LAT_RANGE = (25.0, 49.0)
+LON_RANGE = (-124.0, -67.0)
+
+def make_bridges(rng: random.Random):
+    return [
+        {
+            "bridge_id": f"synthetic_{i:06d}",
+            "name": f"Synthetic Bridge {i}",
+            "latitude": rng.uniform(*LAT_RANGE),
+            "longitude": rng.uniform(*LON_RANGE),
+            "clearance_inches": rng.randint(120, 200)
+        }
+        for i in range(BRIDGE_COUNT)
+    ]
+
+def main():
+    rng = random.Random(SEED)
+    bridges = make_bridges(rng)
+
+    start = time.perf_counter()
+    engine = GeofenceEngine(bridges)
+    build_seconds = time.perf_counter() - start
+
+    # Half the fleet starts next to a bridge so zone checks actually happen
+    positions = {}
+    class_heights = list(HEIGHT_CLASSES.values())
+    for v in range(VEHICLE_COUNT):
+        vehicle_id = f"truck_{v:05d}"
+        engine.register_vehicle(vehicle_id, rng.choice(class_heights) - rng.randint(0, 10))
+        if v % 2 == 0:
+            b = rng.choice(bridges)
+            positions[vehicle_id] = [b["latitude"] + rng.uniform(-0.01, 0.01), b["longitude"] + rng.uniform(-0.01, 0.01)]
+        else:
+            positions[vehicle_id] = [rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)]
+
+    batches = []
+    for _ in range(TICKS):
+        batch = []
+        for vehicle_id, pos in positions.items():
+            pos[0] += rng.uniform(-0.001, 0.001)
+            pos[1] += rng.uniform(-0.001, 0.001)
+            batch.append((vehicle_id, pos[0], pos[1]))
+        batches.append(batch)
+
+    events = 0
+    start = time.perf_counter()
+    for batch in batches:
+        events += len(engine.process_batch(batch))
+    elapsed = time.perf_counter() - start
+    fixes = VEHICLE_COUNT * TICKS
+
+    print("🚚 Fleet Geofence Benchmark")
+    print("=" * 50)
+    print(f"Bridges: {BRIDGE_COUNT}, zones: {engine.zone_count} (built in {build_seconds * 1000:.0f} ms)")
+    print(f"Vehicles: {VEHICLE_COUNT}, ticks: {TICKS}, fixes: {fixes}")
+    print(f"Events emitted: {events}")
+    print(f"Per-tick latency: {elapsed / TICKS * 1000:.1f} ms")
+    print(f"Throughput: {fixes / elapsed:,.0f} fixes/sec per core")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Hazard tile build, incremental rebuild and serve benchmark
+
+Run from backend/:  python -m benchmarks.hazard_tiles
+"""
+import csv
+import os
+import random
+import tempfile
+import time
+from tools.bridge_store import BridgeStore, CSV_FIELDS
+from tools.hazard_tiles import HazardTileSet, HEIGHT_CLASS_NAMES, tile_for
+
+SEED = 42
+BRIDGE_COUNT = 20000
+EDITS = 10
+SERVE_REQUESTS = 50000
+# Continental US bounding box
+LAT_RANGE = (25.0, 49.0)
+LON_RANGE = (-124.0, -67.0)
+
+def make_bridges(rng: random.Random):
+    return [
+        {
+            "bridge_id": f"synthetic_{i:06d}",
+            "name": f"Bridge {i}",
+            "latitude": rng.uniform(*LAT_RANGE),
+            "longitude": rng.uniform(*LON_RANGE),
+            "clearance_inches": rng.randint(120, 200),
+            "incident_count": rng.randint(0, 20),
+            "confidence": 1.0,
+            "warnings": ""
+        }
+        for i in range(BRIDGE_COUNT)
+    ]
+
+def make_store(bridges, directory: str) -> BridgeStore:
+    path = os.path.join(directory, "bridges.csv")
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(bridges)
+    return BridgeStore(path)
+
+def timed(fn) -> tuple:
+    """(result, milliseconds)"""
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+def main():
+    rng = random.Random(SEED)
+    bridges = make_bridges(rng)
+    with tempfile.TemporaryDirectory() as directory:
+        store = make_store(bridges, directory)
+
+    start = time.perf_counter()
+    tiles = HazardTileSet(())
+    tiles.sync(store)
+    build_seconds = time.perf_counter() - start
+    stats = tiles.stats()
+
+    # A sign ingestion batch that corrects a handful of clearances: sync() diffs only
+    # the edited bridges; apply() on the whole list is the full diff it replaces
+    def edit():
+        store.upsert([{**b, "clearance_inches": b["clearance_inches"] - 12} for b in rng.sample(store.all(), EDITS)])
+    edit()
+    rebuilt, rebuild_ms = timed(lambda: tiles.sync(store))
+    edit()
+    full_rebuilt, full_ms = timed(lambda: tiles.apply(store.all()))
+    tiles.store_version = store.version  # apply() doesn't track the store; mark it caught up
+    # One recorded strike
+    store.set_recorded_incidents({rng.choice(bridges)["bridge_id"]: 10})
+    incident_rebuilt, incident_ms = timed(lambda: tiles.sync(store))
+
+    # Serve tiles at city zoom around random bridges
+    requests = []
+    for bridge in rng.choices(bridges, k=SERVE_REQUESTS):
+        requests.append((rng.choice(HEIGHT_CLASS_NAMES), *tile_for(bridge["latitude"], bridge["longitude"], 12)))
+    start = time.perf_counter()
+    served = sum(len(tiles.get(*request)[0]) for request in requests)
+    serve_us = (time.perf_counter() - start) / SERVE_REQUESTS * 1e6
+
+    print(f"Full build: {BRIDGE_COUNT} bridges, zooms {stats['min_zoom']}-{stats['max_zoom']}, "
+          f"{stats['tiles']} tiles in {build_seconds:.2f} s")
+    print(f"Incremental rebuild after {EDITS} edits: {rebuilt} tiles in {rebuild_ms:.1f} ms "
+          f"(full diff: {full_rebuilt} tiles in {full_ms:.1f} ms)")
+    print(f"One incident count change: {incident_rebuilt} tiles in {incident_ms:.1f} ms")
+    print(f"Serve: {serve_us:.1f} µs per tile, avg {served / SERVE_REQUESTS:.0f} bytes at z12")
+
+if __name__ == "__main__":
+    main()
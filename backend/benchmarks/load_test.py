@@ -0,0 +1,548 @@
+"""
+Load test: how many concurrent drivers one deploy handles
+
+Replays a weighted mix of the driver-facing endpoints with closed-loop
+virtual drivers (each sends its next request as soon as the last one
+returns), stepping the driver count up until every endpoint saturates.
+
+By default it starts its own server, one uvicorn worker like a deploy, in a
+subprocess whose upstreams are local stand-ins: the LLM streams canned JSON
+and Mapbox / Overpass / OpenWeather return synthetic payloads, all with
+lognormal latency (and optional injected failures). No API keys, no cost. The server
+inherits the environment, so LLM_REQUESTS_PER_MINUTE, LLM_MAX_CONCURRENCY etc.
+apply exactly as they would in production.
+
+Run from backend/:  python -m benchmarks.load_test
+    --drivers 1,2,4,8,16,32    driver counts to step through
+    --duration 60              seconds per step
+    --mix check-clearance=4,analyze-vehicle=3
+    --slo analyze-vehicle=30   p95 seconds before an endpoint counts as saturated
+    --latency-scale 0.25       shrink every stand-in latency, for quick runs
+    --upstream-error-rate 0.01 fail this fraction of upstream calls
+    --url http://host:8000     drive an existing deploy (and its real upstreams) instead
+    --json report.json         write every step's numbers
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+from typing import Any, Dict, List, Optional, Tuple
+
+SEED = 42
+
+# Endpoint mix: relative weights of what drivers send
+DEFAULT_MIX = {
+    "check-clearance": 4,
+    "analyze-vehicle": 3,
+    "plan-route": 1,
+    "analyze-bridge-sign": 1,
+    "analyze-incident": 1
+}
+# p95 latency in seconds past which an endpoint is saturated
+DEFAULT_SLO_SECONDS = {
+    "check-clearance": 10,
+    "analyze-vehicle": 30,
+    "plan-route": 45,
+    "analyze-bridge-sign": 10,
+    "analyze-incident": 15
+}
+DEFAULT_DRIVERS = (1, 2, 4, 8, 16, 32, 64)
+STEP_SECONDS = 60
+# Saturated once doubling the drivers adds less than this much throughput
+MIN_THROUGHPUT_GAIN = 0.1
+MAX_ERROR_RATE = 0.01
+# Steps with fewer requests than this for an endpoint are too noisy to judge
+MIN_SAMPLES = 20
+REQUEST_TIMEOUT_SECONDS = 180
+
+# Stand-in upstream latency, lognormal: (median, p95) seconds
+UPSTREAM_LATENCY = {
+    "llm_first_token": (0.6, 2.0),
+    "llm_first_token_vision": (1.2, 3.5),
+    "mapbox_geocoding": (0.12, 0.4),
+    "overpass": (0.9, 4.0),
+    "openweather": (0.15, 0.5),
+    "openweather_forecast": (0.2, 0.6)
+}
+LLM_TOKENS_PER_SECOND = 100
+# Injected upstream failures (503s, raised LLM errors); off so errors measure the app itself
+UPSTREAM_ERROR_RATE = 0.0
+# Typical completion length per prompt, in tokens
+COMPLETION_TOKENS = {
+    "vision": 250, "vision_measurement": 300, "measurement": 200, "risk": 300,
+    "recommendation": 250, "check_clearance": 350, "plan_route": 1400,
+    "incident": 500, "bridge_sign": 250
+}
+# Phone photo sizes, lognormal (median, p95) KB
+PHOTO_KB = (400, 2500)
+PHOTO_VARIANTS = 8
+
+CITIES = {
+    "Boston, MA": (42.36, -71.06),
+    "New York, NY": (40.71, -74.01),
+    "Durham, NC": (35.99, -78.90),
+    "Chicago, IL": (41.88, -87.63),
+    "Philadelphia, PA": (39.95, -75.17),
+    "Baltimore, MD": (39.29, -76.61)
+}
+
+def lognormal(rng: random.Random, median: float, p95: float) -> float:
+    return median * math.exp(rng.gauss(0, 1) * math.log(p95 / median) / 1.645)
+
+# ============= STAND-IN UPSTREAMS (server process) =============
+
+def _height_feet_inches(inches: int) -> str:
+    return f"{inches // 12}'{inches % 12}\""
+
+def llm_reply(kind: str, rng: random.Random) -> Dict[str, Any]:
+    """Canned reply for a prompt kind, with the vehicle height varied so caches see real traffic"""
+    base = rng.randint(120, 160)
+    equipment = rng.choice([0, 4, 8, 12])
+    total = base + equipment
+    if kind in ("vision", "vision_measurement", "measurement"):
+        reply = {
+            "vehicle_detected": True,
+            "vehicle_type": rng.choice(["U-Haul 15' box truck", "Ford Transit high roof", "Freightliner M2"]),
+            "visible_items": [{"item": "AC unit", "height_estimate_inches": equipment, "estimation_confidence": 0.8}],
+            "base_height_estimate_inches": base,
+            "total_height_estimate_inches": total,
+            "overall_confidence": 0.8,
+            "base_height_inches": base,
+            "base_height_source": "combined",
+            "roof_equipment": [{"item": "AC unit", "height_added_inches": equipment,
+                                "source": "visual_measurement", "confidence": 0.8}],
+            "total_height_inches": total,
+            "uncertainty_inches": rng.choice([2, 3, 4]),
+            "reasoning": "Wheel and door proportions against the catalog height"
+        }
+    elif kind == "risk":
+        reply = {
+            "dangerous_bridges": [{"bridge_name": "Storrow Drive Overpass", "clearance": "10'6\"",
+                                   "risk_level": "CRITICAL", "reasoning": "Below the vehicle height"}],
+            "overall_risk": rng.choice(["LOW", "MEDIUM", "HIGH", "CRITICAL"]),
+            "detailed_reasoning": "Compared the vehicle height with each posted clearance"
+        }
+    elif kind == "recommendation":
+        reply = {"recommendations": ["Avoid Storrow Drive"], "safe_routes": ["I-93"],
+                 "avoid_routes": ["Storrow Drive"], "summary": "Take the interstate"}
+    elif kind == "check_clearance":
+        margin = rng.randint(-12, 24)
+        reply = {
+            "will_fit": "yes" if margin > 6 else "marginal" if margin > 0 else "no",
+            "margins": {"nominal_inches": margin, "worst_case_inches": margin - 6, "comfortable_clearance": margin > 12},
+            "risk_level": "SAFE" if margin > 12 else "HIGH" if margin > 0 else "CRITICAL",
+            "strike_probability": 0.02 if margin > 12 else 0.4 if margin > 0 else 0.97,
+            "recommendation": {"action": "proceed" if margin > 6 else "avoid",
+                               "explanation": "Margin after suspension bounce and resurfacing"},
+            "warnings": [],
+            "detailed_analysis": "Nominal margin less worst-case losses"
+        }
+    elif kind == "plan_route":
+        reply = {
+            "routes": [
+                {"name": f"Route {grade}", "safety_grade": grade, "distance_miles": rng.randint(80, 400),
+                 "duration_hours": round(rng.uniform(2, 8), 1), "minimum_clearance": clearance,
+                 "key_bridges": [{"name": "Storrow Drive", "clearance_inches": clearance,
+                                  "margin_inches": clearance - total, "risk": risk}]}
+                for grade, clearance, risk in (("A", 170, "SAFE"), ("C", 150, "CAUTION"), ("F", 126, "DANGER"))
+            ],
+            "overall_recommendation": {"best_route": "Route A", "why": "Interstate clearances only"}
+        }
+    elif kind == "incident":
+        reply = {
+            "damage_assessment": {"severity": rng.choice(["minor", "moderate", "severe"]),
+                                  "damage_type": "roof_peel", "vehicle_likely_driveable": True},
+            "incident_analysis": {"impact_point_inches": total, "was_avoidable": True},
+            "lessons_learned": ["Measure the roof equipment"],
+            "visual_description": "Peeled roof on a box truck"
+        }
+    else:
+        clearance = rng.randint(126, 192)
+        reply = {
+            "clearances_found": [{"clearance_inches": clearance, "clearance_display": _height_feet_inches(clearance),
+                                  "applies_to": "all lanes", "sign_condition": "clear", "confidence": 0.9}],
+            "minimum_clearance": clearance,
+            "warnings": [],
+            "sign_analysis": "One posted clearance sign"
+        }
+    return reply
+
+def prompt_kind(text: str) -> str:
+    markers = (
+        ("analyzing vehicle dimensions", "vision"),
+        ("measuring vehicle height", "vision_measurement"),
+        ("measurement expert", "measurement"),
+        ("route planning expert", "plan_route"),
+        ("route safety advisor", "recommendation"),
+        ("bridge strike incident", "incident"),
+        ("bridge clearance sign", "bridge_sign"),
+        ("SCENARIO:", "check_clearance"),
+        ("bridge clearance safety expert", "risk")
+    )
+    for marker, kind in markers:
+        if marker in text:
+            return kind
+    return "recommendation"
+
+class StandInCompletions:
+    """chat.completions stand-in: streams a canned reply at LLM speed"""
+
+    def __init__(self, scale: float, error_rate: float, seed: int):
+        self.scale = scale
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def create(self, **kwargs):
+        content = kwargs["messages"][0]["content"]
+        vision = not isinstance(content, str)
+        text = content if not vision else next(part["text"] for part in content if part["type"] == "text")
+        kind = prompt_kind(text)
+        with self._lock:
+            failed = self._rng.random() < self.error_rate
+            first_token = lognormal(self._rng, *UPSTREAM_LATENCY["llm_first_token_vision" if vision else "llm_first_token"])
+            tokens = max(20, int(lognormal(self._rng, COMPLETION_TOKENS[kind], COMPLETION_TOKENS[kind] * 2)))
+            body = "```json\n" + json.dumps(llm_reply(kind, self._rng)) + "\n```\nLet me know if you need more detail."
+        if failed:
+            time.sleep(first_token * self.scale)
+            raise RuntimeError("Stand-in LLM upstream returned 503")
+        usage = types.SimpleNamespace(prompt_tokens=len(text) // 4, completion_tokens=tokens,
+                                      total_tokens=len(text) // 4 + tokens)
+        if not kwargs.get("stream"):
+            time.sleep((first_token + tokens / LLM_TOKENS_PER_SECOND) * self.scale)
+            message = types.SimpleNamespace(content=body)
+            return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)], usage=usage)
+
+        chunk_chars = 16
+        chunk_seconds = tokens / LLM_TOKENS_PER_SECOND / math.ceil(len(body) / chunk_chars) * self.scale
+
+        def stream():
+            time.sleep(first_token * self.scale)
+            for i in range(0, len(body), chunk_chars):
+                delta = types.SimpleNamespace(content=body[i:i + chunk_chars])
+                yield types.SimpleNamespace(choices=[types.SimpleNamespace(delta=delta)], usage=None)
+                time.sleep(chunk_seconds)
+            yield types.SimpleNamespace(choices=[], usage=usage)
+        return stream()
+
+class StandInResponse:
+    def __init__(self, status_code: int, payload: Dict[str, Any]):
+        self.status_code = status_code
+        self._payload = payload
+
+    def json(self) -> Dict[str, Any]:
+        return self._payload
+
+class StandInHTTP:
+    """The `requests` surface tools.external_tools uses, answering Mapbox / Overpass / OpenWeather"""
+
+    def __init__(self, scale: float, error_rate: float, seed: int):
+        self.scale = scale
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _respond(self, upstream: str, payload) -> StandInResponse:
+        with self._lock:
+            delay = lognormal(self._rng, *UPSTREAM_LATENCY[upstream]) * self.scale
+            failed = self._rng.random() < self.error_rate
+            body = payload(self._rng)
+        time.sleep(delay)
+        return StandInResponse(503, {}) if failed else StandInResponse(200, body)
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, timeout: float = None) -> StandInResponse:
+        params = params or {}
+        if "mapbox.places" in url:
+            place = url.rsplit("/", 1)[-1][:-len(".json")]
+            lat, lon = CITIES.get(place, CITIES["Boston, MA"])
+            return self._respond("mapbox_geocoding", lambda rng: {"features": [{
+                "geometry": {"coordinates": [lon + rng.uniform(-0.05, 0.05), lat + rng.uniform(-0.05, 0.05)]},
+                "place_name": place
+            }]})
+        if url.endswith("/forecast"):
+            start = int(time.time()) // 10800 * 10800
+            return self._respond("openweather_forecast", lambda rng: {"list": [
+                {"dt": start + i * 10800, "weather": [{"main": rng.choice(["Clear", "Clouds", "Rain", "Snow"]),
+                                                       "description": "stand-in"}],
+                 "main": {"temp": rng.uniform(20, 80)}}
+                for i in range(40)
+            ]})
+        return self._respond("openweather", lambda rng: {
+            "weather": [{"main": rng.choice(["Clear", "Clouds", "Rain", "Snow"]), "description": "stand-in"}],
+            "main": {"temp": rng.uniform(20, 80)}
+        })
+
+    def post(self, url: str, data: Any = None, timeout: float = None) -> StandInResponse:
+        return self._respond("overpass", lambda rng: {"elements": [
+            {"type": "way", "id": 1000 + i, "tags": {
+                "bridge": "yes", "name": f"Stand-in Bridge {i}",
+                "maxheight": _height_feet_inches(rng.randint(120, 192))
+            }}
+            for i in range(rng.randint(0, 15))
+        ]})
+
+def serve(port: int, scale: float, error_rate: float, seed: int) -> None:
+    """Run the app with stand-in upstreams installed (the subprocess side)"""
+    os.environ.setdefault("NVIDIA_API_KEY", "stand-in")
+    import uvicorn
+    import main
+    import tools.external_tools as external_tools
+    from services.llm_client import LLM_ENDPOINTS, set_llm_client
+
+    completions = StandInCompletions(scale, error_rate, seed)
+    client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions))
+    for name in LLM_ENDPOINTS:
+        set_llm_client(name, client)
+    http = StandInHTTP(scale, error_rate, seed + 1)
+    external_tools._http = lambda: http
+    external_tools.MAPBOX_TOKEN = external_tools.OPENWEATHER_KEY = "stand-in"
+    uvicorn.run(main.app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+# ============= LOAD GENERATOR =============
+
+def make_photos(rng: random.Random) -> List[bytes]:
+    """A few JPEG-sized payloads; the app only base64-encodes them"""
+    sizes = [min(int(lognormal(rng, *PHOTO_KB) * 1024), 9 * 1024 * 1024) for _ in range(PHOTO_VARIANTS)]
+    return [b"\xff\xd8\xff\xe0" + rng.randbytes(size) for size in sizes]
+
+def make_request(endpoint: str, rng: random.Random, photos: List[bytes]) -> Dict[str, Any]:
+    """httpx.request() arguments for one driver request"""
+    height = rng.randint(120, 162)
+    city, other = rng.sample(sorted(CITIES), 2)
+    photo = {"file": ("photo.jpg", rng.choice(photos), "image/jpeg")}
+    if endpoint == "check-clearance":
+        return {"json": {"vehicle_height_inches": height, "bridge_name": "Stand-in Bridge",
+                         "bridge_clearance_inches": rng.randint(126, 192)}}
+    if endpoint == "plan-route":
+        return {"json": {"vehicle_height_inches": height, "origin": city, "destination": other}}
+    if endpoint == "analyze-vehicle":
+        return {"files": photo, "params": {"location": city}}
+    if endpoint == "analyze-incident":
+        return {"files": photo, "params": {"vehicle_height": height, "bridge_clearance": height - rng.randint(1, 12)}}
+    return {"files": photo}
+
+def request_failed(endpoint: str, status: int, body: Any) -> bool:
+    """Non-2xx, or a 200 carrying an upstream failure (call_nemotron returns "Error: ..." text)"""
+    if status >= 400 or not isinstance(body, dict):
+        return True
+    if endpoint == "analyze-vehicle":
+        return not body.get("success")
+    return str(body.get("raw", "")).startswith("Error:")
+
+async def run_step(client, base_url: str, drivers: int, duration: float, mix: Dict[str, float],
+                   rng: random.Random, photos: List[bytes]) -> List[Tuple[str, float, bool, bool]]:
+    """
+    Closed loop: each driver sends requests back to back until the step ends
+    Returns [(endpoint, seconds, ok, finished inside the step)]; requests still
+    in flight at the end are waited for, so their latency counts too.
+    """
+    endpoints, weights = list(mix), list(mix.values())
+    samples: List[Tuple[str, float, bool, bool]] = []
+    start = time.perf_counter()
+    deadline = start + duration
+
+    async def driver():
+        while time.perf_counter() < deadline:
+            endpoint = rng.choices(endpoints, weights)[0]
+            sent = time.perf_counter()
+            try:
+                response = await client.post(f"{base_url}/{endpoint}", **make_request(endpoint, rng, photos))
+                try:
+                    body = response.json()
+                except ValueError:
+                    body = None
+                ok = not request_failed(endpoint, response.status_code, body)
+            except Exception:
+                ok = False
+            done = time.perf_counter()
+            samples.append((endpoint, done - sent, ok, done <= deadline))
+
+    await asyncio.gather(*(driver() for _ in range(drivers)))
+    return samples
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+def summarize(samples: List[Tuple[str, float, bool, bool]], duration: float) -> Dict[str, Any]:
+    """Latency percentiles, throughput (completions inside the step) and error rate for one set of samples"""
+    latencies = sorted(sample[1] for sample in samples)
+    errors = sum(1 for sample in samples if not sample[2])
+    return {
+        "requests": len(samples),
+        "throughput_rps": round(sum(1 for sample in samples if sample[3]) / duration, 3),
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "p50_seconds": round(percentile(latencies, 0.50), 3),
+        "p95_seconds": round(percentile(latencies, 0.95), 3),
+        "p99_seconds": round(percentile(latencies, 0.99), 3)
+    }
+
+def saturation_point(steps: List[Dict[str, Any]], slo_seconds: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """
+    First step where the endpoint stops scaling: errors past MAX_ERROR_RATE,
+    p95 past its SLO, or throughput up less than MIN_THROUGHPUT_GAIN on the best so far
+    Steps with fewer than MIN_SAMPLES requests are skipped.
+    """
+    best = 0.0
+    for stats in steps:
+        if stats["requests"] < MIN_SAMPLES:
+            continue
+        reasons = []
+        if stats["error_rate"] > MAX_ERROR_RATE:
+            reasons.append(f"error rate {stats['error_rate']:.1%}")
+        if slo_seconds is not None and stats["p95_seconds"] > slo_seconds:
+            reasons.append(f"p95 {stats['p95_seconds']:.1f}s > {slo_seconds:g}s SLO")
+        if best and stats["throughput_rps"] < best * (1 + MIN_THROUGHPUT_GAIN):
+            reasons.append(f"throughput flat at {stats['throughput_rps']:.2f}/s")
+        if reasons:
+            return {"drivers": stats["drivers"], "reasons": reasons}
+        best = max(best, stats["throughput_rps"])
+    return None
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_server(args) -> Tuple[subprocess.Popen, str, str]:
+    """Stand-in-upstream server subprocess; (process, base url, log path)"""
+    port = free_port()
+    workdir = tempfile.mkdtemp(prefix="bridgeguardian-load-")
+    env = dict(os.environ)
+    # Keep load-test incidents and checkpoints out of the real databases
+    env.setdefault("INCIDENT_DB_PATH", os.path.join(workdir, "incidents.db"))
+    env.setdefault("CHECKPOINT_DB_PATH", os.path.join(workdir, "checkpoints.db"))
+    log_path = os.path.join(workdir, "server.log")
+    with open(log_path, "w") as log:
+        process = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.load_test", "--serve", "--port", str(port),
+             "--latency-scale", str(args.latency_scale), "--upstream-error-rate", str(args.upstream_error_rate)],
+            stdout=log, stderr=subprocess.STDOUT, env=env
+        )
+    return process, f"http://127.0.0.1:{port}", log_path
+
+async def wait_until_ready(client, base_url: str, timeout: float = 60) -> None:
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            if (await client.get(f"{base_url}/")).status_code == 200:
+                return
+        except Exception:
+            if time.perf_counter() > deadline:
+                raise
+        await asyncio.sleep(0.2)
+
+def parse_weights(text: Optional[str], defaults: Dict[str, float]) -> Dict[str, float]:
+    """"a=3,b=1" over the defaults; endpoints must be ones the harness knows how to call"""
+    values = dict(defaults)
+    for item in filter(None, (text or "").split(",")):
+        name, _, value = item.partition("=")
+        if name.strip() not in DEFAULT_MIX:
+            raise SystemExit(f"Unknown endpoint '{name}'. Options: {', '.join(DEFAULT_MIX)}")
+        values[name.strip()] = float(value)
+    return values
+
+def print_step(drivers: int, overall: Dict[str, Any], by_endpoint: Dict[str, Dict[str, Any]],
+               scheduler: Optional[Dict[str, Any]]) -> None:
+    line = (f"{drivers:3d} drivers: {overall['throughput_rps']:6.2f} req/s  p50 {overall['p50_seconds']:6.2f}s  "
+            f"p95 {overall['p95_seconds']:6.2f}s  p99 {overall['p99_seconds']:6.2f}s  errors {overall['error_rate']:.1%}")
+    if scheduler:
+        waits = [c["queue_wait_ms"]["p95"] for c in scheduler["classes"].values()]
+        line += f"  LLM queue p95 {max(waits) / 1000:.1f}s"
+    print(line)
+    for endpoint, stats in by_endpoint.items():
+        print(f"      {endpoint:20s} {stats['requests']:5d} req {stats['throughput_rps']:6.2f}/s  "
+              f"p50 {stats['p50_seconds']:6.2f}s  p95 {stats['p95_seconds']:6.2f}s  "
+              f"p99 {stats['p99_seconds']:6.2f}s  errors {stats['error_rate']:.1%}")
+
+async def drive(args, base_url: str) -> Dict[str, Any]:
+    import httpx
+
+    rng = random.Random(SEED)
+    photos = make_photos(rng)
+    mix = {name: weight for name, weight in parse_weights(args.mix, DEFAULT_MIX).items() if weight > 0}
+    slos = parse_weights(args.slo, DEFAULT_SLO_SECONDS)
+    driver_counts = [int(d) for d in args.drivers.split(",")]
+    limits = httpx.Limits(max_connections=max(driver_counts), max_keepalive_connections=max(driver_counts))
+    report: Dict[str, Any] = {"mix": mix, "slo_seconds": {e: slos[e] for e in mix}, "steps": []}
+
+    async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT_SECONDS, limits=limits) as client:
+        await wait_until_ready(client, base_url)
+        for drivers in driver_counts:
+            samples = await run_step(client, base_url, drivers, args.duration, mix, rng, photos)
+            by_endpoint = {
+                endpoint: {"drivers": drivers, **summarize([s for s in samples if s[0] == endpoint], args.duration)}
+                for endpoint in mix
+            }
+            overall = {"drivers": drivers, **summarize(samples, args.duration)}
+            try:
+                scheduler = (await client.get(f"{base_url}/llm/scheduler")).json()
+            except Exception:
+                scheduler = None
+            print_step(drivers, overall, by_endpoint, scheduler)
+            report["steps"].append({"drivers": drivers, "overall": overall, "endpoints": by_endpoint,
+                                    "llm_scheduler": scheduler})
+            saturated = [saturation_point([s["endpoints"][e] for s in report["steps"]], slos[e]) for e in mix]
+            if all(saturated):
+                break
+
+    report["saturation"] = {"overall": saturation_point([s["overall"] for s in report["steps"]])}
+    for endpoint in mix:
+        report["saturation"][endpoint] = saturation_point([s["endpoints"][endpoint] for s in report["steps"]], slos[endpoint])
+    print(f"\nSaturation (first driver count that stops scaling; needs {MIN_SAMPLES}+ requests per step):")
+    for name, point in report["saturation"].items():
+        steps = [s["overall"] if name == "overall" else s["endpoints"][name] for s in report["steps"]]
+        if point:
+            print(f"  {name:20s} {point['drivers']:3d} drivers ({'; '.join(point['reasons'])})")
+        elif max(step["requests"] for step in steps) < MIN_SAMPLES:
+            print(f"  {name:20s} too few requests to judge (raise its --mix weight or --duration)")
+        else:
+            print(f"  {name:20s} not reached by {report['steps'][-1]['drivers']} drivers")
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-driver load test")
+    parser.add_argument("--drivers", default=",".join(str(d) for d in DEFAULT_DRIVERS))
+    parser.add_argument("--duration", type=float, default=STEP_SECONDS)
+    parser.add_argument("--mix")
+    parser.add_argument("--slo")
+    parser.add_argument("--latency-scale", type=float, default=1.0)
+    parser.add_argument("--upstream-error-rate", type=float, default=UPSTREAM_ERROR_RATE)
+    parser.add_argument("--url")
+    parser.add_argument("--json")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port, args.latency_scale, args.upstream_error_rate, SEED)
+        return
+
+    process = None
+    base_url = args.url.rstrip("/") if args.url else None
+    if base_url is None:
+        process, base_url, log_path = start_server(args)
+        print(f"Stand-in upstreams (latency x{args.latency_scale:g}, {args.upstream_error_rate:.1%} errors); "
+              f"server log {log_path}")
+    try:
+        report = asyncio.run(drive(args, base_url))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Route geometry benchmark: payload size per zoom, codec speed, and
+distance-along-route lookups (binary search vs walking the line)
+
+Run from backend/:  python -m benchmarks.route_geometry
+"""
+import json
+import math
+import random
+import time
+from tools.geo import haversine_miles
+from tools.route_geometry import RouteGeometry, SIMPLIFY_METHODS, decode_polyline, encode_polyline, simplify
+
+SEED = 42
+# About what Mapbox returns with overview=full for an 800-mile drive
+POINT_COUNT = 20000
+ZOOMS = (6, 10, 14)
+LOOKUPS = 2000
+
+def make_route(rng: random.Random):
+    """A wandering road heading southwest from Boston, with GPS-scale jitter"""
+    lat, lon = 42.36, -71.06
+    points = []
+    for i in range(POINT_COUNT):
+        lat -= 0.0004 + rng.uniform(-0.0001, 0.0001)
+        lon -= 0.0005 + 0.0003 * math.sin(i / 50) + rng.uniform(-0.00005, 0.00005)
+        points.append((round(lat, 6), round(lon, 6)))
+    return points
+
+def walk_along(points, miles):
+    """What a per-tick turf.along does: walk segments from the start"""
+    travelled = 0.0
+    for (lat1, lon1), (lat2, lon2) in zip(points, points[1:]):
+        length = haversine_miles(lat1, lon1, lat2, lon2)
+        if travelled + length >= miles:
+            t = (miles - travelled) / length if length else 0.0
+            return lat1 + (lat2 - lat1) * t, lon1 + (lon2 - lon1) * t
+        travelled += length
+    return points[-1]
+
+def main():
+    rng = random.Random(SEED)
+    points = make_route(rng)
+    geojson_bytes = len(json.dumps([[lon, lat] for lat, lon in points], separators=(",", ":")))
+
+    start = time.perf_counter()
+    encoded = encode_polyline(points)
+    encode_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    decode_polyline(encoded)
+    decode_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{POINT_COUNT} points: GeoJSON {geojson_bytes / 1024:.0f} KB, polyline {len(encoded) / 1024:.0f} KB "
+          f"(encode {encode_ms:.0f} ms, decode {decode_ms:.0f} ms)")
+    simplify(points, ZOOMS[0])  # first call imports numpy
+    for zoom in ZOOMS:
+        for method in SIMPLIFY_METHODS:
+            start = time.perf_counter()
+            simplified = simplify(points, zoom, method)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            size_kb = len(encode_polyline(simplified)) / 1024
+            print(f"  z{zoom:<2d} {method:16s} {len(simplified):6d} points {size_kb:7.1f} KB  {elapsed_ms:6.0f} ms")
+
+    start = time.perf_counter()
+    geometry = RouteGeometry(points)
+    build_ms = (time.perf_counter() - start) * 1000
+    targets = [rng.uniform(0, geometry.length_miles) for _ in range(LOOKUPS)]
+    start = time.perf_counter()
+    for miles in targets:
+        geometry.position_at(miles)
+    indexed_us = (time.perf_counter() - start) / LOOKUPS * 1e6
+    start = time.perf_counter()
+    for miles in targets[:50]:
+        walk_along(points, miles)
+    walk_us = (time.perf_counter() - start) / 50 * 1e6
+    print(f"distance-along-route: {indexed_us:.1f} µs binary search (cumulative array built in {build_ms:.0f} ms), "
+          f"{walk_us / 1000:.1f} ms walking the line")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Route weather benchmark: batched per-cell forecasts vs one forecast call per bridge
+
+Run from backend/:  python -m benchmarks.route_weather
+"""
+import random
+import threading
+import time
+from tools.route_weather import route_weather, sample_route
+
+SEED = 42
+# Simulated forecast API round trip
+FORECAST_LATENCY_SECONDS = 0.1
+# ~300-mile haul, Richmond VA to Philadelphia PA via Baltimore
+ROUTE = [(37.54, -77.44), (38.90, -77.04), (39.29, -76.61), (39.95, -75.17)]
+BRIDGE_COUNTS = (10, 100, 1000, 10000)
+# The per-bridge baseline makes real sequential calls only up to this many bridges
+NAIVE_MAX_BRIDGES = 10
+
+class FakeForecast:
+    """Forecast source that sleeps like a network call and counts calls"""
+
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.start = int(time.time()) // 10800 * 10800
+
+    def __call__(self, lat, lon):
+        with self._lock:
+            self.calls += 1
+        time.sleep(FORECAST_LATENCY_SECONDS)
+        return {
+            "success": True,
+            "steps": [
+                {"time": self.start + i * 10800, "condition": "Snow" if i % 4 == 1 else "Clouds",
+                 "temperature": 30 + (i % 8) * 2}
+                for i in range(40)
+            ]
+        }
+
+def make_bridges(rng: random.Random, count: int):
+    """Bridges scattered along the route, each with its distance along it"""
+    waypoints = sample_route(ROUTE, time.time(), sample_minutes=1)
+    bridges = []
+    for i in range(count):
+        waypoint = rng.choice(waypoints)
+        bridges.append({
+            "bridge_id": f"synthetic_{i:05d}",
+            "name": f"Bridge {i}",
+            "latitude": waypoint["latitude"] + rng.uniform(-0.002, 0.002),
+            "longitude": waypoint["longitude"] + rng.uniform(-0.002, 0.002),
+            "clearance_inches": rng.randint(150, 200),
+            "miles_along_route": waypoint["miles"]
+        })
+    return bridges
+
+def main():
+    rng = random.Random(SEED)
+    print(f"Forecast latency {FORECAST_LATENCY_SECONDS * 1000:.0f} ms per call")
+    for count in BRIDGE_COUNTS:
+        bridges = make_bridges(rng, count)
+        fetch = FakeForecast()
+        start = time.perf_counter()
+        result = route_weather(ROUTE, bridges=bridges, fetch=fetch)
+        batched_seconds = time.perf_counter() - start
+
+        line = (f"{count:6d} bridges: {fetch.calls:3d} forecast calls, {batched_seconds * 1000:7.0f} ms "
+                f"(worst adjustment {result['clearance_impact_inches']}\")")
+        if count <= NAIVE_MAX_BRIDGES:
+            naive = FakeForecast()
+            start = time.perf_counter()
+            for bridge in bridges:
+                naive(bridge["latitude"], bridge["longitude"])
+            line += f"   per-bridge: {naive.calls} calls, {(time.perf_counter() - start) * 1000:.0f} ms"
+        else:
+            line += f"   per-bridge: {count} calls, ~{count * FORECAST_LATENCY_SECONDS:.0f} s"
+        print(line)
+
+if __name__ == "__main__":
+    main()
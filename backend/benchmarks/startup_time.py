@@ -0,0 +1,61 @@
+"""
+Cold-start cost of the API process
+
+Each sample is a fresh interpreter: import main, then (separately) the
+first-request setup that is deferred until use. Run from backend/:
+python -m benchmarks.startup_time
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RUNS = 7
+
+# Modules that must stay off the import path of main
+HEAVY_MODULES = ["langgraph", "langchain_core", "openai", "requests", "pandas", "numpy"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import fastapi
+fastapi_done = time.perf_counter()
+import main
+import_done = time.perf_counter()
+loaded = [m for m in %r if m in sys.modules]
+timings = main.warmup()
+print(json.dumps({
+    "fastapi": fastapi_done - start,
+    "import_main": import_done - start,
+    "app_modules": import_done - fastapi_done,
+    "warmup": sum(timings.values()),
+    "warmup_steps": timings,
+    "heavy_loaded": loaded
+}))
+""" % HEAVY_MODULES
+
+def sample():
+    env = dict(os.environ, NVIDIA_API_KEY=os.getenv("NVIDIA_API_KEY", "benchmark"))
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    # Startup may print fallback notices; the probe's JSON is the last line
+    return json.loads(out.strip().splitlines()[-1])
+
+def main():
+    samples = [sample() for _ in range(RUNS)]
+
+    loaded = samples[0]["heavy_loaded"]
+    if loaded:
+        print(f"WARNING: heavy modules imported by main: {', '.join(loaded)}")
+
+    print(f"median of {RUNS} fresh interpreters")
+    for key in ("fastapi", "app_modules", "import_main", "warmup"):
+        print(f"  {key:<12} {statistics.median(s[key] for s in samples) * 1000:8.1f} ms")
+    for step in samples[0]["warmup_steps"]:
+        print(f"    {step:<16} {statistics.median(s['warmup_steps'][step] for s in samples) * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
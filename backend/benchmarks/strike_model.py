@@ -0,0 +1,71 @@
+"""
+Strike probability model benchmark: closed form + stratified settlement samples
+vs brute-force Monte Carlo over every error source
+
+Run from backend/:  python -m benchmarks.strike_model
+"""
+import time
+import numpy as np
+from agents import strike_model
+from agents.strike_model import strike_probabilities
+
+SEED = 42
+BRIDGE_COUNT = 5000
+VEHICLE_HEIGHT = 150
+UNCERTAINTY = 3
+BRUTE_FORCE_SAMPLES = 20000
+REPEATS = 20
+
+def brute_force(clearances, confidences, settlement_means, samples, rng):
+    """Sample all five error sources per bridge; bridges x samples draws"""
+    sign_sd = strike_model.STRIKE_SIGN_SD_INCHES + strike_model.STRIKE_SIGN_SD_LOW_CONFIDENCE_INCHES * (1 - confidences)
+    sigma = np.sqrt((UNCERTAINTY / 2) ** 2 + sign_sd ** 2)
+    shape = (len(clearances), samples)
+    losses = (
+        sigma[:, None] * rng.standard_normal(shape)
+        + rng.uniform(strike_model.STRIKE_SUSPENSION_MIN_INCHES, strike_model.STRIKE_SUSPENSION_MAX_INCHES, shape)
+        + rng.uniform(0, strike_model.STRIKE_RESURFACING_MAX_INCHES, shape)
+        + settlement_means[:, None] * rng.standard_exponential(shape)
+    )
+    return (losses > (clearances - VEHICLE_HEIGHT)[:, None]).mean(axis=1)
+
+def timed_ms(fn, repeats=REPEATS):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1000
+
+def main():
+    rng = np.random.default_rng(SEED)
+    # Clearances concentrated around the vehicle height so most bridges need the full model
+    clearances = rng.uniform(140, 175, BRIDGE_COUNT)
+    confidences = rng.uniform(0.6, 1.0, BRIDGE_COUNT)
+    settlement_means = rng.uniform(0.1, 1.5, BRIDGE_COUNT)
+    no_settlement = np.zeros(BRIDGE_COUNT)
+
+    closed_ms = timed_ms(lambda: strike_probabilities(
+        VEHICLE_HEIGHT, clearances, UNCERTAINTY, confidences, no_settlement))
+    sampled_ms = timed_ms(lambda: strike_probabilities(
+        VEHICLE_HEIGHT, clearances, UNCERTAINTY, confidences, settlement_means))
+    # A real bridge set: most clearances are far enough from the vehicle to be certain
+    spread = rng.uniform(120, 240, BRIDGE_COUNT)
+    spread_ms = timed_ms(lambda: strike_probabilities(
+        VEHICLE_HEIGHT, spread, UNCERTAINTY, confidences, settlement_means))
+
+    start = time.perf_counter()
+    reference = brute_force(clearances, confidences, settlement_means, BRUTE_FORCE_SAMPLES, rng)
+    brute_ms = (time.perf_counter() - start) * 1000
+    model = strike_probabilities(VEHICLE_HEIGHT, clearances, UNCERTAINTY, confidences, settlement_means)
+    # Brute-force noise is about sqrt(p(1-p)/n) <= 0.0035 at 20k samples
+    error = np.abs(model - reference)
+
+    print(f"{BRIDGE_COUNT} bridges, vehicle {VEHICLE_HEIGHT}\", clearances 140-175\"")
+    print(f"closed form (no settlement)          {closed_ms:8.2f} ms")
+    print(f"closed form + {strike_model.STRIKE_MODEL_SAMPLES} settlement samples   {sampled_ms:8.2f} ms")
+    print(f"  same, clearances 120-240\"           {spread_ms:8.2f} ms")
+    print(f"brute-force MC, {BRUTE_FORCE_SAMPLES} samples       {brute_ms:8.0f} ms")
+    print(f"model vs brute force: mean |diff| {error.mean():.4f}, max |diff| {error.max():.4f}")
+
+if __name__ == "__main__":
+    main()
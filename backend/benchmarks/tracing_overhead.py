@@ -0,0 +1,85 @@
+"""
+Request tracing overhead: per-request cost when tracing is off, cost per
+span when it is on, and export time for a pipeline-sized trace
+
+Run from backend/:  python -m benchmarks.tracing_overhead
+"""
+import asyncio
+import time
+
+from services.tracing import Span, Trace, TracingMiddleware, span, traced, _current, EXPORT_FORMATS
+
+REQUESTS = 20000
+RUNS = 5
+# About what a traced /analyze-vehicle records: 7 agents with tool, llm and checkpoint spans under them
+PIPELINE_SPANS = 40
+
+HEADERS = [(b"host", b"localhost"), (b"user-agent", b"bench"), (b"accept", b"*/*"),
+           (b"content-type", b"application/json"), (b"content-length", b"64")]
+
+@traced("tool")
+def tool_call():
+    pass
+
+def handler_work():
+    """The instrumentation points one agent hits: its span, a tool call and a checkpoint"""
+    with span("agent", "agent"):
+        tool_call()
+        with span("checkpoint", "serialization"):
+            pass
+
+async def endpoint(scope, receive, send):
+    handler_work()
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+async def call(app, headers, query=b""):
+    scope = {"type": "http", "method": "POST", "path": "/check-clearance", "headers": headers, "query_string": query}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+async def per_request_seconds(app, headers, count, query=b""):
+    start = time.perf_counter()
+    for _ in range(count):
+        await call(app, headers, query)
+    return (time.perf_counter() - start) / count
+
+def pipeline_trace() -> Trace:
+    trace = Trace()
+    root = Span(trace, "POST /analyze-vehicle", "server", None)
+    trace.add(root)
+    token = _current.set(root)
+    try:
+        for _ in range(PIPELINE_SPANS // 3):
+            handler_work()
+    finally:
+        _current.reset(token)
+    root.end = time.time()
+    return trace
+
+async def main():
+    middleware = TracingMiddleware(endpoint)
+    bare = min([await per_request_seconds(endpoint, HEADERS, REQUESTS) for _ in range(RUNS)])
+    off = min([await per_request_seconds(middleware, HEADERS, REQUESTS) for _ in range(RUNS)])
+    print(f"Tracing off: +{(off - bare) * 1e6:.2f} µs per request "
+          f"({bare * 1e6:.1f} → {off * 1e6:.1f} µs for an ASGI app with 3 instrumentation points)")
+
+    on = min([await per_request_seconds(middleware, HEADERS, REQUESTS // 10, b"trace=true") for _ in range(RUNS)])
+    # Root and send_response plus the handler's agent, tool and checkpoint spans
+    print(f"Tracing on: +{(on - bare) * 1e6:.1f} µs per request, ~{(on - bare) * 1e6 / 5:.1f} µs per span")
+
+    trace = pipeline_trace()
+    for name, export in EXPORT_FORMATS.items():
+        start = time.perf_counter()
+        for _ in range(100):
+            export(trace)
+        print(f"  export {name:9s} {len(trace.spans)} spans: {(time.perf_counter() - start) * 10:.2f} ms")
+
+if __name__ == "__main__":
+    asyncio.run(main())
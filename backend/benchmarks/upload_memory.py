@@ -0,0 +1,60 @@
+"""
+Peak memory per upload: whole-file read + b64encode + decode vs chunked
+encoding into one preallocated buffer. "held" is what stays allocated for
+the rest of the request (the LLM call).
+
+Run from backend/: python -m benchmarks.upload_memory
+"""
+import asyncio
+import base64
+import os
+import tempfile
+import tracemalloc
+
+from starlette.datastructures import Headers, UploadFile
+
+from services.uploads import read_upload_base64, peak_bytes_per_upload, encoded_length
+
+SIZES_MB = [1, 5, 10]
+
+def make_upload(payload: bytes) -> UploadFile:
+    # Same spool Starlette's multipart parser uses: memory up to 1 MB, then disk
+    spool = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    spool.write(payload)
+    spool.seek(0)
+    return UploadFile(spool, size=len(payload), headers=Headers({"content-type": "image/jpeg"}))
+
+async def legacy(file: UploadFile):
+    # The endpoint kept `contents` in scope for the whole LLM call
+    contents = await file.read()
+    return contents, base64.b64encode(contents).decode('utf-8')
+
+async def streaming(file: UploadFile):
+    image_base64, _ = await read_upload_base64(file, max_bytes=file.size)
+    return None, image_base64
+
+def measure(reader, payload: bytes):
+    upload = make_upload(payload)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    result = asyncio.run(reader(upload))
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result[1], peak, retained
+
+def main():
+    print(f"{'size':>6}  {'legacy peak/held':>17}  {'streamed peak/held':>19}  {'bound':>8}")
+    for mb in SIZES_MB:
+        payload = os.urandom(mb * 1024 * 1024)
+        expected, legacy_peak, legacy_held = measure(legacy, payload)
+        result, streamed_peak, streamed_held = measure(streaming, payload)
+        assert result == expected
+        bound = peak_bytes_per_upload(len(payload))
+        assert streamed_peak <= bound, (streamed_peak, bound)
+        print(f"{mb:>4}MB  {legacy_peak / 1e6:>7.1f} / {legacy_held / 1e6:>5.1f}MB  "
+              f"{streamed_peak / 1e6:>9.1f} / {streamed_held / 1e6:>5.1f}MB  {bound / 1e6:>6.1f}MB")
+    print(f"\nbase64 of 10MB = {encoded_length(10 * 1024 * 1024) / 1e6:.1f}MB; "
+          f"default cap bound {peak_bytes_per_upload() / 1e6:.1f}MB per concurrent upload")
+
+if __name__ == "__main__":
+    main()
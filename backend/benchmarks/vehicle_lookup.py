@@ -0,0 +1,63 @@
+"""
+Vehicle specification lookup benchmark
+
+Run from backend/:  python -m benchmarks.vehicle_lookup
+Builds a synthetic make/model/trim catalog on top of data/vehicles.json
+and times cold (uncached) and warm lookups.
+"""
+import random
+import time
+from tools.vehicle_index import VehicleIndex
+
+SEED = 42
+MAKES = ["Ford", "Chevrolet", "Ram", "Isuzu", "Hino", "Freightliner", "International",
+         "Mercedes", "Winnebago", "Thor", "Jayco", "Fleetwood", "Penske", "Ryder", "Budget"]
+MODELS = ["Transit", "Express", "ProMaster", "NPR", "Sprinter", "Cascadia", "MV", "E-450",
+          "F-650", "Vista", "Minnie", "Greyhawk", "Bounder", "Cargo", "Box"]
+TRIMS = ["Base", "High Roof", "Extended", "Cutaway", "HD", "XL", "LT", "Limited"]
+BODIES = ["10ft", "12ft", "14ft", "16ft", "20ft", "24ft", "26ft", "Class A", "Class C"]
+
+def make_catalog(rng: random.Random):
+    entries = []
+    for make in MAKES:
+        for model in MODELS:
+            for trim in TRIMS:
+                body = rng.choice(BODIES)
+                entries.append({
+                    "vehicle_id": f"{make}_{model}_{trim}_{body}".lower().replace(" ", "_"),
+                    "name": f"{make} {model} {trim} {body}",
+                    "base_height_inches": rng.randint(80, 160),
+                    "typical_mods": [{"type": "roof_ac", "height_added": rng.choice([0, 6, 8, 10])}]
+                })
+    return entries
+
+def main():
+    rng = random.Random(SEED)
+    catalog = make_catalog(rng)
+
+    index = VehicleIndex()
+    start = time.perf_counter()
+    index.add_entries(catalog)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    queries = [f"{e['name']} with roof equipment" for e in rng.sample(catalog, 500)]
+    queries += ["U-Haul 15' box truck", "Class C RV motorhome", "penske 16 ft", "unknown trailer"]
+
+    start = time.perf_counter()
+    found = sum(1 for q in queries if index.lookup(q)["found"])
+    cold_us = (time.perf_counter() - start) / len(queries) * 1e6
+
+    start = time.perf_counter()
+    for q in queries:
+        index.lookup(q)
+    warm_us = (time.perf_counter() - start) / len(queries) * 1e6
+
+    print("🚐 Vehicle Lookup Benchmark")
+    print("=" * 50)
+    print(f"Catalog entries: {len(index)} (indexed in {build_ms:.0f} ms)")
+    print(f"Queries: {len(queries)}, matched: {found}")
+    print(f"Cold lookup: {cold_us:.0f} µs/query")
+    print(f"Cached lookup: {warm_us:.1f} µs/query")
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,46 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, WebSocket, WebSocketDisconnect, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse, Response
 from pydantic import BaseModel
-from openai import OpenAI
-import base64
+import asyncio
+import json
 import os
+import shutil
+import tempfile
+import time
 from dotenv import load_dotenv
 from typing import Optional, List, Dict
-from agents.agent_graph import run_agent_workflow
+from agents.agent_graph import (
+    run_agent_workflow, invoke_agent_workflow, resume_agent_workflow, warmup_agent_workflows
+)
+from agents.checkpoints import get_checkpoint_store
+from agents.skip_policies import skip_counters
+from agents.risk_cache import get_risk_cache
+from agents.recommendation_templates import recommendation_counters
+from agents.json_stream import IncrementalJSONParser
+from agents.vehicle_agents import LLM_USAGE_GRACE_SECONDS
+from agents.pipeline_profiles import select_profile
+from agents.prompt_builder import estimate_tokens
+from agents.strike_model import warmup_strike_model
+from tools.bridge_store import get_bridge_store
+from tools.live_monitor import ProximitySession
+from tools.geofence import get_geofence_engine, height_class_for, HEIGHT_CLASSES
+from tools.hazard_tiles import get_hazard_tiles, unpack_tile
+from tools.bridge_query import get_bridge_index, DEFAULT_SORT, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from tools.incident_store import get_incident_store, SCOPES
+from tools.route_weather import route_weather, ROUTE_SPEED_MPH, ROUTE_CORRIDOR_MILES
+from tools.route_geometry import RouteGeometry, DEFAULT_PRECISION, SIMPLIFY_METHODS
+from tools.vehicle_index import get_vehicle_index
+from services.job_queue import job_queue, QueueFullError, TERMINAL_STATUSES
+from services.uploads import read_upload_base64
+from services.sign_ingestion import open_sign_sources, ingest_signs, SIGN_INGEST_CONCURRENCY, SIGN_INGEST_RATE_PER_SECOND
+from services.llm_client import get_llm_client
+from services.llm_scheduler import llm_scheduler
+from services.model_router import model_router
+from services.profiler import ProfilingMiddleware, get_profile_store, thread_scope, PROFILE_KEEP
+from services.tracing import (
+    TracingMiddleware, trace_store, span, traced, record_llm_phases, current_waterfall, EXPORT_FORMATS, TRACE_KEEP
+)
 
 load_dotenv()
 
@@ -20,12 +54,10 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-
-# Initialize Nemotron (via NVIDIA API using OpenAI-compatible client)
-client = OpenAI(
-    base_url="https://integrate.api.nvidia.com/v1",
-    api_key=os.getenv("NVIDIA_API_KEY")  # You'll need to set this in your .env file
-)
+# Opt-in per-request sampling profiles (X-Profile: 1 or PROFILE_SAMPLE_RATE)
+app.add_middleware(ProfilingMiddleware)
+# Opt-in per-request span traces (X-Trace: 1, ?trace=true, traceparent or TRACE_SAMPLE_RATE)
+app.add_middleware(TracingMiddleware)
 
 # Pydantic models
 class RouteAnalysisRequest(BaseModel):
@@ -36,6 +68,10 @@ class RouteAnalysisRequest(BaseModel):
 
 class AnalyzeVehicleResponse(BaseModel):
     success: bool
+    pipeline_profile: Optional[str] = None
+    run_id: Optional[str] = None
+    resumed_from: Optional[str] = None
+    early_exit_reason: Optional[str] = None
     agent_log: List[Dict]
     vehicle_analysis: Optional[Dict] = None
     measurements: Optional[Dict] = None
@@ -45,6 +81,7 @@ class AnalyzeVehicleResponse(BaseModel):
     risk_assessment: Optional[Dict] = None
     recommendations: Optional[Dict] = None
     errors: Optional[List[str]] = None
+    trace: Optional[Dict] = None
 
 class BridgeCheckRequest(BaseModel):
     vehicle_height_inches: int
@@ -52,12 +89,65 @@ class BridgeCheckRequest(BaseModel):
     bridge_clearance_inches: int
     vehicle_description: Optional[str] = None
 
+class VehicleCatalogUpload(BaseModel):
+    entries: List[Dict]
+
+class FleetVehicle(BaseModel):
+    vehicle_id: str
+    height_inches: float
+
+class FleetFix(BaseModel):
+    vehicle_id: str
+    lat: float
+    lon: float
+
+class FleetPositionBatch(BaseModel):
+    fixes: List[FleetFix]
+
+class IncidentReport(BaseModel):
+    bridge_id: Optional[str] = None
+    vehicle_height_inches: Optional[float] = None
+    bridge_clearance_inches: Optional[float] = None
+    damage_severity: Optional[str] = None
+    region: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    occurred_at: Optional[float] = None
+
+class RouteGeometryRequest(BaseModel):
+    points: Optional[List[List[float]]] = None  # [[lat, lon], ...] in driving order
+    coordinates: Optional[List[List[float]]] = None  # GeoJSON / Mapbox order: [[lon, lat], ...]
+    polyline: Optional[str] = None
+    precision: int = DEFAULT_PRECISION
+
+class RouteSimplifyRequest(RouteGeometryRequest):
+    zoom: Optional[float] = None
+    method: str = "douglas_peucker"
+    output_precision: int = DEFAULT_PRECISION
+
+class RouteWeatherRequest(RouteGeometryRequest):
+    departure_time: Optional[float] = None
+    average_speed_mph: float = ROUTE_SPEED_MPH
+    corridor_miles: float = ROUTE_CORRIDOR_MILES
+    vehicle_height_inches: Optional[float] = None
+
 # ============= NEMOTRON DOES EVERYTHING =============
 
-def call_nemotron(prompt: str, image_base64: Optional[str] = None) -> str:
+NEMOTRON_MAX_TOKENS = 4000
+
+def call_nemotron(
+    prompt: str,
+    image_base64: Optional[str] = None,
+    media_type: str = "image/jpeg",
+    priority: str = "interactive",
+    flow: Optional[str] = None,
+    call_site: str = "general"
+) -> str:
     """
     Single function to call Nemotron for ANY task
     Uses NVIDIA Llama Nemotron via OpenAI-compatible API
+    priority / flow: scheduling class and fair-queuing key (see services.llm_scheduler)
+    call_site: model route to use (see services.model_router)
     """
     try:
         # Prepare messages for OpenAI format
@@ -71,7 +161,7 @@ def call_nemotron(prompt: str, image_base64: Optional[str] = None) -> str:
                     {
                         "type": "image_url",
                         "image_url": {
-                            "url": f"data:image/jpeg;base64,{image_base64}"
+                            "url": f"data:{media_type};base64,{image_base64}"
                         }
                     },
                     {
@@ -87,22 +177,133 @@ def call_nemotron(prompt: str, image_base64: Optional[str] = None) -> str:
                 "content": prompt
             })
 
-        # Call Nemotron using OpenAI-compatible API
-        completion = client.chat.completions.create(
-            model="meta/llama-3.1-70b-instruct",  # Meta Llama model (widely available)
-            messages=messages,
-            max_tokens=4000,
-            temperature=0.7,
-            top_p=1.0
-        )
+        # Call Nemotron using OpenAI-compatible API, streamed so we can stop
+        # as soon as the JSON object is complete instead of waiting for trailing prose
+        # (after a short grace read for the usage chunk, so the scheduler is charged real tokens)
+        model, _ = model_router.route(call_site)
+        first_token_at = None
+        usage = None
+        with thread_scope(), \
+                span(f"llm {call_site}", "llm", model=model, priority=priority) as llm_span, \
+                llm_scheduler.slot(priority, estimate_tokens(prompt) + NEMOTRON_MAX_TOKENS, flow=flow) as slot:
+            call_start = time.time()
+            try:
+                stream = get_llm_client().chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    max_tokens=NEMOTRON_MAX_TOKENS,
+                    temperature=0.7,
+                    top_p=1.0,
+                    stream=True,
+                    stream_options={"include_usage": True}
+                )
 
-        return completion.choices[0].message.content
+                parser = IncrementalJSONParser()
+                done_at = None
+                try:
+                    for chunk in stream:
+                        if getattr(chunk, "usage", None):
+                            usage = chunk.usage
+                        if done_at is not None:
+                            if usage is not None or time.time() - done_at > LLM_USAGE_GRACE_SECONDS:
+                                break
+                            continue
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta.content or ""
+                        if delta and first_token_at is None:
+                            first_token_at = time.time()
+                        parser.feed(delta)
+                        if parser.done:
+                            done_at = time.time()
+                finally:
+                    if hasattr(stream, "close"):
+                        stream.close()
+                    if usage is not None and getattr(usage, "total_tokens", None):
+                        slot.tokens_used = usage.total_tokens
+                    else:
+                        slot.tokens_used = estimate_tokens(prompt) + estimate_tokens(parser.text)
+            except Exception:
+                model_router.record(call_site, model, time.time() - call_start, ok=False, completeness=0.0)
+                raise
+            model_router.record(call_site, model, time.time() - call_start, ok=True, completeness=1.0 if parser.done else 0.0)
+            record_llm_phases(llm_span, call_start - slot.queue_wait_seconds, call_start, first_token_at, time.time())
+
+        return parser.text
 
     except Exception as e:
         return f"Error: {str(e)}"
 
 # ============= ENDPOINTS =============
 
+def with_waterfall(response: Dict, trace: bool) -> Dict:
+    """
+    Attach the request's span waterfall so far when the caller asked with ?trace=true
+    """
+    if trace:
+        response["trace"] = current_waterfall()
+    return response
+
+@traced("serialization", "build_response")
+def build_vehicle_response(final_state: Dict, pipeline_profile: str) -> Dict:
+    """
+    Structure the final agent state as an AnalyzeVehicleResponse
+    """
+    response = {
+        "success": len(final_state.get("errors", [])) == 0,
+        "pipeline_profile": pipeline_profile,
+        "run_id": final_state.get("run_id"),
+        "resumed_from": final_state.get("resumed_from"),
+        "early_exit_reason": final_state.get("early_exit_reason"),
+        "agent_log": final_state.get("agent_log", []),
+        "vehicle_analysis": {
+            "detected": final_state.get("vehicle_detected"),
+            "type": final_state.get("vehicle_type"),
+            "visual_detections": final_state.get("visual_detections"),
+            "confidence": final_state.get("vision_confidence"),
+            "reasoning": final_state.get("vision_reasoning")
+        },
+        "measurements": {
+            "base_height_inches": final_state.get("base_height_inches"),
+            "roof_equipment": final_state.get("roof_equipment"),
+            "total_height_inches": final_state.get("total_height_inches"),
+            "uncertainty_inches": final_state.get("measurement_uncertainty"),
+            "reasoning": final_state.get("measurement_reasoning")
+        },
+        "location_data": {
+            "coordinates": final_state.get("location_coords"),
+            "geocoding_result": final_state.get("geocoding_result"),
+            "reasoning": final_state.get("location_reasoning")
+        },
+        "bridge_data": {
+            "nearby_bridges": final_state.get("nearby_bridges"),
+            "count": final_state.get("bridge_count"),
+            "reasoning": final_state.get("bridge_query_reasoning")
+        },
+        "weather_data": {
+            "conditions": final_state.get("weather_conditions"),
+            "clearance_adjustment": final_state.get("clearance_adjustment"),
+            "warnings": final_state.get("weather_warnings"),
+            "route": final_state.get("route_weather")
+        },
+        "risk_assessment": {
+            "dangerous_bridges": final_state.get("dangerous_bridges"),
+            "risk_level": final_state.get("risk_level"),
+            "strike_probability": final_state.get("strike_probability"),
+            "reasoning": final_state.get("risk_reasoning")
+        },
+        "recommendations": {
+            "recommendations": final_state.get("recommendations"),
+            "safe_routes": final_state.get("safe_routes"),
+            "avoid_routes": final_state.get("avoid_routes"),
+            "summary": final_state.get("final_report")
+        },
+        "errors": final_state.get("errors", [])
+    }
+
+    return response
+
+
 @app.get("/")
 def root():
     return {"status": "BridgeGuardian API running", "version": "1.0.0"}
@@ -110,7 +311,13 @@ def root():
 @app.post("/analyze-vehicle", response_model=AnalyzeVehicleResponse)
 async def analyze_vehicle(
     file: UploadFile = File(...),
-    location: str = "Boston, MA"
+    location: str = "Boston, MA",
+    profile: Optional[str] = None,
+    latency_slo_ms: Optional[int] = None,
+    vehicle_description: Optional[str] = None,
+    narrative: bool = False,
+    destination: Optional[str] = None,
+    trace: bool = False
 ):
     """
     Multi-Agent Vehicle Analysis
@@ -123,82 +330,298 @@ async def analyze_vehicle(
     5. Weather Agent - Checks conditions
     6. Risk Assessment Agent - Evaluates dangers
     7. Recommendation Agent - Generates advice
+
+    Pipeline profiles (?profile= or picked from ?latency_slo_ms=):
+    - full: the seven agents above
+    - fast: spec lookup, one vision+measurement call, rule-based risk and recommendations
+
+    Recommendations come from templates for common outcomes; ?narrative=true
+    asks the LLM for a written summary instead.
+
+    With ?destination= the weather check also forecasts each bridge on the way
+    at the time the truck reaches it.
+
+    ?trace=true adds a span waterfall (agents, tool and HTTP calls, LLM queue /
+    first token / generation, serialization) as "trace"; the full trace is at
+    /traces/{id}.
     """
+    try:
+        pipeline_profile = select_profile(profile, latency_slo_ms)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     try:
         # Read and encode image
-        contents = await file.read()
-        image_base64 = base64.b64encode(contents).decode('utf-8')
-        media_type = file.content_type or "image/jpeg"
+        image_base64, media_type = await read_upload_base64(file)
         
         # Run agent workflow
         final_state = await run_agent_workflow(
             image_base64=image_base64,
             image_media_type=media_type,
-            user_location=location
+            user_location=location,
+            profile=pipeline_profile,
+            vehicle_description=vehicle_description,
+            narrative=narrative,
+            destination=destination
         )
         
-        # Structure response
-        response = {
-            "success": len(final_state.get("errors", [])) == 0,
-            "agent_log": final_state.get("agent_log", []),
-            "vehicle_analysis": {
-                "detected": final_state.get("vehicle_detected"),
-                "type": final_state.get("vehicle_type"),
-                "visual_detections": final_state.get("visual_detections"),
-                "confidence": final_state.get("vision_confidence"),
-                "reasoning": final_state.get("vision_reasoning")
-            },
-            "measurements": {
-                "base_height_inches": final_state.get("base_height_inches"),
-                "roof_equipment": final_state.get("roof_equipment"),
-                "total_height_inches": final_state.get("total_height_inches"),
-                "uncertainty_inches": final_state.get("measurement_uncertainty"),
-                "reasoning": final_state.get("measurement_reasoning")
-            },
-            "location_data": {
-                "coordinates": final_state.get("location_coords"),
-                "geocoding_result": final_state.get("geocoding_result"),
-                "reasoning": final_state.get("location_reasoning")
-            },
-            "bridge_data": {
-                "nearby_bridges": final_state.get("nearby_bridges"),
-                "count": final_state.get("bridge_count"),
-                "reasoning": final_state.get("bridge_query_reasoning")
-            },
-            "weather_data": {
-                "conditions": final_state.get("weather_conditions"),
-                "clearance_adjustment": final_state.get("clearance_adjustment"),
-                "warnings": final_state.get("weather_warnings")
-            },
-            "risk_assessment": {
-                "dangerous_bridges": final_state.get("dangerous_bridges"),
-                "risk_level": final_state.get("risk_level"),
-                "strike_probability": final_state.get("strike_probability"),
-                "reasoning": final_state.get("risk_reasoning")
-            },
-            "recommendations": {
-                "recommendations": final_state.get("recommendations"),
-                "safe_routes": final_state.get("safe_routes"),
-                "avoid_routes": final_state.get("avoid_routes"),
-                "summary": final_state.get("final_report")
-            },
-            "errors": final_state.get("errors", [])
-        }
-        
-        return response
+        return with_waterfall(build_vehicle_response(final_state, pipeline_profile), trace)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/analyze-bridge-sign")
-async def analyze_bridge_sign(file: UploadFile = File(...)):
+@app.post("/jobs/analyze-vehicle", status_code=202)
+async def submit_vehicle_analysis_job(
+    file: UploadFile = File(...),
+    location: str = "Boston, MA",
+    profile: Optional[str] = None,
+    latency_slo_ms: Optional[int] = None,
+    vehicle_description: Optional[str] = None,
+    narrative: bool = False,
+    destination: Optional[str] = None
+):
     """
-    NEMOTRON: Read bridge clearance sign from photo
+    Queue a multi-agent vehicle analysis and return a job ID immediately
+
+    Poll GET /jobs/{job_id} or stream GET /jobs/{job_id}/events for the result.
+    Returns 429 when the queue is at its depth limit.
     """
-    contents = await file.read()
-    image_base64 = base64.b64encode(contents).decode('utf-8')
-    
-    prompt = """You are analyzing a bridge clearance sign photo.
+    try:
+        pipeline_profile = select_profile(profile, latency_slo_ms)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    image_base64, media_type = await read_upload_base64(file)
+
+    async def handler():
+        final_state = await asyncio.to_thread(
+            invoke_agent_workflow,
+            image_base64=image_base64,
+            image_media_type=media_type,
+            user_location=location,
+            profile=pipeline_profile,
+            vehicle_description=vehicle_description,
+            narrative=narrative,
+            destination=destination
+        )
+        return build_vehicle_response(final_state, pipeline_profile)
+
+    try:
+        job = job_queue.submit("analyze-vehicle", handler)
+    except QueueFullError as e:
+        return JSONResponse(status_code=429, content={"detail": str(e)}, headers={"Retry-After": "30"})
+
+    return {
+        "job_id": job.job_id,
+        "status": job.status,
+        "status_url": f"/jobs/{job.job_id}",
+        "events_url": f"/jobs/{job.job_id}/events"
+    }
+
+@app.get("/jobs")
+def job_queue_stats():
+    """
+    Worker pool and queue statistics
+    """
+    return job_queue.stats()
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """
+    Poll a queued job's status and result
+    """
+    job = job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job.to_dict()
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """
+    Server-Sent Events stream of a job's status changes, ending with its result
+    """
+    job = job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+
+    async def events():
+        last_status = None
+        last_progress = None
+        while True:
+            if job.status != last_status:
+                last_status = job.status
+                last_progress = job.progress
+                include_result = job.status in TERMINAL_STATUSES
+                yield f"event: {job.status}\ndata: {json.dumps(job.to_dict(include_result))}\n\n"
+                if include_result:
+                    return
+            elif job.progress is not last_progress:
+                last_progress = job.progress
+                yield f"event: progress\ndata: {json.dumps(job.progress)}\n\n"
+            else:
+                # Keep-alive comment so proxies don't close an idle stream
+                yield ": keep-alive\n\n"
+            await job_queue.wait_for_change(job, timeout=15)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+@app.get("/runs/{run_id}")
+def get_run(run_id: str):
+    """
+    Checkpoints recorded for an /analyze-vehicle run, in node order
+    """
+    run = get_checkpoint_store().get_run(run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Run not found or expired")
+    return run
+
+@app.post("/runs/{run_id}/resume", response_model=AnalyzeVehicleResponse)
+async def resume_run(run_id: str):
+    """
+    Retry a failed /analyze-vehicle run from its checkpoints
+
+    Only the first failed node and the nodes after it run again; earlier
+    results (vision, measurement, ...) are reused, not re-requested.
+    """
+    try:
+        final_state = await asyncio.to_thread(resume_agent_workflow, run_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Run not found or expired")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    return build_vehicle_response(final_state, final_state.get("pipeline_profile"))
+
+@app.get("/llm/scheduler")
+def llm_scheduler_stats():
+    """
+    LLM admission control: bucket levels, in-flight calls and queue-wait metrics per priority class
+    """
+    return llm_scheduler.stats()
+
+@app.get("/llm/models")
+def llm_model_routes():
+    """
+    Model route per call site with per-model latency, error rate and field completeness
+    """
+    return model_router.stats()
+
+@app.get("/profiles")
+def recent_profiles(limit: int = 50, path: Optional[str] = None):
+    """
+    Recent request profiles, newest first, with each one's hottest frames
+    Send X-Profile: 1 (or set PROFILE_SAMPLE_RATE) to profile a request; its ID comes back in X-Profile-Id.
+    """
+    return {"profiles": get_profile_store().recent(max(1, min(limit, PROFILE_KEEP)), path)}
+
+@app.get("/profiles/{profile_id}")
+def download_profile(profile_id: str):
+    """
+    One profile as collapsed stacks, for flamegraph.pl, inferno or speedscope
+    """
+    collapsed = get_profile_store().collapsed(profile_id)
+    if collapsed is None:
+        raise HTTPException(status_code=404, detail="Profile not found or expired")
+    return Response(
+        content=collapsed,
+        media_type="text/plain",
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.collapsed"'}
+    )
+
+@app.get("/traces")
+def recent_traces(limit: int = 50):
+    """
+    Recent request traces, newest first, as waterfalls
+    Send X-Trace: 1, ?trace=true or a sampled traceparent (or set TRACE_SAMPLE_RATE) to trace a request;
+    its ID comes back in X-Trace-Id.
+    """
+    return {"traces": trace_store.recent(max(1, min(limit, TRACE_KEEP)))}
+
+@app.get("/traces/{trace_id}")
+def export_trace(trace_id: str, format: str = "otlp"):
+    """
+    One trace as OTLP/JSON (Jaeger, Tempo, any OpenTelemetry collector), Chrome
+    trace events (chrome://tracing, Perfetto) or the compact waterfall
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {sorted(EXPORT_FORMATS)}")
+    trace = trace_store.get(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace not found or expired")
+    return EXPORT_FORMATS[format](trace)
+
+@app.get("/agents/skip-stats")
+def agent_skip_stats():
+    """
+    Early exits taken by the agent graph and the LLM calls they avoided
+    """
+    return skip_counters.snapshot()
+
+@app.get("/agents/risk-cache")
+def risk_cache_stats():
+    """
+    Shared risk-assessment cache size and hit rate
+    """
+    return get_risk_cache().stats()
+
+@app.delete("/agents/risk-cache")
+def invalidate_risk_cache():
+    """
+    Drop all cached risk assessments (e.g. after correcting bridge clearances)
+    """
+    get_risk_cache().invalidate()
+    return get_risk_cache().stats()
+
+@app.get("/agents/recommendation-stats")
+def recommendation_stats():
+    """
+    How often recommendations came from a template instead of an LLM call
+    """
+    return recommendation_counters.snapshot()
+
+@app.on_event("shutdown")
+async def shutdown_job_queue():
+    await job_queue.shutdown()
+
+# Heavy setup (LangGraph compile, LLM client, data indexes) runs on first use.
+# Long-lived deploys can pay it at boot instead with WARMUP_ON_STARTUP=1.
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "").lower() in ("1", "true", "yes")
+
+def warmup() -> Dict[str, float]:
+    """
+    Build everything that is otherwise initialized lazily; returns seconds per step
+    """
+    steps = {
+        "agent_workflows": warmup_agent_workflows,
+        "llm_client": get_llm_client,
+        "vehicle_index": get_vehicle_index,
+        "bridge_store": get_bridge_store,
+        "strike_model": warmup_strike_model
+    }
+    timings = {}
+    for name, step in steps.items():
+        start = time.perf_counter()
+        step()
+        timings[name] = round(time.perf_counter() - start, 4)
+    return timings
+
+@app.on_event("startup")
+async def warmup_on_startup():
+    if WARMUP_ON_STARTUP:
+        timings = await asyncio.to_thread(warmup)
+        print(f"Warmup complete: {timings}")
+
+@app.post("/warmup")
+async def warmup_endpoint():
+    """
+    Explicit warmup hook for platforms that ping an instance before routing traffic
+    """
+    timings = await asyncio.to_thread(warmup)
+    return {"success": True, "timings_seconds": timings}
+
+BRIDGE_SIGN_PROMPT = """You are analyzing a bridge clearance sign photo.
 
 TASKS:
 1. Find and read ALL clearance signs
@@ -228,7 +651,16 @@ RETURN JSON:
 
 Return ONLY JSON, no other text."""
 
-    response = call_nemotron(prompt, image_base64)
+@app.post("/analyze-bridge-sign")
+async def analyze_bridge_sign(file: UploadFile = File(...), trace: bool = False):
+    """
+    NEMOTRON: Read bridge clearance sign from photo
+    """
+    image_base64, media_type = await read_upload_base64(file)
+    
+    response = await asyncio.to_thread(
+        call_nemotron, BRIDGE_SIGN_PROMPT, image_base64, media_type, call_site="bridge_sign"
+    )
     
     if "```json" in response:
         json_str = response.split("```json")[1].split("```")[0].strip()
@@ -237,10 +669,69 @@ Return ONLY JSON, no other text."""
     else:
         json_str = response.strip()
     
-    return {"analysis": json_str, "raw": response}
+    return with_waterfall({"analysis": json_str, "raw": response}, trace)
+
+@app.post("/bridge-signs/batch")
+async def ingest_bridge_sign_batch(
+    file: UploadFile = File(...),
+    concurrency: int = SIGN_INGEST_CONCURRENCY,
+    rate_per_second: float = SIGN_INGEST_RATE_PER_SECOND,
+    dry_run: bool = False
+):
+    """
+    Queue a .zip or .tar of survey sign photos for batch ingestion
+
+    Photos are read concurrently (bounded by concurrency and rate_per_second),
+    matched to the nearest bridge by EXIF GPS and merged into the bridge data
+    weighted by confidence. Stream GET /jobs/{job_id}/events for progress.
+    """
+    if not 1 <= concurrency <= 32 or rate_per_second < 0:
+        raise HTTPException(status_code=400, detail="concurrency must be 1-32 and rate_per_second >= 0")
+
+    # The upload's temp file is closed when this request ends; the job needs its own copy
+    fd, archive_path = tempfile.mkstemp(suffix=os.path.splitext(file.filename or "")[1])
+    with os.fdopen(fd, "wb") as archive:
+        await asyncio.to_thread(shutil.copyfileobj, file.file, archive)
+    try:
+        sources = open_sign_sources(archive_path)
+    except ValueError as e:
+        os.unlink(archive_path)
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def analyze(image_base64: str, media_type: str) -> str:
+        return call_nemotron(
+            BRIDGE_SIGN_PROMPT, image_base64, media_type, priority="batch", flow=job.job_id, call_site="bridge_sign"
+        )
+
+    async def handler():
+        try:
+            return await ingest_signs(
+                sources,
+                analyze,
+                concurrency=concurrency,
+                rate_per_second=rate_per_second,
+                persist=not dry_run,
+                on_progress=job.report_progress
+            )
+        finally:
+            os.unlink(archive_path)
+
+    try:
+        job = job_queue.submit("bridge-sign-batch", handler)
+    except QueueFullError as e:
+        os.unlink(archive_path)
+        return JSONResponse(status_code=429, content={"detail": str(e)}, headers={"Retry-After": "30"})
+
+    return {
+        "job_id": job.job_id,
+        "status": job.status,
+        "images": len(sources),
+        "status_url": f"/jobs/{job.job_id}",
+        "events_url": f"/jobs/{job.job_id}/events"
+    }
 
 @app.post("/check-clearance")
-def check_clearance(request: BridgeCheckRequest):
+def check_clearance(request: BridgeCheckRequest, trace: bool = False):
     """
     NEMOTRON: Analyze if vehicle will fit under specific bridge
     """
@@ -294,7 +785,7 @@ RETURN JSON:
 
 BE CONSERVATIVE: Safety is paramount. When in doubt, recommend avoiding."""
 
-    response = call_nemotron(prompt)
+    response = call_nemotron(prompt, call_site="check_clearance")
     
     if "```json" in response:
         json_str = response.split("```json")[1].split("```")[0].strip()
@@ -303,10 +794,10 @@ BE CONSERVATIVE: Safety is paramount. When in doubt, recommend avoiding."""
     else:
         json_str = response.strip()
     
-    return {"analysis": json_str, "raw": response}
+    return with_waterfall({"analysis": json_str, "raw": response}, trace)
 
 @app.post("/plan-route")
-def plan_route(request: RouteAnalysisRequest):
+def plan_route(request: RouteAnalysisRequest, trace: bool = False):
     """
     NEMOTRON: Plan complete route with safety analysis
     """
@@ -443,7 +934,7 @@ RETURN JSON:
 CRITICAL: Return EXACTLY 3 routes in this order: A (safe), C (moderate), F (dangerous).
 Base on real highway knowledge. Be specific about bridge locations."""
 
-    response = call_nemotron(prompt)
+    response = call_nemotron(prompt, call_site="plan_route")
     
     if "```json" in response:
         json_str = response.split("```json")[1].split("```")[0].strip()
@@ -452,19 +943,23 @@ Base on real highway knowledge. Be specific about bridge locations."""
     else:
         json_str = response.strip()
     
-    return {"analysis": json_str, "raw": response}
+    return with_waterfall({"analysis": json_str, "raw": response}, trace)
 
 @app.post("/analyze-incident")
 async def analyze_incident(
     file: UploadFile = File(...),
     vehicle_height: int = 0,
-    bridge_clearance: int = 0
+    bridge_clearance: int = 0,
+    bridge_id: Optional[str] = None,
+    region: Optional[str] = None,
+    trace: bool = False
 ):
     """
     NEMOTRON: Analyze bridge strike incident from damage photo
+    The incident is recorded in the incident store for the statistics dashboards,
+    unless the analysis failed (502) or could not be parsed (incident is null).
     """
-    contents = await file.read()
-    image_base64 = base64.b64encode(contents).decode('utf-8')
+    image_base64, media_type = await read_upload_base64(file)
     
     prompt = f"""You are analyzing a bridge strike incident photo.
 
@@ -509,7 +1004,10 @@ RETURN JSON:
 
 Be thorough - this data improves future safety."""
 
-    response = call_nemotron(prompt, image_base64)
+    response = await asyncio.to_thread(call_nemotron, prompt, image_base64, media_type, call_site="incident")
+    if response.startswith("Error:"):
+        # Upstream failure: nothing was analyzed, so nothing is recorded (retries would double-count)
+        raise HTTPException(status_code=502, detail=f"Incident analysis failed: {response[len('Error:'):].strip()}")
     
     if "```json" in response:
         json_str = response.split("```json")[1].split("```")[0].strip()
@@ -517,10 +1015,369 @@ Be thorough - this data improves future safety."""
         json_str = response.split("```")[1].split("```")[0].strip()
     else:
         json_str = response.strip()
-    
-    return {"analysis": json_str, "raw": response}
+
+    try:
+        analysis = json.loads(json_str)
+        severity = analysis.get("damage_assessment", {}).get("severity")
+    except (ValueError, AttributeError):
+        # Unreadable analysis: return it, but keep it out of the rollups
+        return with_waterfall({
+            "analysis": json_str, "raw": response, "incident": None,
+            "incident_error": "Analysis was not valid JSON; incident not recorded (report it via POST /incidents)"
+        }, trace)
+    # Off the event loop: the insert commits to SQLite and patches the bridge index and tiles
+    incident = await asyncio.to_thread(
+        get_incident_store().record,
+        bridge_id=bridge_id,
+        vehicle_height_inches=vehicle_height or None,
+        bridge_clearance_inches=bridge_clearance or None,
+        severity=severity,
+        region=region,
+        analysis=analysis
+    )
+
+    return with_waterfall({"analysis": json_str, "raw": response, "incident": incident}, trace)
+
+@app.websocket("/ws/live-monitoring")
+async def live_monitoring(websocket: WebSocket, vehicle_height_inches: int):
+    """
+    Live GPS monitoring with server-side proximity alerts
+
+    Client streams fixes as JSON: {"lat": number, "lon": number, "heading": number (optional)}
+    Server pushes an "alert" message only when the alert level changes.
+    """
+    await websocket.accept()
+    session = ProximitySession(vehicle_height_inches, get_bridge_store())
+    await websocket.send_json({
+        "type": "session_started",
+        "vehicle_height_inches": vehicle_height_inches,
+        "dangerous_bridge_count": len(session.dangerous_bridges)
+    })
+
+    try:
+        while True:
+            # A bad frame (binary, not JSON, not an object) gets an error reply;
+            # only a disconnect ends the session
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            try:
+                fix = json.loads(message.get("text") or message.get("bytes") or "")
+                if not isinstance(fix, dict):
+                    raise TypeError(f"expected a JSON object, got {type(fix).__name__}")
+                heading = fix.get("heading")
+                alert = session.update(float(fix["lat"]), float(fix["lon"]),
+                                       float(heading) if heading is not None else None)
+            except (KeyError, TypeError, ValueError) as e:
+                await websocket.send_json({"type": "error", "detail": f"Invalid GPS fix: {e}"})
+                continue
+            if alert:
+                await websocket.send_json(alert)
+    except WebSocketDisconnect:
+        pass
+
+@app.get("/vehicles/lookup")
+def lookup_vehicle(q: str, limit: int = 5):
+    """
+    Ranked fuzzy search over the vehicle specification catalog
+    """
+    matches = get_vehicle_index().search(q, limit=limit)
+    return {"query": q, "best": get_vehicle_index().lookup(q), "matches": matches}
+
+@app.post("/vehicles/catalog")
+def load_vehicle_catalog(upload: VehicleCatalogUpload):
+    """
+    Bulk-load vehicle catalog entries (data/vehicles.json format)
+    """
+    try:
+        added = get_vehicle_index().add_entries(upload.entries)
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=f"Catalog entry missing field: {e}")
+    return {"added": added, "catalog_size": len(get_vehicle_index())}
+
+@app.post("/vehicles/catalog/reload")
+def reload_vehicle_catalog():
+    """
+    Re-read catalog files if they changed on disk
+    """
+    reloaded = get_vehicle_index().reload_if_changed()
+    return {"reloaded": reloaded, "catalog_size": len(get_vehicle_index())}
+
+@app.post("/fleet/vehicles")
+def register_fleet_vehicle(vehicle: FleetVehicle):
+    """
+    Register a vehicle for fleet geofence monitoring
+    """
+    try:
+        height_class = get_geofence_engine().register_vehicle(vehicle.vehicle_id, vehicle.height_inches)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"vehicle_id": vehicle.vehicle_id, "height_class": height_class}
+
+@app.delete("/fleet/vehicles/{vehicle_id}")
+def remove_fleet_vehicle(vehicle_id: str):
+    """
+    Stop fleet geofence monitoring for a vehicle
+    """
+    get_geofence_engine().remove_vehicle(vehicle_id)
+    return {"vehicle_id": vehicle_id, "removed": True}
+
+@app.post("/fleet/positions")
+def process_fleet_positions(batch: FleetPositionBatch):
+    """
+    Check one tick of fleet GPS fixes against bridge approach zones
+    Returns enter/exit/violation events
+    """
+    engine = get_geofence_engine()
+    events = engine.process_batch((fix.vehicle_id, fix.lat, fix.lon) for fix in batch.fixes)
+    return {
+        "processed": len(batch.fixes),
+        "tracked_vehicles": engine.vehicle_count,
+        "events": events
+    }
+
+# Max zoom a client may request (tiles past the precomputed zoom are cut on demand)
+MAX_TILE_REQUEST_ZOOM = 20
+
+@app.get("/tiles/{z}/{x}/{y}")
+def hazard_tile(
+    z: int,
+    x: int,
+    y: int,
+    request: Request,
+    height_class: Optional[str] = None,
+    vehicle_height_inches: Optional[float] = None,
+    format: str = "bin"
+):
+    """
+    Hazard tile: bridges dangerous for one height class, packed binary (or ?format=json)
+
+    Pass ?height_class= (see /tiles/height-classes) or ?vehicle_height_inches=.
+    Responses carry a content-hash ETag; If-None-Match gets 304.
+    """
+    if not 0 <= z <= MAX_TILE_REQUEST_ZOOM or not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise HTTPException(status_code=400, detail="Tile coordinates out of range")
+    if height_class is None:
+        if vehicle_height_inches is None:
+            raise HTTPException(status_code=400, detail="Pass height_class or vehicle_height_inches")
+        try:
+            height_class = height_class_for(vehicle_height_inches)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    if height_class not in HEIGHT_CLASSES:
+        raise HTTPException(status_code=400, detail=f"Unknown height class. Options: {', '.join(HEIGHT_CLASSES)}")
+
+    data, etag = get_hazard_tiles().get(height_class, z, x, y)
+    if format == "json":
+        etag = etag[:-1] + '-json"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=300"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    if format == "json":
+        return JSONResponse(unpack_tile(data), headers=headers)
+    return Response(content=data, media_type="application/octet-stream", headers=headers)
+
+@app.get("/tiles/height-classes")
+def tile_height_classes():
+    """
+    Height classes with their ceilings in inches, plus tile set stats
+    """
+    return {"height_classes": HEIGHT_CLASSES, "tiles": get_hazard_tiles().stats()}
+
+@app.get("/bridges")
+def list_bridges(
+    request: Request,
+    sort: str = DEFAULT_SORT,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    bbox: Optional[str] = None,
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+    radius_miles: Optional[float] = None,
+    min_clearance: Optional[int] = None,
+    max_clearance: Optional[int] = None,
+    min_incidents: Optional[int] = None,
+    max_incidents: Optional[int] = None,
+    q: Optional[str] = None
+):
+    """
+    Page through the bridge database
+
+    Filters: bbox=min_lat,min_lon,max_lat,max_lon; lat+lon+radius_miles;
+    min/max_clearance (inches); min/max_incidents; q (name or road).
+    Sort: clearance, incidents or name, "-" prefix for descending.
+    Pass next_cursor back as ?cursor= for the next page. Responses carry an
+    ETag; If-None-Match gets 304 until the bridge data changes.
+    """
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    box = None
+    if bbox:
+        try:
+            box = tuple(float(v) for v in bbox.split(","))
+        except ValueError:
+            box = ()
+        if len(box) != 4 or box[0] > box[2] or box[1] > box[3]:
+            raise HTTPException(status_code=400, detail="bbox must be min_lat,min_lon,max_lat,max_lon")
+    near = None
+    if (lat, lon, radius_miles) != (None, None, None):
+        if None in (lat, lon, radius_miles) or radius_miles <= 0:
+            raise HTTPException(status_code=400, detail="Radius search needs lat, lon and a positive radius_miles")
+        near = (lat, lon, radius_miles)
+
+    index = get_bridge_index()
+    params = {
+        "sort": sort, "limit": limit, "cursor": cursor, "bbox": box, "near": near,
+        "min_clearance": min_clearance, "max_clearance": max_clearance,
+        "min_incidents": min_incidents, "max_incidents": max_incidents, "q": q
+    }
+    etag = index.etag(params)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    try:
+        page = index.query(**params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    page["total_bridges"] = len(index)
+    return JSONResponse(page, headers=headers)
+
+@app.get("/bridges/{bridge_id}")
+def get_bridge(bridge_id: str, request: Request):
+    """
+    Single bridge record, with an ETag tied to the bridge data version
+    """
+    index = get_bridge_index()
+    bridge = index.bridges.get(bridge_id)
+    if bridge is None:
+        raise HTTPException(status_code=404, detail="Bridge not found")
+    etag = index.etag({"bridge_id": bridge_id})
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(bridge, headers=headers)
+
+@app.post("/incidents")
+def report_incident(report: IncidentReport):
+    """
+    Record a bridge strike without a photo analysis
+    """
+    return get_incident_store().record(
+        bridge_id=report.bridge_id,
+        vehicle_height_inches=report.vehicle_height_inches,
+        bridge_clearance_inches=report.bridge_clearance_inches,
+        severity=report.damage_severity,
+        region=report.region,
+        latitude=report.latitude,
+        longitude=report.longitude,
+        occurred_at=report.occurred_at
+    )
+
+@app.get("/incidents")
+def recent_incidents(limit: int = 50):
+    """
+    Latest recorded incidents, newest first (community heat map)
+    """
+    return {"incidents": get_incident_store().recent(max(1, min(limit, 500)))}
+
+@app.get("/incidents/stats")
+def incident_stats(months: int = 6, top: int = 10):
+    """
+    Dashboard aggregates: overall monthly trend plus the top bridges, regions
+    and vehicle classes, all read from the precomputed rollups
+    """
+    store = get_incident_store()
+    months = max(1, min(months, 36))
+    return {
+        "overall": store.rollup("all", months=months),
+        "top_bridges": store.breakdown("bridge", top),
+        "by_region": store.breakdown("region", top),
+        "by_vehicle_class": store.breakdown("vehicle_class", top)
+    }
+
+@app.get("/incidents/rollups/{scope}/{key}")
+def incident_rollup(scope: str, key: str, months: int = 12):
+    """
+    Strike counts and monthly trend for one bridge, region or vehicle class
+    """
+    if scope not in SCOPES or scope == "all":
+        raise HTTPException(status_code=400, detail="scope must be bridge, region or vehicle_class")
+    return get_incident_store().rollup(scope, key, months=max(1, min(months, 36)))
+
+def route_geometry_from(request: RouteGeometryRequest) -> RouteGeometry:
+    """
+    Route geometry from whichever of points, coordinates or polyline the request carries
+    Raises HTTPException 400 for a missing, malformed or too-short route.
+    """
+    try:
+        if request.polyline:
+            return RouteGeometry.from_polyline(request.polyline, request.precision)
+        if request.coordinates:
+            if any(len(c) != 2 for c in request.coordinates):
+                raise ValueError("Each coordinate must be [lon, lat]")
+            return RouteGeometry([(lat, lon) for lon, lat in request.coordinates])
+        if request.points:
+            if any(len(p) != 2 for p in request.points):
+                raise ValueError("Each route point must be [lat, lon]")
+            return RouteGeometry([(lat, lon) for lat, lon in request.points])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    raise HTTPException(status_code=400, detail="Provide points, coordinates or polyline")
+
+@app.post("/routes/geometry")
+def simplify_route_geometry(request: RouteSimplifyRequest):
+    """
+    Encoded, zoom-simplified route with cumulative distances
+
+    Send a route as points, GeoJSON coordinates (e.g. a Mapbox Directions
+    geometry) or an encoded polyline. The response carries the polyline
+    simplified for ?zoom (full resolution without it) and the cumulative miles
+    at each of its points, so distance-along-route is a binary search.
+    """
+    if request.method not in SIMPLIFY_METHODS:
+        raise HTTPException(status_code=400, detail=f"method must be one of: {', '.join(SIMPLIFY_METHODS)}")
+    geometry = route_geometry_from(request)
+    simplified = RouteGeometry(geometry.simplified(request.zoom, request.method))
+    return {
+        "polyline": simplified.encoded(precision=request.output_precision),
+        "precision": request.output_precision,
+        "zoom": request.zoom,
+        "method": request.method,
+        "points": len(simplified.points),
+        "original_points": len(geometry.points),
+        "distance_miles": round(geometry.length_miles, 3),
+        "cumulative_miles": [round(miles, 4) for miles in simplified.cumulative_miles]
+    }
+
+@app.post("/route-weather")
+def route_weather_forecast(request: RouteWeatherRequest):
+    """
+    Forecast clearance adjustment at every bridge on a route, at the time the truck reaches it
+
+    The route is points, GeoJSON coordinates or an encoded polyline. Forecast
+    calls are per weather cell along the route (at most MAX_WEATHER_CELLS),
+    however many bridges the route passes. With vehicle_height_inches, bridges
+    whose weather-adjusted clearance is below the vehicle are flagged.
+    """
+    geometry = route_geometry_from(request)
+    try:
+        result = route_weather(
+            geometry,
+            departure_time=request.departure_time,
+            speed_mph=request.average_speed_mph,
+            corridor_miles=request.corridor_miles
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if request.vehicle_height_inches is not None:
+        for bridge in result["bridges"]:
+            if "effective_clearance_inches" in bridge:
+                bridge["too_low"] = bridge["effective_clearance_inches"] <= request.vehicle_height_inches
+    return result
 
 # Run server
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,163 @@
+import asyncio
+import os
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_QUEUE_DEPTH = int(os.getenv("JOB_QUEUE_DEPTH", "100"))
+JOB_RESULT_TTL_SECONDS = float(os.getenv("JOB_RESULT_TTL_SECONDS", "900"))
+
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at its depth limit"""
+
+class Job:
+    """One submitted job and its result"""
+
+    def __init__(self, kind: str, handler: Callable[[], Awaitable[Any]]):
+        self.job_id = uuid.uuid4().hex
+        self.kind = kind
+        self.handler = handler
+        self.status = "queued"
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.progress: Optional[Dict[str, Any]] = None
+        self.changed = asyncio.Event()
+
+    def report_progress(self, progress: Dict[str, Any]) -> None:
+        """Publish progress for a running job (streamed as SSE "progress" events)"""
+        self.progress = progress
+        self.changed.set()
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        data = {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "queue_wait_seconds": round((self.started_at or time.time()) - self.submitted_at, 3),
+            "error": self.error,
+            "progress": self.progress
+        }
+        if include_result:
+            data["result"] = self.result
+        return data
+
+class JobQueue:
+    """
+    Bounded asyncio worker pool for long-running requests
+
+    submit() enqueues a job and returns immediately; a fixed number of
+    worker tasks drain the queue, so upstream concurrency is set by the
+    pool size rather than by how many clients are waiting. Finished jobs
+    are kept for JOB_RESULT_TTL_SECONDS for polling or SSE retrieval.
+    """
+
+    def __init__(
+        self,
+        workers: int = JOB_WORKERS,
+        max_depth: int = JOB_QUEUE_DEPTH,
+        result_ttl_seconds: float = JOB_RESULT_TTL_SECONDS
+    ):
+        self.worker_count = workers
+        self.max_depth = max_depth
+        self.result_ttl_seconds = result_ttl_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._jobs: Dict[str, Job] = {}
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def _ensure_started(self) -> None:
+        """Start worker tasks on the running event loop the first time they're needed"""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_depth)
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+
+    async def shutdown(self) -> None:
+        """Cancel worker tasks (queued jobs are dropped)"""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    def submit(self, kind: str, handler: Callable[[], Awaitable[Any]]) -> Job:
+        """Enqueue a job; raises QueueFullError when the queue is at max depth"""
+        self._ensure_started()
+        self._purge_expired()
+        job = Job(kind, handler)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise QueueFullError(f"Job queue is full ({self.max_depth} jobs waiting) - retry later")
+        self._jobs[job.job_id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Job by id, or None if unknown or expired"""
+        self._purge_expired()
+        return self._jobs.get(job_id)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            job.status = "running"
+            job.started_at = time.time()
+            job.changed.set()
+            try:
+                job.result = await job.handler()
+                job.status = "succeeded"
+                self.completed += 1
+            except Exception as e:
+                job.error = str(e)
+                job.status = "failed"
+                self.failed += 1
+            finally:
+                job.finished_at = time.time()
+                job.handler = None
+                job.changed.set()
+                self._queue.task_done()
+
+    def _purge_expired(self) -> None:
+        cutoff = time.time() - self.result_ttl_seconds
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.status in TERMINAL_STATUSES and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    async def wait_for_change(self, job: Job, timeout: float) -> None:
+        """Block until the job changes status or the timeout passes"""
+        try:
+            await asyncio.wait_for(job.changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        job.changed.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        statuses: Dict[str, int] = {}
+        for job in self._jobs.values():
+            statuses[job.status] = statuses.get(job.status, 0) + 1
+        return {
+            "workers": self.worker_count,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "max_queue_depth": self.max_depth,
+            "jobs_by_status": statuses,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected
+        }
+
+job_queue = JobQueue()
@@ -0,0 +1,40 @@
+import os
+import threading
+from typing import Any, Dict
+
+# OpenAI-compatible endpoints the app talks to, keyed by registry name
+LLM_ENDPOINTS: Dict[str, Dict[str, str]] = {
+    "nvidia": {
+        "base_url": "https://integrate.api.nvidia.com/v1",
+        "api_key_env": "NVIDIA_API_KEY"
+    }
+}
+
+DEFAULT_ENDPOINT = "nvidia"
+
+_clients: Dict[str, Any] = {}
+_lock = threading.Lock()
+
+def get_llm_client(name: str = DEFAULT_ENDPOINT):
+    """
+    Shared OpenAI-compatible client for an endpoint, created on first use
+    The openai package is only imported here, so it stays off the import path
+    """
+    client = _clients.get(name)
+    if client is not None:
+        return client
+    with _lock:
+        if name not in _clients:
+            from openai import OpenAI
+
+            endpoint = LLM_ENDPOINTS[name]
+            _clients[name] = OpenAI(
+                base_url=endpoint["base_url"],
+                api_key=os.getenv(endpoint["api_key_env"])
+            )
+        return _clients[name]
+
+def set_llm_client(name: str, client: Any) -> None:
+    """Register a prebuilt client (a proxy, a test double) under a name"""
+    with _lock:
+        _clients[name] = client
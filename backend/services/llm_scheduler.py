@@ -0,0 +1,209 @@
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+# Priority classes, most urgent first:
+#   interactive: a person is waiting on this answer (in-cab clearance checks, single analyses)
+#   pipeline:    agent workflow steps
+#   batch:       bulk jobs (sign ingestion)
+PRIORITIES = ("interactive", "pipeline", "batch")
+
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "40"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "200000"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+# A request waiting this long moves up one priority class, so batch work is never starved
+LLM_PRIORITY_AGING_SECONDS = float(os.getenv("LLM_PRIORITY_AGING_SECONDS", "30"))
+LLM_QUEUE_TIMEOUT_SECONDS = float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "120"))
+# Recent queue waits kept per class for percentiles
+WAIT_SAMPLES = 1000
+
+class SchedulerTimeout(Exception):
+    """Raised when a request waits longer than the queue timeout for an LLM slot"""
+
+class TokenBucket:
+    """Refills continuously at capacity per minute; the level may go negative to repay overdraws"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def seconds_until(self, amount: float) -> float:
+        return max(0.0, (min(amount, self.capacity) - self.level) / self.rate) if self.rate else 0.0
+
+class Slot:
+    """A granted LLM call; set tokens_used once the response usage is known"""
+
+    def __init__(self, priority: str, flow: str, tokens: int):
+        self.priority = priority
+        self.flow = flow
+        self.tokens_reserved = tokens
+        self.tokens_used: Optional[int] = None
+        self.enqueued_at = time.monotonic()
+        self.queue_wait_seconds = 0.0
+
+class LLMScheduler:
+    """
+    Admission control for every upstream LLM call
+
+    Callers block in slot() until their request is admitted. Admission takes
+    one request and the estimated tokens from two token buckets and respects
+    a concurrency cap. The next request admitted comes from the most urgent
+    non-empty priority class; within a class, flows (one per pipeline run or
+    batch job) take turns, so one caller's burst can't monopolize the class.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = LLM_TOKENS_PER_MINUTE,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        aging_seconds: float = LLM_PRIORITY_AGING_SECONDS,
+        queue_timeout_seconds: float = LLM_QUEUE_TIMEOUT_SECONDS
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.aging_seconds = aging_seconds
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self._cond = threading.Condition()
+        # priority -> flow -> waiting slots (FIFO); flows rotate to the back when served
+        self._queues: Dict[str, "OrderedDict[str, Deque[Slot]]"] = {p: OrderedDict() for p in PRIORITIES}
+        self.in_flight = 0
+        self._waits: Dict[str, Deque[float]] = {p: deque(maxlen=WAIT_SAMPLES) for p in PRIORITIES}
+        self._counters: Dict[str, Dict[str, int]] = {
+            p: {"admitted": 0, "timed_out": 0, "tokens_reserved": 0, "tokens_used": 0} for p in PRIORITIES
+        }
+
+    def _effective_class(self, slot: Slot, now: float) -> int:
+        promoted = int((now - slot.enqueued_at) / self.aging_seconds) if self.aging_seconds else 0
+        return max(0, PRIORITIES.index(slot.priority) - promoted)
+
+    def _next_slot(self, now: float) -> Optional[Slot]:
+        """Head of the first flow in the most urgent class (after aging)"""
+        best = None
+        for queue in self._queues.values():
+            if queue:
+                head = queue[next(iter(queue))][0]
+                rank = (self._effective_class(head, now), head.enqueued_at)
+                if best is None or rank < best[0]:
+                    best = (rank, head)
+        return best[1] if best else None
+
+    def _wait_seconds(self, slot: Slot) -> Optional[float]:
+        """0 if the slot can be admitted now, else how long until the buckets refill (None: until a release)"""
+        if self.in_flight >= self.max_concurrency:
+            return None
+        return max(self.requests.seconds_until(1), self.tokens.seconds_until(slot.tokens_reserved))
+
+    def _admit(self, slot: Slot, now: float) -> None:
+        queue = self._queues[slot.priority]
+        waiting = queue[slot.flow]
+        waiting.popleft()
+        del queue[slot.flow]
+        if waiting:
+            queue[slot.flow] = waiting  # back of the line behind the other flows
+        self.requests.level -= 1
+        self.tokens.level -= min(slot.tokens_reserved, self.tokens.capacity)
+        self.in_flight += 1
+        slot.queue_wait_seconds = now - slot.enqueued_at
+        self._waits[slot.priority].append(slot.queue_wait_seconds)
+        counters = self._counters[slot.priority]
+        counters["admitted"] += 1
+        counters["tokens_reserved"] += slot.tokens_reserved
+
+    def acquire(self, priority: str, tokens: int, flow: Optional[str] = None) -> Slot:
+        """Block until a call is admitted; raises SchedulerTimeout after the queue timeout"""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown LLM priority '{priority}'. Options: {', '.join(PRIORITIES)}")
+        slot = Slot(priority, flow or "default", max(int(tokens), 1))
+        deadline = slot.enqueued_at + self.queue_timeout_seconds
+        with self._cond:
+            self._queues[priority].setdefault(slot.flow, deque()).append(slot)
+            while True:
+                now = time.monotonic()
+                self.requests.refill(now)
+                self.tokens.refill(now)
+                wait = None
+                if self._next_slot(now) is slot:
+                    wait = self._wait_seconds(slot)
+                    if wait == 0:
+                        self._admit(slot, now)
+                        self._cond.notify_all()
+                        return slot
+                if now >= deadline:
+                    self._remove(slot)
+                    self._counters[priority]["timed_out"] += 1
+                    self._cond.notify_all()
+                    raise SchedulerTimeout(
+                        f"Waited {self.queue_timeout_seconds:.0f}s for an LLM slot ({priority} priority)"
+                    )
+                # Wake on a release, a bucket refill or the next aging step
+                timeout = min(deadline - now, wait if wait else self.aging_seconds or 1.0)
+                self._cond.wait(max(timeout, 0.001))
+
+    def _remove(self, slot: Slot) -> None:
+        queue = self._queues[slot.priority]
+        waiting = queue.get(slot.flow)
+        if waiting is not None:
+            waiting.remove(slot)
+            if not waiting:
+                del queue[slot.flow]
+
+    def release(self, slot: Slot) -> None:
+        """Free the concurrency slot and settle reserved vs actual tokens"""
+        with self._cond:
+            self.in_flight -= 1
+            if slot.tokens_used is not None:
+                self.tokens.refill(time.monotonic())
+                self.tokens.level += min(slot.tokens_reserved, self.tokens.capacity) - slot.tokens_used
+                self._counters[slot.priority]["tokens_used"] += slot.tokens_used
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, priority: str, tokens: int, flow: Optional[str] = None) -> Iterator[Slot]:
+        """with scheduler.slot("interactive", tokens=n) as slot: <call the LLM>; slot.tokens_used = ..."""
+        granted = self.acquire(priority, tokens, flow)
+        try:
+            yield granted
+        finally:
+            self.release(granted)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            now = time.monotonic()
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            classes = {}
+            for priority in PRIORITIES:
+                waits: List[float] = sorted(self._waits[priority])
+                classes[priority] = {
+                    "queued": sum(len(q) for q in self._queues[priority].values()),
+                    "flows_waiting": len(self._queues[priority]),
+                    **self._counters[priority],
+                    "queue_wait_ms": {
+                        "avg": round(sum(waits) / len(waits) * 1000, 1) if waits else 0.0,
+                        "p50": round(waits[len(waits) // 2] * 1000, 1) if waits else 0.0,
+                        "p95": round(waits[int(len(waits) * 0.95)] * 1000, 1) if waits else 0.0,
+                        "max": round(waits[-1] * 1000, 1) if waits else 0.0
+                    }
+                }
+            return {
+                "in_flight": self.in_flight,
+                "max_concurrency": self.max_concurrency,
+                "requests_per_minute": self.requests.capacity,
+                "tokens_per_minute": self.tokens.capacity,
+                "requests_available": round(self.requests.level, 2),
+                "tokens_available": round(self.tokens.level),
+                "classes": classes
+            }
+
+llm_scheduler = LLMScheduler()
@@ -0,0 +1,145 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Tuple
+
+VISION_LARGE = "meta/llama-3.2-90b-vision-instruct"
+VISION_SMALL = "meta/llama-3.2-11b-vision-instruct"
+TEXT_LARGE = "nvidia/llama-3.1-nemotron-70b-instruct-v1"
+TEXT_SMALL = "meta/llama-3.1-8b-instruct"
+
+# Per call site: models in preference order (each next one is faster) and the
+# time-to-result SLO in ms. Large multimodal models only where there is an image;
+# structured arithmetic and templated text go to the small model.
+# Override with MODEL_ROUTE_<SITE>="model,model" and MODEL_SLO_MS_<SITE>=ms.
+CALL_SITE_ROUTES: Dict[str, Dict[str, Any]] = {
+    "vision_agent": {"models": [VISION_LARGE, VISION_SMALL], "slo_ms": 12000},
+    "vision_measurement_agent": {"models": [VISION_LARGE, VISION_SMALL], "slo_ms": 8000},
+    "measurement_agent": {"models": [TEXT_SMALL], "slo_ms": 4000},
+    "risk_assessment_agent": {"models": [TEXT_LARGE, TEXT_SMALL], "slo_ms": 8000},
+    "recommendation_agent": {"models": [TEXT_SMALL], "slo_ms": 4000},
+    "bridge_sign": {"models": [VISION_LARGE, VISION_SMALL], "slo_ms": 10000},
+    "incident": {"models": [VISION_LARGE, VISION_SMALL], "slo_ms": 15000},
+    "check_clearance": {"models": [TEXT_LARGE, TEXT_SMALL], "slo_ms": 5000},
+    "plan_route": {"models": [TEXT_LARGE, TEXT_SMALL], "slo_ms": 20000},
+    "general": {"models": [TEXT_LARGE, TEXT_SMALL], "slo_ms": 20000}
+}
+
+# Latency samples older than this stop counting toward SLO decisions
+MODEL_LATENCY_WINDOW_SECONDS = float(os.getenv("MODEL_LATENCY_WINDOW_SECONDS", "300"))
+# A model needs this many recent samples before it can be judged slow
+MODEL_MIN_SAMPLES = int(os.getenv("MODEL_MIN_SAMPLES", "5"))
+# While downgraded, every Nth call goes to the preferred model to see if it has recovered
+MODEL_PROBE_EVERY = int(os.getenv("MODEL_PROBE_EVERY", "10"))
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+def route_config(call_site: str) -> Tuple[List[str], float]:
+    """(model chain, SLO seconds) for a call site, with env overrides"""
+    if call_site not in CALL_SITE_ROUTES:
+        raise ValueError(f"No model route for call site '{call_site}'")
+    config = CALL_SITE_ROUTES[call_site]
+    key = call_site.upper()
+    models = [m.strip() for m in os.getenv(f"MODEL_ROUTE_{key}", "").split(",") if m.strip()] or config["models"]
+    slo_ms = float(os.getenv(f"MODEL_SLO_MS_{key}", config["slo_ms"]))
+    return models, slo_ms / 1000
+
+class ModelStats:
+    """Recent latency plus success and response-completeness counters for one model at one call site"""
+
+    def __init__(self):
+        self.latencies: Deque[Tuple[float, float]] = deque(maxlen=500)
+        self.calls = 0
+        self.errors = 0
+        self.completeness_total = 0.0
+
+    def recent(self, now: float) -> List[float]:
+        cutoff = now - MODEL_LATENCY_WINDOW_SECONDS
+        while self.latencies and self.latencies[0][0] < cutoff:
+            self.latencies.popleft()
+        return [seconds for _, seconds in self.latencies]
+
+    def snapshot(self, now: float) -> Dict[str, Any]:
+        recent = self.recent(now)
+        return {
+            "calls": self.calls,
+            "error_rate": round(self.errors / self.calls, 3) if self.calls else 0.0,
+            "field_completeness": round(self.completeness_total / self.calls, 3) if self.calls else None,
+            "recent_samples": len(recent),
+            "latency_p50_ms": round(_percentile(recent, 0.5) * 1000) if recent else None,
+            "latency_p90_ms": round(_percentile(recent, 0.9) * 1000) if recent else None
+        }
+
+class ModelRouter:
+    """
+    Picks the model for each LLM call from its call site's route
+
+    The preferred model is used unless its recent p90 time-to-result breaches
+    the call site's SLO; then the call goes to the next model in the chain
+    that is not breaching. Downgraded sites send a periodic probe to the
+    preferred model, so they move back once it is fast again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str], ModelStats] = {}
+        self._downgraded_calls: Dict[str, int] = {}
+
+    def _model_stats(self, call_site: str, model: str) -> ModelStats:
+        return self._stats.setdefault((call_site, model), ModelStats())
+
+    def _breaching(self, call_site: str, model: str, slo_seconds: float, now: float) -> bool:
+        recent = self._model_stats(call_site, model).recent(now)
+        return len(recent) >= MODEL_MIN_SAMPLES and _percentile(recent, 0.9) > slo_seconds
+
+    def route(self, call_site: str) -> Tuple[str, str]:
+        """(model, reason) for a call; reason is "preferred", "probe" or why it was downgraded"""
+        models, slo_seconds = route_config(call_site)
+        now = time.time()
+        with self._lock:
+            if not self._breaching(call_site, models[0], slo_seconds, now):
+                self._downgraded_calls.pop(call_site, None)
+                return models[0], "preferred"
+            count = self._downgraded_calls[call_site] = self._downgraded_calls.get(call_site, 0) + 1
+            if count % MODEL_PROBE_EVERY == 0:
+                return models[0], "probe"
+            for model in models[1:]:
+                if not self._breaching(call_site, model, slo_seconds, now):
+                    break
+            else:
+                model = models[-1]
+            p90 = _percentile(self._model_stats(call_site, models[0]).recent(now), 0.9)
+            return model, f"downgraded: {models[0]} p90 {p90 * 1000:.0f} ms > SLO {slo_seconds * 1000:.0f} ms"
+
+    def record(self, call_site: str, model: str, seconds: float, ok: bool, completeness: float) -> Dict[str, Any]:
+        """Record one call's outcome; returns the model's current metrics for the agent log"""
+        now = time.time()
+        with self._lock:
+            stats = self._model_stats(call_site, model)
+            stats.latencies.append((now, seconds))
+            stats.calls += 1
+            stats.errors += 0 if ok else 1
+            stats.completeness_total += completeness
+            return stats.snapshot(now)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            sites: Dict[str, Any] = {}
+            for call_site in CALL_SITE_ROUTES:
+                models, slo_seconds = route_config(call_site)
+                sites[call_site] = {
+                    "models": models,
+                    "slo_ms": round(slo_seconds * 1000),
+                    "downgraded": self._breaching(call_site, models[0], slo_seconds, now),
+                    "metrics": {
+                        model: stats.snapshot(now)
+                        for (site, model), stats in self._stats.items() if site == call_site
+                    }
+                }
+            return sites
+
+model_router = ModelRouter()
@@ -0,0 +1,315 @@
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+# Fraction of HTTP requests profiled without being asked (0 = only on request)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+# Clients can ask for a profile with "X-Profile: 1" unless this is turned off
+PROFILE_ALLOW_HEADER = os.getenv("PROFILE_ALLOW_HEADER", "1").lower() in ("1", "true", "yes")
+PROFILE_HEADER = b"x-profile"
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_MAX_DEPTH = 128
+# Profiles are for looking at recent slow requests, so only the newest are kept
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "100"))
+PROFILE_DB_PATH = os.getenv(
+    "PROFILE_DB_PATH",
+    os.path.join(tempfile.gettempdir(), "bridgeguardian_profiles.db")
+)
+# Stack recorded for ticks where the request was waiting on the event loop with nothing running
+AWAITING_FRAME = "(awaiting)"
+TOP_FRAMES = 10
+
+_session: ContextVar[Optional["ProfileSession"]] = ContextVar("profile_session", default=None)
+_labels: Dict[Any, str] = {}
+
+def _frame_label(code) -> str:
+    """Collapsed-stack frame name: function (file:first line), cached per code object"""
+    label = _labels.get(code)
+    if label is None:
+        path = code.co_filename.replace("\\", "/")
+        for marker in ("site-packages/", "backend/", "lib/python"):
+            if marker in path:
+                path = path.split(marker, 1)[1]
+                if marker == "lib/python":
+                    path = path.split("/", 1)[-1]  # drop the version directory
+                break
+        label = f"{code.co_name} ({path}:{code.co_firstlineno})".replace(";", ":")
+        _labels[code] = label
+    return label
+
+def _collapse(root: str, frame) -> str:
+    names = []
+    while frame is not None and len(names) < PROFILE_MAX_DEPTH:
+        names.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    names.append(root)
+    return ";".join(reversed(names))
+
+class ProfileSession:
+    """
+    Samples for one request
+
+    The request's code runs on the event loop (only while its task is the
+    one running) and on worker threads it marks with thread_scope(); ticks
+    where it is doing neither count as AWAITING_FRAME.
+    """
+
+    def __init__(self, method: str, path: str, reason: str):
+        self.profile_id = uuid.uuid4().hex
+        self.method = method
+        self.path = path
+        self.reason = reason
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.duration_ms = 0.0
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.loop = asyncio.get_running_loop()
+        self.task = asyncio.current_task()
+        self.loop_thread = threading.get_ident()
+        self._threads: Counter = Counter()
+        # Held while sampling, so once finish() returns the stacks are no longer written
+        self._sample_lock = threading.Lock()
+        self.stopped = False
+
+    def attach(self, ident: int) -> None:
+        self._threads[ident] += 1
+
+    def detach(self, ident: int) -> None:
+        self._threads[ident] -= 1
+        if self._threads[ident] <= 0:
+            del self._threads[ident]
+
+    def finish(self) -> None:
+        """Stop taking samples; waits for one that is in progress"""
+        with self._sample_lock:
+            self.stopped = True
+
+    def sample(self, frames: Dict[int, Any]) -> None:
+        with self._sample_lock:
+            if not self.stopped:
+                self._sample(frames)
+
+    def _sample(self, frames: Dict[int, Any]) -> None:
+        recorded = False
+        if asyncio.current_task(self.loop) is self.task and self.loop_thread in frames:
+            self.stacks[_collapse("event-loop", frames[self.loop_thread])] += 1
+            recorded = True
+        for ident in list(self._threads):
+            if ident in frames and ident != self.loop_thread:
+                self.stacks[_collapse("worker", frames[ident])] += 1
+                recorded = True
+        if not recorded:
+            self.stacks[AWAITING_FRAME] += 1
+        self.samples += 1
+
+    def collapsed(self) -> str:
+        """Brendan Gregg collapsed stacks: one "frame;frame;frame count" line per stack"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+    def top_frames(self, limit: int = TOP_FRAMES) -> List[Dict[str, Any]]:
+        """Leaf frames by share of samples (self time)"""
+        leaves: Counter = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        total = sum(leaves.values()) or 1
+        return [{"frame": frame, "share": round(count / total, 3)} for frame, count in leaves.most_common(limit)]
+
+class SamplingProfiler:
+    """
+    One background thread that snapshots every thread's stack each interval
+    while at least one session is active, and exits when none are
+    """
+
+    def __init__(self, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.interval = interval_ms / 1000
+        self._sessions: List[ProfileSession] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, session: ProfileSession) -> None:
+        with self._lock:
+            self._sessions.append(session)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+
+    def stop(self, session: ProfileSession) -> None:
+        with self._lock:
+            if session in self._sessions:
+                self._sessions.remove(session)
+        # The sampler thread may still hold a copy of the session list
+        session.finish()
+        session.duration_ms = round((time.perf_counter() - session.start) * 1000, 1)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if not self._sessions:
+                    self._thread = None
+                    return
+                sessions = list(self._sessions)
+            frames = sys._current_frames()
+            for session in sessions:
+                session.sample(frames)
+            del frames
+            time.sleep(self.interval)
+
+sampling_profiler = SamplingProfiler()
+
+class _AttachedThread:
+    def __init__(self, session: ProfileSession):
+        self.session = session
+        self.ident = threading.get_ident()
+
+    def __enter__(self) -> None:
+        self.session.attach(self.ident)
+
+    def __exit__(self, *exc_info) -> None:
+        self.session.detach(self.ident)
+
+_NOT_PROFILED = nullcontext()
+
+def thread_scope():
+    """
+    Context manager marking the current worker thread as running the profiled request, if there is one
+    Use where request work hands off to a thread (asyncio.to_thread and the
+    threadpool copy the request's context, so the session is visible there).
+    """
+    session = _session.get()
+    return _NOT_PROFILED if session is None else _AttachedThread(session)
+
+class ProfileStore:
+    """
+    SQLite store of the newest PROFILE_KEEP request profiles
+    """
+
+    def __init__(self, db_path: str = PROFILE_DB_PATH, keep: int = PROFILE_KEEP):
+        self.db_path = db_path
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS profiles (
+                profile_id TEXT PRIMARY KEY,
+                method TEXT NOT NULL,
+                path TEXT NOT NULL,
+                status INTEGER,
+                reason TEXT NOT NULL,
+                started_at REAL NOT NULL,
+                duration_ms REAL NOT NULL,
+                samples INTEGER NOT NULL,
+                interval_ms REAL NOT NULL,
+                top_frames TEXT NOT NULL,
+                collapsed TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS profiles_started_at ON profiles (started_at);
+        """)
+        self._conn.commit()
+
+    def save(self, session: ProfileSession, status: Optional[int], interval_ms: float = PROFILE_INTERVAL_MS) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO profiles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (session.profile_id, session.method, session.path, status, session.reason, session.started_at,
+                 session.duration_ms, session.samples, interval_ms, json.dumps(session.top_frames()),
+                 session.collapsed())
+            )
+            self._conn.execute(
+                "DELETE FROM profiles WHERE profile_id NOT IN "
+                "(SELECT profile_id FROM profiles ORDER BY started_at DESC LIMIT ?)", (self.keep,)
+            )
+            self._conn.commit()
+
+    def recent(self, limit: int = 50, path: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Newest first, without the stacks"""
+        query = ("SELECT profile_id, method, path, status, reason, started_at, duration_ms, samples, interval_ms, "
+                 "top_frames FROM profiles")
+        params: List[Any] = []
+        if path:
+            query += " WHERE path = ?"
+            params.append(path)
+        query += " ORDER BY started_at DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        keys = ("profile_id", "method", "path", "status", "reason", "started_at", "duration_ms", "samples",
+                "interval_ms", "top_frames")
+        return [{**dict(zip(keys, row)), "top_frames": json.loads(row[-1])} for row in rows]
+
+    def collapsed(self, profile_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT collapsed FROM profiles WHERE profile_id = ?", (profile_id,)).fetchone()
+        return row[0] if row else None
+
+# Singleton instance
+_profile_store: Optional[ProfileStore] = None
+_store_lock = threading.Lock()
+
+def get_profile_store() -> ProfileStore:
+    """Get or create the profile store"""
+    global _profile_store
+    with _store_lock:
+        if _profile_store is None:
+            _profile_store = ProfileStore()
+    return _profile_store
+
+def _wants_profile(headers: List[Any]) -> Optional[str]:
+    """Why this request should be profiled, or None"""
+    if PROFILE_ALLOW_HEADER:
+        for name, value in headers:
+            if name == PROFILE_HEADER:
+                if value.lower() in (b"1", b"true", b"yes"):
+                    return "header"
+                break
+    if PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE:
+        return "sampled"
+    return None
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles opted-in HTTP requests
+    Off (no header, no sample): one header scan per request. On: the response
+    carries X-Profile-Id, and the profile is saved once the response is sent.
+    Plain ASGI rather than BaseHTTPMiddleware so the endpoint runs in this task.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        reason = _wants_profile(scope["headers"]) if scope["type"] == "http" else None
+        if reason is None:
+            await self.app(scope, receive, send)
+            return
+
+        session = ProfileSession(scope["method"], scope["path"], reason)
+        status: Optional[int] = None
+
+        async def send_with_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", session.profile_id.encode())]
+            await send(message)
+
+        token = _session.set(session)
+        sampling_profiler.start(session)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            sampling_profiler.stop(session)
+            _session.reset(token)
+            await asyncio.to_thread(get_profile_store().save, session, status)
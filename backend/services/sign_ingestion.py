@@ -0,0 +1,405 @@
+"""
+Batch bridge-sign ingestion: read clearance signs from a directory or archive
+of survey photos, match each to the nearest bridge and merge the clearances
+
+CLI (from backend/):  python -m services.sign_ingestion PATH [--concurrency N] [--rate R] [--dry-run]
+"""
+import argparse
+import asyncio
+import base64
+import json
+import math
+import os
+import struct
+import tarfile
+import threading
+import time
+import zipfile
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from services.uploads import MAX_UPLOAD_BYTES
+from tools.bridge_query import get_bridge_index
+from tools.bridge_store import get_bridge_store
+
+SIGN_INGEST_CONCURRENCY = int(os.getenv("SIGN_INGEST_CONCURRENCY", "4"))
+# Sign analyses started per second across the whole batch (0 = no limit)
+SIGN_INGEST_RATE_PER_SECOND = float(os.getenv("SIGN_INGEST_RATE_PER_SECOND", "2"))
+# A sign belongs to the closest bridge within this radius of where it was photographed
+SIGN_MATCH_RADIUS_MILES = float(os.getenv("SIGN_MATCH_RADIUS_MILES", "0.1"))
+# Readings this far from the stored clearance are flagged for review instead of merged
+SIGN_CONFLICT_INCHES = int(os.getenv("SIGN_CONFLICT_INCHES", "6"))
+# Readings within this many inches of the stored clearance confirm it (raise its confidence)
+SIGN_AGREE_INCHES = int(os.getenv("SIGN_AGREE_INCHES", "2"))
+MAX_BATCH_IMAGES = int(os.getenv("MAX_BATCH_IMAGES", "2000"))
+
+DEFAULT_SIGN_CONFIDENCE = 0.5
+DATA_SOURCE = "sign_survey"
+IMAGE_TYPES = {".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".png": "image/png", ".webp": "image/webp"}
+
+# (image_base64, media_type) -> raw model response
+Analyzer = Callable[[str, str], str]
+# (name, loader returning the image bytes)
+ImageSource = Tuple[str, Callable[[], bytes]]
+
+# ============= EXIF GPS =============
+
+_EXIF_TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 7: 1, 9: 4, 10: 8}
+GPS_IFD_TAG = 0x8825
+
+def read_gps_exif(data: bytes) -> Optional[Tuple[float, float]]:
+    """(lat, lon) from a JPEG's EXIF GPS tags, or None if it has none"""
+    if data[:2] != b"\xff\xd8":
+        return None
+    offset = 2
+    while offset + 4 <= len(data) and data[offset] == 0xFF:
+        marker = data[offset + 1]
+        if marker in (0xD9, 0xDA):  # end of image / start of scan: no more metadata
+            return None
+        length = struct.unpack(">H", data[offset + 2:offset + 4])[0]
+        if marker == 0xE1 and data[offset + 4:offset + 10] == b"Exif\x00\x00":
+            try:
+                return _parse_tiff_gps(data[offset + 10:offset + 2 + length])
+            except (struct.error, IndexError, ZeroDivisionError):
+                return None
+        offset += 2 + length
+    return None
+
+def _parse_tiff_gps(tiff: bytes) -> Optional[Tuple[float, float]]:
+    if tiff[:2] == b"II":
+        endian = "<"
+    elif tiff[:2] == b"MM":
+        endian = ">"
+    else:
+        return None
+
+    def u16(at: int) -> int:
+        return struct.unpack_from(endian + "H", tiff, at)[0]
+
+    def u32(at: int) -> int:
+        return struct.unpack_from(endian + "I", tiff, at)[0]
+
+    def entries(ifd: int) -> Dict[int, Tuple[int, int, int]]:
+        """tag -> (type, count, offset of the value bytes)"""
+        found = {}
+        for i in range(u16(ifd)):
+            entry = ifd + 2 + 12 * i
+            tag, value_type, count = u16(entry), u16(entry + 2), u32(entry + 4)
+            inline = _EXIF_TYPE_SIZES.get(value_type, 1) * count <= 4
+            found[tag] = (value_type, count, entry + 8 if inline else u32(entry + 8))
+        return found
+
+    ifd0 = entries(u32(4))
+    if GPS_IFD_TAG not in ifd0:
+        return None
+    gps = entries(u32(ifd0[GPS_IFD_TAG][2]))
+
+    def degrees(value_tag: int, ref_tag: int) -> Optional[float]:
+        if value_tag not in gps or ref_tag not in gps:
+            return None
+        at = gps[value_tag][2]
+        d, m, s = (u32(at + 8 * i) / u32(at + 8 * i + 4) for i in range(3))
+        ref = tiff[gps[ref_tag][2]:gps[ref_tag][2] + 1]
+        return -(d + m / 60 + s / 3600) if ref in (b"S", b"W") else d + m / 60 + s / 3600
+
+    lat, lon = degrees(2, 1), degrees(4, 3)
+    return (round(lat, 6), round(lon, 6)) if lat is not None and lon is not None else None
+
+# ============= SOURCES =============
+
+def _is_image(name: str) -> bool:
+    base = os.path.basename(name)
+    return not base.startswith(".") and os.path.splitext(base)[1].lower() in IMAGE_TYPES
+
+def _oversized() -> None:
+    raise ValueError(f"Image exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)} MB")
+
+def open_sign_sources(path: str) -> List[ImageSource]:
+    """
+    Sign photos in a directory (recursive), .zip or .tar(.gz) archive, sorted by name
+    Images are read lazily, one at a time, when their analysis starts.
+    """
+    if os.path.isdir(path):
+        names = sorted(
+            os.path.join(root, name)
+            for root, _, files in os.walk(path) for name in files if _is_image(name)
+        )
+
+        def file_loader(name: str) -> Callable[[], bytes]:
+            def load() -> bytes:
+                with open(name, "rb") as f:
+                    return f.read(MAX_UPLOAD_BYTES + 1)
+            return load
+        sources = [(os.path.relpath(name, path), file_loader(name)) for name in names]
+    elif zipfile.is_zipfile(path):
+        archive = zipfile.ZipFile(path)
+
+        def zip_loader(info: zipfile.ZipInfo) -> Callable[[], bytes]:
+            def load() -> bytes:
+                # Declared size first, then a bounded read in case the header lies (zip bombs)
+                if info.file_size > MAX_UPLOAD_BYTES:
+                    _oversized()
+                with archive.open(info) as member:
+                    return member.read(MAX_UPLOAD_BYTES + 1)
+            return load
+        sources = [
+            (info.filename, zip_loader(info))
+            for info in sorted(archive.infolist(), key=lambda info: info.filename)
+            if not info.is_dir() and _is_image(info.filename)
+        ]
+    elif tarfile.is_tarfile(path):
+        archive = tarfile.open(path)
+        # Loads run on worker threads and a TarFile has one shared file position
+        tar_lock = threading.Lock()
+
+        def tar_loader(member: tarfile.TarInfo) -> Callable[[], bytes]:
+            def load() -> bytes:
+                if member.size > MAX_UPLOAD_BYTES:
+                    _oversized()
+                with tar_lock:
+                    return archive.extractfile(member).read(MAX_UPLOAD_BYTES + 1)
+            return load
+        sources = [
+            (member.name, tar_loader(member))
+            for member in sorted(archive.getmembers(), key=lambda member: member.name)
+            if member.isfile() and _is_image(member.name)
+        ]
+    else:
+        raise ValueError("Expected a directory, .zip or .tar archive of sign photos")
+
+    if len(sources) > MAX_BATCH_IMAGES:
+        raise ValueError(f"Batch has {len(sources)} images; the limit is {MAX_BATCH_IMAGES}")
+    return sources
+
+# ============= MERGING =============
+
+def parse_sign_reading(response: str) -> Optional[Tuple[int, float]]:
+    """(minimum clearance inches, confidence) from a sign analysis response, or None if unreadable"""
+    if "```json" in response:
+        json_str = response.split("```json")[1].split("```")[0].strip()
+    elif "```" in response:
+        json_str = response.split("```")[1].split("```")[0].strip()
+    else:
+        json_str = response.strip()
+    try:
+        analysis = json.loads(json_str)
+        found = [c for c in analysis.get("clearances_found") or [] if c.get("clearance_inches")]
+        clearance = analysis.get("minimum_clearance") or min((c["clearance_inches"] for c in found), default=None)
+        if not clearance:
+            return None
+        # Confidence of the sign that gave the minimum, else the best reading
+        matching = [c.get("confidence") for c in found if c["clearance_inches"] == clearance and c.get("confidence")]
+        readings = matching or [c.get("confidence") for c in found if c.get("confidence")]
+        confidence = max(readings) if readings else DEFAULT_SIGN_CONFIDENCE
+        return int(clearance), min(max(float(confidence), 0.01), 1.0)
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+def merge_clearance(bridge: Dict[str, Any], clearance: int, confidence: float) -> Dict[str, Any]:
+    """
+    Bridge record updated with a sign reading
+
+    A sign posting less than the stored clearance wins outright: the stored
+    value must never tell a truck it fits under a lower posted sign. A higher
+    reading moves the clearance up by the confidence-weighted mean (rounded
+    down), which stays at or below the sign. Confidence only grows when the
+    two agree within SIGN_AGREE_INCHES; otherwise it is the lower of the two.
+    """
+    stored = bridge["clearance_inches"]
+    stored_confidence = bridge.get("confidence") or DEFAULT_SIGN_CONFIDENCE
+    if clearance <= stored:
+        merged = clearance
+    else:
+        merged = int(math.floor((stored * stored_confidence + clearance * confidence) / (stored_confidence + confidence)))
+    if abs(clearance - stored) <= SIGN_AGREE_INCHES:
+        merged_confidence = 1 - (1 - stored_confidence) * (1 - confidence)
+    else:
+        merged_confidence = min(stored_confidence, confidence)
+    return {
+        **bridge,
+        "clearance_inches": merged,
+        "confidence": round(merged_confidence, 3),
+        "last_verified": date.today().isoformat(),
+        "data_source": DATA_SOURCE
+    }
+
+def new_bridge_record(lat: float, lon: float, clearance: int, confidence: float, name: str) -> Dict[str, Any]:
+    """Record for a signed clearance with no known bridge nearby"""
+    return {
+        "bridge_id": f"survey_{lat:.5f}_{lon:.5f}",
+        "name": f"Surveyed clearance ({os.path.basename(name)})",
+        "latitude": round(lat, 6),
+        "longitude": round(lon, 6),
+        "clearance_inches": clearance,
+        "confidence": round(confidence, 3),
+        "road_name": "",
+        "direction": "",
+        "incident_count": 0,
+        "last_verified": date.today().isoformat(),
+        "data_source": DATA_SOURCE,
+        "warnings": []
+    }
+
+# ============= INGESTION =============
+
+class RateLimiter:
+    """Spaces out starts to at most rate_per_second (0 = unlimited)"""
+
+    def __init__(self, rate_per_second: float):
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_start - now
+            self._next_start = max(now, self._next_start) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+async def ingest_signs(
+    sources: List[ImageSource],
+    analyze: Analyzer,
+    concurrency: int = SIGN_INGEST_CONCURRENCY,
+    rate_per_second: float = SIGN_INGEST_RATE_PER_SECOND,
+    persist: bool = True,
+    on_progress: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Dict[str, Any]:
+    """
+    Analyze sign photos concurrently and upsert the readings into the bridge store
+
+    At most `concurrency` analyses run at once and new ones start no faster
+    than `rate_per_second`. Readings are matched to the nearest bridge by EXIF
+    GPS and applied in one store update at the end, so caches and tiles
+    rebuild once per batch. persist=False leaves the store untouched (dry run).
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    limiter = RateLimiter(rate_per_second)
+    index = get_bridge_index()
+    results: List[Optional[Dict[str, Any]]] = [None] * len(sources)
+    start = time.time()
+    done = 0
+
+    def progress() -> Dict[str, Any]:
+        elapsed = time.time() - start
+        return {
+            "done": done,
+            "total": len(sources),
+            "elapsed_seconds": round(elapsed, 2),
+            "images_per_second": round(done / elapsed, 2) if elapsed else 0.0
+        }
+
+    def prepare(name: str, load: Callable[[], bytes]) -> Tuple[Optional[Tuple[float, float]], str, str]:
+        """(gps, media type, base64 image); runs on a worker thread"""
+        data = load()
+        if len(data) > MAX_UPLOAD_BYTES:
+            _oversized()
+        return (read_gps_exif(data), IMAGE_TYPES[os.path.splitext(name)[1].lower()],
+                base64.b64encode(data).decode("ascii"))
+
+    async def process(i: int, name: str, load: Callable[[], bytes]) -> None:
+        nonlocal done
+        result: Dict[str, Any] = {"file": name}
+        async with semaphore:
+            try:
+                result["gps"], media_type, image_base64 = await asyncio.to_thread(prepare, name, load)
+                await limiter.wait()
+                reading = parse_sign_reading(await asyncio.to_thread(analyze, image_base64, media_type))
+                if reading is None:
+                    result["status"] = "unreadable"
+                else:
+                    result["clearance_inches"], result["confidence"] = reading
+                    result["status"] = "read"
+            except Exception as e:
+                result["status"] = "failed"
+                result["error"] = str(e)
+        results[i] = result
+        done += 1
+        if on_progress:
+            on_progress(progress())
+
+    await asyncio.gather(*(process(i, name, load) for i, (name, load) in enumerate(sources)))
+
+    # Match and merge in file order, so repeated signs of one bridge accumulate
+    store = get_bridge_store()
+    updates: Dict[str, Dict[str, Any]] = {}
+    for result in results:
+        if result["status"] != "read":
+            continue
+        if not result["gps"]:
+            result["status"] = "no_location"
+            continue
+        lat, lon = result["gps"]
+        clearance, confidence = result["clearance_inches"], result["confidence"]
+        match = index.nearest(lat, lon, SIGN_MATCH_RADIUS_MILES)
+        if match is None:
+            record = new_bridge_record(lat, lon, clearance, confidence, result["file"])
+            bridge = updates.get(record["bridge_id"]) or store.get(record["bridge_id"])
+        else:
+            bridge = updates.get(match[0]["bridge_id"]) or match[0]
+            result["distance_miles"] = round(match[1], 4)
+        if bridge and abs(clearance - bridge["clearance_inches"]) > SIGN_CONFLICT_INCHES:
+            result["bridge_id"] = bridge["bridge_id"]
+            result["stored_clearance_inches"] = bridge["clearance_inches"]
+            result["status"] = "conflict"
+            continue
+        if bridge:
+            record = merge_clearance(bridge, clearance, confidence)
+            result["status"] = "merged"
+        else:
+            result["status"] = "created"
+        updates[record["bridge_id"]] = record
+        result["bridge_id"] = record["bridge_id"]
+        result["merged_clearance_inches"] = record["clearance_inches"]
+
+    if persist and updates:
+        store.upsert(list(updates.values()))
+        await asyncio.to_thread(store.save)
+
+    statuses: Dict[str, int] = {}
+    for result in results:
+        statuses[result["status"]] = statuses.get(result["status"], 0) + 1
+    return {
+        **progress(),
+        "concurrency": concurrency,
+        "rate_per_second": rate_per_second,
+        "persisted": persist and bool(updates),
+        "bridges_updated": len(updates),
+        "statuses": statuses,
+        "results": results
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest a batch of bridge clearance sign photos")
+    parser.add_argument("path", help="Directory, .zip or .tar archive of sign photos")
+    parser.add_argument("--concurrency", type=int, default=SIGN_INGEST_CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=SIGN_INGEST_RATE_PER_SECOND, help="Analyses started per second (0 = no limit)")
+    parser.add_argument("--dry-run", action="store_true", help="Report matches without updating bridges.csv")
+    args = parser.parse_args()
+
+    from main import call_nemotron, BRIDGE_SIGN_PROMPT
+
+    def analyze(image_base64: str, media_type: str) -> str:
+        return call_nemotron(BRIDGE_SIGN_PROMPT, image_base64, media_type, priority="batch", flow="cli", call_site="bridge_sign")
+
+    def report(progress: Dict[str, Any]) -> None:
+        print(f"\r{progress['done']}/{progress['total']} signs, {progress['images_per_second']} images/s", end="", flush=True)
+
+    summary = asyncio.run(ingest_signs(
+        open_sign_sources(args.path),
+        analyze,
+        concurrency=args.concurrency,
+        rate_per_second=args.rate,
+        persist=not args.dry_run,
+        on_progress=report
+    ))
+    print()
+    for result in summary["results"]:
+        print(f"{result['status']:12s} {result['file']}  {result.get('bridge_id') or result.get('error') or ''}")
+    print(f"{summary['done']} signs in {summary['elapsed_seconds']} s ({summary['images_per_second']} images/s), "
+          f"{summary['bridges_updated']} bridges updated: {summary['statuses']}")
+
+if __name__ == "__main__":
+    main()
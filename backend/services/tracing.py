@@ -0,0 +1,453 @@
+import inspect
+import json
+import os
+import random
+import re
+import socket
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import nullcontext
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+# Fraction of HTTP requests traced without being asked (0 = only on request)
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+TRACE_KEEP = int(os.getenv("TRACE_KEEP", "200"))
+# OTLP/HTTP JSON collector to push finished traces to, e.g. http://localhost:4318/v1/traces
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT")
+SERVICE_NAME = "bridgeguardian-api"
+
+# Span kinds: where the time went
+#   server:        the whole HTTP request
+#   agent:         one LangGraph node
+#   tool:          an ExternalTools call or local computation an agent delegates to
+#   http:          an outbound request, with dns / connect / tls / wait children
+#   llm:           an LLM call, with queue / first_token / generation children
+#   serialization: encoding uploads, checkpoint writes, building and sending the response
+SPAN_KINDS = ("server", "agent", "tool", "http", "llm", "serialization")
+# OTLP SpanKind: SERVER for the request, CLIENT for outbound calls, INTERNAL otherwise
+OTLP_KINDS = {"server": 2, "http": 3, "llm": 3}
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+class Span:
+    """One timed operation; times are epoch seconds"""
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "start", "end", "attributes", "thread", "error")
+
+    def __init__(self, trace: "Trace", name: str, kind: str, parent_id: Optional[str],
+                 start: Optional[float] = None, attributes: Optional[Dict[str, Any]] = None):
+        self.trace = trace
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start = time.time() if start is None else start
+        self.end: Optional[float] = None
+        self.attributes = attributes or {}
+        self.thread = threading.get_ident()
+        self.error: Optional[str] = None
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def child(self, name: str, kind: str, start: float, end: float, **attributes: Any) -> "Span":
+        """Record a finished child span after the fact (e.g. a phase measured with timestamps)"""
+        span = Span(self.trace, name, kind, self.span_id, start, attributes)
+        span.end = end
+        self.trace.add(span)
+        return span
+
+class Trace:
+    """All spans of one request, appended from any thread"""
+
+    def __init__(self, trace_id: Optional[str] = None, remote_parent: Optional[str] = None):
+        self.trace_id = trace_id or uuid.uuid4().hex
+        self.remote_parent = remote_parent
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    @property
+    def root(self) -> Optional[Span]:
+        return self.spans[0] if self.spans else None
+
+_current: ContextVar[Optional[Span]] = ContextVar("trace_span", default=None)
+_NOT_TRACED = nullcontext()
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+class _ActiveSpan:
+    def __init__(self, span: Span):
+        self.span = span
+        self._token = None
+
+    def __enter__(self) -> Span:
+        self.span.trace.add(self.span)
+        self._token = _current.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.span.end = time.time()
+        if exc is not None:
+            self.span.error = f"{exc_type.__name__}: {exc}"
+        _current.reset(self._token)
+
+def span(name: str, kind: str = "tool", **attributes: Any):
+    """
+    Context manager timing a child of the current span; a no-op (yielding None)
+    when the request isn't traced
+    """
+    parent = _current.get()
+    if parent is None:
+        return _NOT_TRACED
+    return _ActiveSpan(Span(parent.trace, name, kind, parent.span_id, attributes=attributes))
+
+def traced(kind: str = "tool", name: Optional[str] = None):
+    """Decorator: run the function inside a span when the request is traced"""
+    def decorate(func: Callable) -> Callable:
+        span_name = name or func.__name__
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if _current.get() is None:
+                    return await func(*args, **kwargs)
+                with span(span_name, kind):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return func(*args, **kwargs)
+            with span(span_name, kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def record_llm_phases(parent: Optional[Span], enqueued_at: float, call_start: float,
+                      first_token_at: Optional[float], end: float) -> None:
+    """Queue wait, time to first token and generation as children of an LLM span"""
+    if parent is None:
+        return
+    if call_start > enqueued_at:
+        parent.child("queue", "llm", enqueued_at, call_start)
+    if first_token_at is not None:
+        parent.child("first_token", "llm", call_start, first_token_at)
+        parent.child("generation", "llm", first_token_at, end)
+        parent.set(time_to_first_token_ms=round((first_token_at - call_start) * 1000, 1))
+
+# ============= OUTBOUND HTTP =============
+
+_instrument_lock = threading.Lock()
+_instrumented = False
+_URLLIB3_TLS_HOOKS = ("_ssl_wrap_socket_and_match_hostname", "ssl_wrap_socket")
+
+def _instrument_urllib3() -> None:
+    """
+    Split connection setup into dns / connect / tls spans
+    Wraps the two urllib3 hooks every requests call goes through; both pass
+    straight through when the calling request isn't traced. The TLS hook is
+    private and differs between urllib3 1.x and 2.x; if neither is found
+    there is no tls span (its time stays in the parent http span).
+    """
+    global _instrumented
+    with _instrument_lock:
+        if _instrumented:
+            return
+        import urllib3.connection
+        import urllib3.util.connection
+
+        create_connection = urllib3.util.connection.create_connection
+        # 2.x: _ssl_wrap_socket_and_match_hostname; 1.26: ssl_wrap_socket imported into urllib3.connection
+        tls_hook = next(
+            (name for name in _URLLIB3_TLS_HOOKS if callable(getattr(urllib3.connection, name, None))), None
+        )
+        wrap_socket = getattr(urllib3.connection, tls_hook) if tls_hook else None
+
+        def traced_create_connection(address, *args, **kwargs):
+            parent = _current.get()
+            if parent is None:
+                return create_connection(address, *args, **kwargs)
+            host, port = address
+            with span("dns", "http", host=host):
+                family = urllib3.util.connection.allowed_gai_family()
+                addresses = socket.getaddrinfo(host.strip("[]"), port, family, socket.SOCK_STREAM)
+            with span("connect", "http") as connect:
+                error: Optional[OSError] = None
+                # Same fallback order urllib3 uses, but resolving once
+                for *_, sockaddr in addresses:
+                    try:
+                        sock = create_connection((sockaddr[0], port), *args, **kwargs)
+                        connect.set(address=sockaddr[0])
+                        return sock
+                    except OSError as e:
+                        error = e
+                raise error or OSError(f"No addresses for {host}")
+
+        def traced_wrap_socket(*args, **kwargs):
+            if _current.get() is None:
+                return wrap_socket(*args, **kwargs)
+            with span("tls", "http"):
+                return wrap_socket(*args, **kwargs)
+
+        urllib3.util.connection.create_connection = traced_create_connection
+        if tls_hook:
+            setattr(urllib3.connection, tls_hook, traced_wrap_socket)
+        else:
+            print(f"urllib3 {urllib3.__version__}: no TLS hook found, tracing without tls spans")
+        _instrumented = True
+
+class _TracedHTTP:
+    """The requests functions tools use, each call in an http span"""
+
+    def __init__(self, http):
+        self._http = http
+
+    def _call(self, method: str, url: str, **kwargs):
+        host = urlsplit(url).hostname
+        # Query strings carry API keys, so only the host and path are recorded
+        with span(f"{method} {host}", "http", url=url.split("?")[0]) as http_span:
+            response = getattr(self._http, method.lower())(url, **kwargs)
+            http_span.set(status_code=response.status_code)
+            # elapsed runs from sending the request to parsing the headers: connection setup plus server time
+            setup = sum(s.end - s.start for s in http_span.trace.spans
+                        if s.parent_id == http_span.span_id and s.end is not None)
+            headers_at = http_span.start + setup + response.elapsed.total_seconds()
+            http_span.child("wait", "http", http_span.start + setup, headers_at)
+            return response
+
+    def get(self, url: str, **kwargs):
+        return self._call("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self._call("POST", url, **kwargs)
+
+def traced_http(http):
+    """requests itself when the request isn't traced, else a wrapper recording http spans"""
+    if _current.get() is None:
+        return http
+    _instrument_urllib3()
+    return _TracedHTTP(http)
+
+# ============= EXPORT =============
+
+def waterfall(trace: Trace) -> Dict[str, Any]:
+    """Compact view for API responses: spans in start order with offsets and depth"""
+    spans = sorted(trace.spans, key=lambda s: s.start)
+    if not spans:
+        return {"trace_id": trace.trace_id, "total_ms": 0, "spans": []}
+    origin = trace.root.start
+    depth = {trace.root.span_id: 0}
+    for s in spans:
+        if s.span_id not in depth:
+            depth[s.span_id] = depth.get(s.parent_id, 0) + 1
+    now = time.time()
+    rows = []
+    for s in spans:
+        row = {
+            "name": s.name,
+            "kind": s.kind,
+            "depth": depth[s.span_id],
+            "start_ms": round((s.start - origin) * 1000, 1),
+            "duration_ms": round(((s.end or now) - s.start) * 1000, 1)
+        }
+        if s.end is None:
+            row["open"] = True
+        if s.attributes:
+            row["attributes"] = s.attributes
+        if s.error:
+            row["error"] = s.error
+        rows.append(row)
+    return {"trace_id": trace.trace_id, "total_ms": round(((trace.root.end or now) - origin) * 1000, 1), "spans": rows}
+
+def current_waterfall() -> Optional[Dict[str, Any]]:
+    """Waterfall of the trace the caller is in so far, or None if the request isn't traced"""
+    active = _current.get()
+    return waterfall(active.trace) if active is not None else None
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": value if isinstance(value, str) else json.dumps(value, default=str)}
+
+def to_otlp(trace: Trace) -> Dict[str, Any]:
+    """OTLP/JSON ExportTraceServiceRequest, as POSTed to a collector's /v1/traces"""
+    spans = []
+    for s in trace.spans:
+        end = s.end or time.time()
+        otlp_span = {
+            "traceId": trace.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": OTLP_KINDS.get(s.kind, 1),
+            "startTimeUnixNano": str(int(s.start * 1e9)),
+            "endTimeUnixNano": str(int(end * 1e9)),
+            "attributes": [{"key": "span.kind.detail", "value": {"stringValue": s.kind}}] + [
+                {"key": key, "value": _otlp_value(value)} for key, value in s.attributes.items()
+            ],
+            "status": {"code": 2, "message": s.error} if s.error else {"code": 0}
+        }
+        parent = s.parent_id or trace.remote_parent
+        if parent:
+            otlp_span["parentSpanId"] = parent
+        spans.append(otlp_span)
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+        "scopeSpans": [{"scope": {"name": "bridgeguardian.tracing"}, "spans": spans}]
+    }]}
+
+def to_chrome(trace: Trace) -> Dict[str, Any]:
+    """Chrome Trace Event Format (chrome://tracing, Perfetto), one row per thread"""
+    threads: Dict[int, int] = {}
+    events = []
+    for s in sorted(trace.spans, key=lambda s: s.start):
+        tid = threads.setdefault(s.thread, len(threads) + 1)
+        events.append({
+            "name": s.name,
+            "cat": s.kind,
+            "ph": "X",
+            "ts": round(s.start * 1e6),
+            "dur": round(((s.end or time.time()) - s.start) * 1e6),
+            "pid": 1,
+            "tid": tid,
+            "args": {**s.attributes, **({"error": s.error} if s.error else {})}
+        })
+    events.extend(
+        {"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": f"thread {tid}"}}
+        for tid in threads.values()
+    )
+    return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"trace_id": trace.trace_id}}
+
+EXPORT_FORMATS = {"otlp": to_otlp, "chrome": to_chrome, "waterfall": waterfall}
+
+class TraceStore:
+    """The newest TRACE_KEEP finished traces, in memory"""
+
+    def __init__(self, keep: int = TRACE_KEEP):
+        self.keep = keep
+        self._traces: "OrderedDict[str, Trace]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def save(self, trace: Trace) -> None:
+        with self._lock:
+            self._traces[trace.trace_id] = trace
+            self._traces.move_to_end(trace.trace_id)
+            while len(self._traces) > self.keep:
+                self._traces.popitem(last=False)
+
+    def get(self, trace_id: str) -> Optional[Trace]:
+        with self._lock:
+            return self._traces.get(trace_id)
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        with self._lock:
+            traces = list(self._traces.values())[-limit:]
+        return [
+            {
+                "trace_id": t.trace_id,
+                "name": t.root.name,
+                "started_at": t.root.start,
+                "duration_ms": round(((t.root.end or time.time()) - t.root.start) * 1000, 1),
+                "spans": len(t.spans),
+                "status_code": t.root.attributes.get("status_code")
+            }
+            for t in reversed(traces)
+        ]
+
+trace_store = TraceStore()
+
+def _export_otlp(trace: Trace) -> None:
+    try:
+        import requests
+        requests.post(TRACE_OTLP_ENDPOINT, json=to_otlp(trace), timeout=5)
+    except Exception as e:
+        print(f"Trace export failed: {e}")
+
+# ============= MIDDLEWARE =============
+
+def _header(headers: List[Any], name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key == name:
+            return value
+    return None
+
+def _wants_trace(scope) -> Optional[Trace]:
+    """A new trace if this request asked to be traced (or was sampled), else None"""
+    headers = scope["headers"]
+    traceparent = _header(headers, b"traceparent")
+    if traceparent:
+        match = TRACEPARENT.match(traceparent.decode("latin-1").strip())
+        if match and int(match.group(3), 16) & 1:
+            # The caller is tracing this request: join its trace
+            return Trace(match.group(1), remote_parent=match.group(2))
+    flag = _header(headers, b"x-trace")
+    if flag is not None and flag.lower() in (b"1", b"true", b"yes"):
+        return Trace()
+    query = scope.get("query_string", b"")
+    if b"trace=" in query:
+        values = parse_qs(query.decode("latin-1")).get("trace", [])
+        if values and values[-1].lower() in ("1", "true", "yes"):
+            return Trace()
+    if TRACE_SAMPLE_RATE and random.random() < TRACE_SAMPLE_RATE:
+        return Trace()
+    return None
+
+class TracingMiddleware:
+    """
+    ASGI middleware that traces opted-in HTTP requests
+    X-Trace: 1, ?trace=true, a sampled W3C traceparent or TRACE_SAMPLE_RATE
+    turn it on. The response carries traceparent and X-Trace-Id; the finished
+    trace goes to the store (and TRACE_OTLP_ENDPOINT if set).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        trace = _wants_trace(scope) if scope["type"] == "http" else None
+        if trace is None:
+            await self.app(scope, receive, send)
+            return
+
+        root = Span(trace, f"{scope['method']} {scope['path']}", "server", None)
+        trace.add(root)
+        sending: Optional[Span] = None
+
+        async def send_traced(message):
+            nonlocal sending
+            if message["type"] == "http.response.start":
+                root.set(status_code=message["status"])
+                traceparent = f"00-{trace.trace_id}-{root.span_id}-01".encode()
+                message["headers"] = [*message.get("headers", []), (b"traceparent", traceparent),
+                                      (b"x-trace-id", trace.trace_id.encode())]
+                sending = Span(trace, "send_response", "serialization", root.span_id)
+                trace.add(sending)
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body") and sending is not None:
+                sending.end = time.time()
+
+        token = _current.set(root)
+        try:
+            await self.app(scope, receive, send_traced)
+        except Exception as e:
+            root.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            root.end = time.time()
+            _current.reset(token)
+            trace_store.save(trace)
+            if TRACE_OTLP_ENDPOINT:
+                threading.Thread(target=_export_otlp, args=(trace,), daemon=True).start()
@@ -0,0 +1,75 @@
+import binascii
+import os
+from typing import Tuple
+
+from fastapi import HTTPException, UploadFile
+
+from services.tracing import traced
+
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+
+# Read size; a multiple of 3 so each chunk encodes to base64 with no padding
+# and the encoded chunks concatenate into one valid string
+CHUNK_BYTES = 3 * 64 * 1024
+
+def encoded_length(raw_bytes: int) -> int:
+    """Length of the base64 encoding of raw_bytes bytes"""
+    return 4 * ((raw_bytes + 2) // 3)
+
+def peak_bytes_per_upload(max_bytes: int = MAX_UPLOAD_BYTES) -> int:
+    """
+    Upper bound on the memory one upload holds while being encoded:
+    the preallocated base64 buffer, the final str, and the in-flight chunk
+    (raw, with carry, and encoded)
+    """
+    return 2 * encoded_length(max_bytes) + 3 * encoded_length(CHUNK_BYTES)
+
+@traced("serialization", "read_upload")
+async def read_upload_base64(file: UploadFile, max_bytes: int = MAX_UPLOAD_BYTES) -> Tuple[str, str]:
+    """
+    Read an upload in chunks and base64-encode it straight into one buffer
+    Returns (base64 str, media type); raises 413 past max_bytes
+    """
+    declared = getattr(file, "size", None)
+    if declared is not None and declared > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds {max_bytes} byte limit")
+
+    # Size the buffer for the declared size when we have it, else for the cap
+    buffer = bytearray(encoded_length(declared if declared is not None else max_bytes))
+    view = memoryview(buffer)
+    written = 0
+    total = 0
+    carry = b""
+
+    def write(encoded: bytes) -> None:
+        nonlocal view, written
+        end = written + len(encoded)
+        if end > len(buffer):
+            # Declared size was wrong; grow once up to the cap
+            view.release()
+            buffer.extend(bytes(encoded_length(max_bytes) - len(buffer)))
+            view = memoryview(buffer)
+        view[written:end] = encoded
+        written = end
+
+    while True:
+        chunk = await file.read(CHUNK_BYTES)
+        if not chunk:
+            break
+        total += len(chunk)
+        if total > max_bytes:
+            raise HTTPException(status_code=413, detail=f"Upload exceeds {max_bytes} byte limit")
+        if carry:
+            chunk = carry + chunk
+        # Encode whole 3-byte groups now, keep the remainder for the next read
+        usable = len(chunk) - len(chunk) % 3
+        carry = chunk[usable:]
+        if usable:
+            write(binascii.b2a_base64(memoryview(chunk)[:usable], newline=False))
+
+    if carry:
+        write(binascii.b2a_base64(carry, newline=False))
+
+    image_base64 = str(view[:written], "ascii")
+    view.release()
+    return image_base64, file.content_type or "image/jpeg"
@@ -0,0 +1,115 @@
+import base64
+import json
+import os
+import random
+import tempfile
+
+os.environ.setdefault("INCIDENT_DB_PATH", os.path.join(tempfile.mkdtemp(), "incidents.db"))
+
+from tools.bridge_query import BridgeIndex, SORT_FIELDS, decode_cursor, encode_cursor, parse_sort
+
+def make_bridges(count: int = 400):
+    """Few distinct keys, so most page boundaries fall inside a run of ties"""
+    rng = random.Random(11)
+    return [
+        {
+            "bridge_id": f"bridge_{i:04d}",
+            "name": rng.choice(["Elm St", "Main St", "Oak Ave"]),
+            "road_name": "",
+            "latitude": rng.uniform(40.0, 42.0),
+            "longitude": rng.uniform(-74.0, -71.0),
+            "clearance_inches": rng.choice([132, 144, 150, 156, 168]),
+            "incident_count": rng.choice([0, 0, 1, 3]),
+            "recorded_incidents": rng.choice([0, 0, 1]),
+            "warnings": []
+        }
+        for i in range(count)
+    ]
+
+BRIDGES = make_bridges()
+INDEX = BridgeIndex(BRIDGES, version=1)
+
+def expected(sort: str, predicate=lambda b: True):
+    field, descending = parse_sort(sort)
+    key = SORT_FIELDS[field]
+    rows = sorted(((key(b), b["bridge_id"]) for b in BRIDGES if predicate(b)), reverse=descending)
+    return [bridge_id for _, bridge_id in rows]
+
+def all_pages(limit: int, **params):
+    """bridge_ids from every page, following next_cursor to the end"""
+    ids, cursor = [], None
+    while True:
+        page = INDEX.query(limit=limit, cursor=cursor, **params)
+        assert page["count"] <= limit
+        ids += [b["bridge_id"] for b in page["bridges"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+
+def test_pages_cover_every_row_once():
+    """Ascending and descending, every sort: pages join to the full order with ties broken by bridge_id"""
+    for sort in [name for field in SORT_FIELDS for name in (field, "-" + field)]:
+        for limit in (1, 7, 50, 500):
+            assert all_pages(limit, sort=sort) == expected(sort), (sort, limit)
+    print("✓ keyset pages, asc and desc, across ties")
+
+def test_range_bounds_inclusive():
+    """Range filters on the sort field slice the index: both bounds are inclusive"""
+    in_range = lambda b: 144 <= b["clearance_inches"] <= 156
+    for sort in ("clearance", "-clearance"):
+        assert all_pages(13, sort=sort, min_clearance=144, max_clearance=156) == expected(sort, in_range)
+    total = SORT_FIELDS["incidents"]
+    assert all_pages(9, sort="-incidents", min_incidents=1, max_incidents=1) == \
+        expected("-incidents", lambda b: total(b) == 1)
+    assert all_pages(9, sort="clearance", max_clearance=131) == []
+    print("✓ inclusive range bounds")
+
+def test_bbox_pages():
+    bbox = (40.5, -73.5, 41.5, -72.0)
+    inside = lambda b: bbox[0] <= b["latitude"] <= bbox[2] and bbox[1] <= b["longitude"] <= bbox[3]
+    assert all_pages(11, sort="-incidents", bbox=bbox) == expected("-incidents", inside)
+    print("✓ bbox pages in sort order")
+
+def test_bad_cursors():
+    """Malformed, tampered (wrong key type) or cross-sort cursors are ValueErrors, not TypeErrors"""
+    good = encode_cursor("clearance", 150, "bridge_0001")
+    assert decode_cursor(good, "clearance") == (150, "bridge_0001")
+    tampered = [
+        "not a cursor!",
+        encode_cursor("clearance", "150", "bridge_0001"),
+        encode_cursor("clearance", 150.5, "bridge_0001"),
+        encode_cursor("clearance", True, "bridge_0001"),
+        encode_cursor("name", 3, "bridge_0001"),
+        encode_cursor("clearance", 150, 7),
+        base64.urlsafe_b64encode(json.dumps(["clearance", 150]).encode()).decode(),
+        good
+    ]
+    for cursor, sort in zip(tampered, ["clearance"] * 4 + ["name", "clearance", "clearance", "-clearance"]):
+        try:
+            INDEX.query(sort=sort, cursor=cursor)
+            raise AssertionError(f"{cursor!r} should be rejected for sort {sort}")
+        except ValueError:
+            pass
+    print("✓ bad cursors rejected")
+
+def test_bad_cursor_is_400():
+    from fastapi.testclient import TestClient
+    import main
+
+    client = TestClient(main.app)
+    response = client.get("/bridges", params={"sort": "clearance", "cursor": encode_cursor("clearance", "x", "y")})
+    assert response.status_code == 400, response.text
+    first = client.get("/bridges", params={"sort": "clearance", "limit": 2}).json()
+    second = client.get("/bridges", params={"sort": "clearance", "limit": 2, "cursor": first["next_cursor"]})
+    assert second.status_code == 200 and second.json()["bridges"][0] not in first["bridges"]
+    print("✓ /bridges answers a tampered cursor with 400")
+
+if __name__ == "__main__":
+    print("🌉 Testing bridge query paging...")
+    print("=" * 50)
+    test_pages_cover_every_row_once()
+    test_range_bounds_inclusive()
+    test_bbox_pages()
+    test_bad_cursors()
+    test_bad_cursor_is_400()
+    print("\nAll bridge query checks passed")
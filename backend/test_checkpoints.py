@@ -0,0 +1,89 @@
+import os
+import tempfile
+from agents import checkpoints
+from agents.checkpoints import CheckpointStore
+from agents.agent_graph import checkpointed, resume_agent_workflow
+
+NODES = ["vision_agent", "measurement_agent", "risk_assessment_agent", "recommendation_agent"]
+
+def temp_store() -> CheckpointStore:
+    return CheckpointStore(os.path.join(tempfile.mkdtemp(), "checkpoints.db"))
+
+def agent_for(node: str, fail: bool = False):
+    """Fake agent: records that it ran, and adds an error when it fails"""
+    def agent(state):
+        state = dict(state)
+        state["ran"] = state.get("ran", []) + [node]
+        if fail:
+            state["errors"] = (state.get("errors") or []) + [f"{node} failed"]
+        return state
+    return agent
+
+def run(state, failing=None, nodes=NODES):
+    for node in nodes:
+        state = checkpointed(node, agent_for(node, fail=node == failing))(state)
+    return state
+
+def test_resume_from_last_completed_node():
+    """The failed node restarts from the state the node before it produced; later checkpoints are dropped"""
+    checkpoints._checkpoint_store = store = temp_store()
+    initial = {"run_id": "run-1", "image_base64": "aW1hZ2U=", "errors": []}
+    store.start_run("run-1", "full", initial)
+    run(initial, failing="risk_assessment_agent")
+    assert [c["failed"] for c in store.get_run("run-1")["checkpoints"]] == [False, False, True, False]
+
+    resume = store.resume_point("run-1")
+    assert resume["node"] == "risk_assessment_agent"
+    assert resume["state"]["ran"] == ["vision_agent", "measurement_agent"]
+    assert resume["state"]["image_base64"] == "aW1hZ2U=", "image is stored once per run and restored"
+    run_info = store.get_run("run-1")
+    assert [c["node"] for c in run_info["checkpoints"]] == NODES[:2] and run_info["resume_count"] == 1
+
+    final = run(resume["state"], nodes=NODES[2:])
+    assert final["ran"] == NODES, "only the failed node and the ones after it re-ran"
+    print("✓ resume from the last completed node")
+
+def test_first_node_failure_resumes_from_initial_state():
+    store = temp_store()
+    store.start_run("run-2", "fast", {"run_id": "run-2", "user_location": "Boston, MA"})
+    store.save("run-2", "vision_measurement_agent", {"run_id": "run-2", "errors": ["boom"]}, failed=True)
+    resume = store.resume_point("run-2")
+    assert resume["node"] == "vision_measurement_agent" and resume["state"]["user_location"] == "Boston, MA"
+    print("✓ first-node failure restarts from the initial state")
+
+def test_retried_resume_is_not_rerun():
+    """A resume retried after the run recovered, or for an unknown run, is refused rather than re-run"""
+    checkpoints._checkpoint_store = store = temp_store()
+    initial = {"run_id": "run-3", "errors": []}
+    store.start_run("run-3", "full", initial)
+    run(initial)
+    assert store.resume_point("run-3") == {"profile": "full", "node": None, "state": None}
+    for run_id, error in (("run-3", ValueError), ("no-such-run", KeyError)):
+        try:
+            resume_agent_workflow(run_id)
+            raise AssertionError(f"{run_id} should not resume")
+        except error:
+            pass
+    assert store.get_run("run-3")["resume_count"] == 0
+    print("✓ nothing to resume: 409 / 404 paths")
+
+def test_expired_runs_purged():
+    store = temp_store()
+    store.start_run("old", "full", {"run_id": "old"})
+    checkpoints_ttl = checkpoints.CHECKPOINT_TTL_SECONDS
+    checkpoints.CHECKPOINT_TTL_SECONDS = -1
+    try:
+        store.start_run("new", "full", {"run_id": "new"})
+    finally:
+        checkpoints.CHECKPOINT_TTL_SECONDS = checkpoints_ttl
+    assert store.get_run("old") is None and store.resume_point("old") is None
+    print("✓ expired runs purged")
+
+if __name__ == "__main__":
+    print("💾 Testing checkpoints and resume...")
+    print("=" * 50)
+    test_resume_from_last_completed_node()
+    test_first_node_failure_resumes_from_initial_state()
+    test_retried_resume_is_not_rerun()
+    test_expired_runs_purged()
+    print("\nAll checkpoint checks passed")
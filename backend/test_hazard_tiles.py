@@ -0,0 +1,103 @@
+import os
+import shutil
+import tempfile
+from tools.bridge_store import BridgeStore, BRIDGES_CSV
+from tools.hazard_tiles import (
+    HazardTileSet, HEIGHT_CLASS_NAMES, TILE_EXTENT, TILE_MIN_ZOOM, TILE_MAX_ZOOM,
+    pack_tile, unpack_tile, tile_coords, tile_for
+)
+
+ZOOMS = TILE_MAX_ZOOM - TILE_MIN_ZOOM + 1
+
+def temp_store() -> BridgeStore:
+    directory = tempfile.mkdtemp()
+    shutil.copy(BRIDGES_CSV, directory)
+    return BridgeStore(os.path.join(directory, "bridges.csv"))
+
+def tile_of(tiles: HazardTileSet, bridge, height_class: str = "up_to_13ft6", zoom: int = TILE_MAX_ZOOM):
+    return tiles.get(height_class, *tile_for(bridge["latitude"], bridge["longitude"], zoom))
+
+def all_etags(tiles: HazardTileSet):
+    return {key: etag for key, (_, etag) in tiles._tiles.items()}
+
+def test_packed_round_trip():
+    """Every stored tile decodes to its hazards, with positions inside the tile"""
+    store = temp_store()
+    tiles = HazardTileSet(store.all())
+    bridges = {b["bridge_id"]: b for b in store.all()}
+    for (class_index, (z, tx, ty)), (data, _) in tiles._tiles.items():
+        tile = unpack_tile(data)
+        assert tile["height_class"] == HEIGHT_CLASS_NAMES[class_index] and tile["extent"] == TILE_EXTENT
+        for record in tile["bridges"]:
+            bridge = bridges[record["bridge_id"]]
+            x, y = tile_coords(bridge["latitude"], bridge["longitude"], z)
+            assert record["x"] == min(int((x - tx) * TILE_EXTENT), TILE_EXTENT - 1)
+            assert record["y"] == min(int((y - ty) * TILE_EXTENT), TILE_EXTENT - 1)
+            assert record["clearance_inches"] == bridge["clearance_inches"]
+            assert record["incident_count"] == bridge["incident_count"]
+            assert record["prohibited"] == ("Commercial vehicles prohibited" in bridge["warnings"])
+            assert record["high_incidents"] == (bridge["incident_count"] >= 10)
+    empty = unpack_tile(pack_tile((12, 1, 2), 0, []))
+    assert empty["bridges"] == []
+    try:
+        unpack_tile(b"XXXX" + pack_tile((12, 1, 2), 0, [])[4:])
+        raise AssertionError("bad magic should not decode")
+    except ValueError:
+        pass
+    print(f"✓ {len(tiles._tiles)} packed tiles round-trip")
+
+def test_etag_stability():
+    """Same content, same ETag: across builds and requests, and insensitive to bridge order"""
+    store = temp_store()
+    first, second = HazardTileSet(store.all()), HazardTileSet(list(reversed(store.all())))
+    assert all_etags(first) == all_etags(second)
+    bridge = store.get("bridge_002")
+    assert tile_of(first, bridge) == tile_of(first, bridge) == tile_of(second, bridge)
+    print("✓ ETags stable across builds")
+
+def test_apply_rebuilds_only_changed_tiles():
+    store = temp_store()
+    tiles = HazardTileSet(store.all())
+    before = all_etags(tiles)
+    edited = {**store.get("bridge_012"), "clearance_inches": 120}
+    rebuilt = tiles.apply([edited if b["bridge_id"] == "bridge_012" else b for b in store.all()])
+    assert rebuilt == ZOOMS, rebuilt
+    after = all_etags(tiles)
+    changed = {key for key in before.keys() | after.keys() if before.get(key) != after.get(key)}
+    assert changed and all(key[1] in {tile_for(edited["latitude"], edited["longitude"], z)
+                                      for z in range(TILE_MIN_ZOOM, TILE_MAX_ZOOM + 1)} for key in changed)
+    assert tiles.apply([edited if b["bridge_id"] == "bridge_012" else b for b in store.all()]) == 0
+    print(f"✓ one edit re-encodes {rebuilt} tiles, {len(changed)} tile ETags change")
+
+def test_sync_follows_the_change_log():
+    """sync() diffs only the bridges the store says changed; a reload falls back to a full diff"""
+    store = temp_store()
+    tiles = HazardTileSet(())
+    tiles.sync(store)
+    assert tiles.stats()["bridges"] == len(store)
+
+    store.upsert([{**store.get("bridge_013"), "clearance_inches": 150}])
+    assert tiles.sync(store) == ZOOMS
+    assert tiles.sync(store) == 0, "already caught up"
+
+    bridge = store.get("bridge_011")
+    store.set_recorded_incidents({"bridge_011": 18})
+    assert tiles.sync(store) == ZOOMS
+    record = next(r for r in unpack_tile(tile_of(tiles, bridge)[0])["bridges"] if r["bridge_id"] == "bridge_011")
+    assert record["incident_count"] == 30 and record["high_incidents"]
+
+    version = store.version
+    store.load()
+    assert store.changed_since(version) == (store.version, None)
+    assert tiles.sync(store) == ZOOMS, "the reload reverts bridge_013, which was never saved"
+    assert tiles.store_version == store.version
+    print("✓ sync follows the store's change log")
+
+if __name__ == "__main__":
+    print("🗺️ Testing hazard tiles...")
+    print("=" * 50)
+    test_packed_round_trip()
+    test_etag_stability()
+    test_apply_rebuilds_only_changed_tiles()
+    test_sync_follows_the_change_log()
+    print("\nAll hazard tile checks passed")
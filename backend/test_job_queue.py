@@ -0,0 +1,106 @@
+import asyncio
+from services.job_queue import JobQueue, QueueFullError
+
+async def wait_done(queue: JobQueue, job, timeout: float = 2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while job.status not in ("succeeded", "failed"):
+        assert loop.time() < deadline, job.to_dict()
+        await queue.wait_for_change(job, 0.1)
+
+def test_failure_is_recorded_and_workers_keep_going():
+    async def scenario():
+        queue = JobQueue(workers=1, max_depth=10)
+
+        async def boom():
+            raise RuntimeError("upstream 503")
+
+        async def ok():
+            return {"answer": 42}
+
+        failed, succeeded = queue.submit("analyze-vehicle", boom), queue.submit("analyze-vehicle", ok)
+        await wait_done(queue, failed)
+        await wait_done(queue, succeeded)
+        await queue.shutdown()
+        return queue, failed, succeeded
+
+    queue, failed, succeeded = asyncio.run(scenario())
+    assert failed.status == "failed" and failed.error == "upstream 503" and failed.result is None
+    assert succeeded.status == "succeeded" and succeeded.to_dict()["result"] == {"answer": 42}
+    assert (queue.completed, queue.failed) == (1, 1)
+    print("✓ a failed job is recorded; the worker keeps draining the queue")
+
+def test_full_queue_rejects():
+    """Past max depth, submit raises (the endpoint answers 429 + Retry-After) and nothing is enqueued"""
+    async def scenario():
+        queue = JobQueue(workers=1, max_depth=2)
+        release = asyncio.Event()
+
+        async def blocked():
+            await release.wait()
+
+        running = queue.submit("analyze-vehicle", blocked)
+        while running.status != "running":
+            await asyncio.sleep(0.001)
+        queue.submit("analyze-vehicle", blocked)
+        queue.submit("analyze-vehicle", blocked)
+        try:
+            queue.submit("analyze-vehicle", blocked)
+            raise AssertionError("third waiting job should be rejected")
+        except QueueFullError:
+            pass
+        stats = queue.stats()
+        release.set()
+        await queue.shutdown()
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert stats["rejected"] == 1 and stats["queue_depth"] == 2, stats
+    assert stats["jobs_by_status"] == {"running": 1, "queued": 2}, stats
+    print("✓ full queue rejects without enqueuing")
+
+def test_worker_pool_bounds_concurrency():
+    async def scenario():
+        queue = JobQueue(workers=2, max_depth=20)
+        active, peak = 0, 0
+
+        async def work():
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+        jobs = [queue.submit("sign-ingest", work) for _ in range(8)]
+        for job in jobs:
+            await wait_done(queue, job)
+        await queue.shutdown()
+        return peak
+
+    assert asyncio.run(scenario()) == 2
+    print("✓ at most `workers` jobs run at once")
+
+def test_finished_jobs_expire():
+    async def scenario():
+        queue = JobQueue(workers=1, max_depth=5, result_ttl_seconds=0)
+
+        async def ok():
+            return 1
+
+        job = queue.submit("analyze-vehicle", ok)
+        await wait_done(queue, job)
+        await asyncio.sleep(0.01)
+        await queue.shutdown()
+        return queue.get(job.job_id)
+
+    assert asyncio.run(scenario()) is None
+    print("✓ finished jobs expire after the result TTL")
+
+if __name__ == "__main__":
+    print("📬 Testing job queue...")
+    print("=" * 50)
+    test_failure_is_recorded_and_workers_keep_going()
+    test_full_queue_rejects()
+    test_worker_pool_bounds_concurrency()
+    test_finished_jobs_expire()
+    print("\nAll job queue checks passed")
@@ -0,0 +1,80 @@
+import json
+from agents.json_stream import IncrementalJSONParser, parse_json_response
+
+REPLY = {
+    "vehicle_detected": True,
+    "vehicle_type": "box truck {16'}",
+    "reasoning": "sign reads \"CLEARANCE 12'6\\\"\", brace } and comma, inside a string",
+    "visible_items": [{"item": "AC unit", "dims": {"h": 8, "w": [30, 24]}}],
+    "total_height_estimate_inches": 158
+}
+
+def feed_in_chunks(text: str, size: int) -> IncrementalJSONParser:
+    """Stream text through a parser `size` characters at a time, recording fields as they complete"""
+    seen = []
+    parser = IncrementalJSONParser(on_field=lambda key, value: seen.append(key))
+    for i in range(0, len(text), size):
+        parser.feed(text[i:i + size])
+    parser.seen = seen
+    return parser
+
+def test_wrapped_replies():
+    """Fenced and prose-wrapped replies parse to the same fields, at every chunk size"""
+    body = json.dumps(REPLY)
+    replies = [
+        body,
+        "```json\n" + body + "\n```",
+        "Here is the analysis:\n```json\n" + body + "\n```\nLet me know if you need more.",
+        "Sure! " + body + " Hope this helps {not json}."
+    ]
+    for reply in replies:
+        for size in (1, 3, 7, 64, len(reply)):
+            parser = feed_in_chunks(reply, size)
+            assert parser.done, (reply[:30], size)
+            assert parser.fields == REPLY, (reply[:30], size)
+            assert parser.seen == list(REPLY), "fields should complete in reply order"
+            assert json.loads(parser.object_text()) == REPLY
+        print(f"✓ {reply[:24]!r}...")
+
+def test_strings_and_nesting():
+    """Escaped quotes, braces and commas inside strings and nested members don't end a member early"""
+    parser = feed_in_chunks(json.dumps(REPLY), 5)
+    assert parser.fields["reasoning"] == REPLY["reasoning"]
+    assert parser.fields["vehicle_type"] == "box truck {16'}"
+    assert parser.fields["visible_items"][0]["dims"]["w"] == [30, 24]
+    parser = feed_in_chunks('{"path": "C:\\\\dir\\\\", "next": 1}', 2)
+    assert parser.fields == {"path": "C:\\dir\\", "next": 1}
+    print("✓ escapes and nested members")
+
+def test_incomplete_and_malformed():
+    """A cut-off reply is not done; a malformed member is skipped so the caller re-parses"""
+    body = json.dumps(REPLY)
+    parser = feed_in_chunks(body[:len(body) // 2], 4)
+    assert not parser.done
+    assert "vehicle_detected" in parser.fields and "total_height_estimate_inches" not in parser.fields
+    assert not parser.has_fields(REPLY)
+
+    parser = feed_in_chunks('{"a": 1, "b": tru, "c": 3}', 4)
+    assert parser.done and parser.fields == {"a": 1, "c": 3}
+    try:
+        json.loads(parser.object_text())
+        raise AssertionError("malformed member should fail the full-text parse")
+    except json.JSONDecodeError:
+        pass
+    print("✓ incomplete and malformed replies")
+
+def test_parse_json_response():
+    body = json.dumps(REPLY)
+    assert parse_json_response(body) == REPLY
+    assert parse_json_response("```json\n" + body + "\n```\ntrailing") == REPLY
+    assert parse_json_response("```\n" + body + "\n```") == REPLY
+    print("✓ parse_json_response")
+
+if __name__ == "__main__":
+    print("🧩 Testing incremental JSON parsing...")
+    print("=" * 50)
+    test_wrapped_replies()
+    test_strings_and_nesting()
+    test_incomplete_and_malformed()
+    test_parse_json_response()
+    print("\nAll JSON stream checks passed")
@@ -0,0 +1,103 @@
+import threading
+import time
+from services.llm_scheduler import LLMScheduler, TokenBucket, SchedulerTimeout
+
+def queue_behind(scheduler: LLMScheduler, calls, order):
+    """Start one thread per (priority, flow) call, in order, each queued before the next starts"""
+    threads = []
+    for priority, flow in calls:
+        queued = sum(c["queued"] for c in scheduler.stats()["classes"].values())
+
+        def call(priority=priority, flow=flow):
+            with scheduler.slot(priority, 10, flow):
+                order.append(flow)
+
+        thread = threading.Thread(target=call)
+        thread.start()
+        while sum(c["queued"] for c in scheduler.stats()["classes"].values()) == queued:
+            time.sleep(0.001)
+        threads.append(thread)
+    return threads
+
+def test_token_bucket_refill():
+    """Refills at capacity per minute, never above capacity; overdraws are repaid first"""
+    bucket = TokenBucket(600)
+    start = bucket.updated
+    bucket.level = 0
+    bucket.refill(start + 1)
+    assert abs(bucket.level - 10) < 1e-9, bucket.level
+    assert abs(bucket.seconds_until(20) - 1.0) < 1e-9
+    bucket.refill(start + 3600)
+    assert bucket.level == 600
+    bucket.level = -50
+    bucket.refill(start + 3605)
+    assert abs(bucket.level) < 1e-9, bucket.level
+    assert abs(bucket.seconds_until(10_000) - 60.0) < 1e-9, "a request larger than the bucket waits for a full one"
+    print("✓ token bucket refill")
+
+def test_reservation_settled_on_release():
+    scheduler = LLMScheduler(requests_per_minute=1000, tokens_per_minute=6000, max_concurrency=4)
+    with scheduler.slot("pipeline", 5000) as slot:
+        assert scheduler.stats()["tokens_available"] <= 1000
+        slot.tokens_used = 500
+    assert scheduler.stats()["tokens_available"] >= 5500
+    print("✓ unused reserved tokens are returned")
+
+def test_priority_and_aging():
+    """Interactive jumps queued batch work, but batch waiting past the aging step outranks newer pipeline calls"""
+    scheduler = LLMScheduler(requests_per_minute=6000, tokens_per_minute=1e9, max_concurrency=1, aging_seconds=60)
+    order = []
+    hold = scheduler.acquire("interactive", 1)
+    threads = queue_behind(scheduler, [("batch", "batch-1"), ("batch", "batch-2"), ("interactive", "cab")], order)
+    scheduler.release(hold)
+    for thread in threads:
+        thread.join()
+    assert order[0] == "cab", order
+
+    scheduler = LLMScheduler(requests_per_minute=6000, tokens_per_minute=1e9, max_concurrency=1, aging_seconds=0.1)
+    order = []
+    hold = scheduler.acquire("interactive", 1)
+    threads = queue_behind(scheduler, [("batch", "old-batch")], order)
+    time.sleep(0.25)  # two aging steps: batch -> interactive
+    threads += queue_behind(scheduler, [("pipeline", "new-pipeline")], order)
+    scheduler.release(hold)
+    for thread in threads:
+        thread.join()
+    assert order == ["old-batch", "new-pipeline"], order
+    print("✓ priority classes and aging")
+
+def test_flows_take_turns():
+    """Within a class, a flow with a burst queued first doesn't block a later flow"""
+    scheduler = LLMScheduler(requests_per_minute=6000, tokens_per_minute=1e9, max_concurrency=1, aging_seconds=60)
+    order = []
+    hold = scheduler.acquire("pipeline", 1, flow="warmup")
+    threads = queue_behind(scheduler, [("pipeline", "A")] * 4 + [("pipeline", "B")] * 2, order)
+    scheduler.release(hold)
+    for thread in threads:
+        thread.join()
+    assert "".join(order) == "ABABAA", order
+    print(f"✓ round-robin flows: {''.join(order)}")
+
+def test_queue_timeout():
+    scheduler = LLMScheduler(requests_per_minute=1000, tokens_per_minute=1e9, max_concurrency=1,
+                             queue_timeout_seconds=0.1)
+    hold = scheduler.acquire("batch", 1)
+    try:
+        scheduler.acquire("batch", 1)
+        raise AssertionError("second call should time out")
+    except SchedulerTimeout:
+        pass
+    batch = scheduler.stats()["classes"]["batch"]
+    assert batch["timed_out"] == 1 and batch["queued"] == 0, batch
+    scheduler.release(hold)
+    print("✓ queue timeout")
+
+if __name__ == "__main__":
+    print("🚦 Testing LLM scheduler...")
+    print("=" * 50)
+    test_token_bucket_refill()
+    test_reservation_settled_on_release()
+    test_priority_and_aging()
+    test_flows_take_turns()
+    test_queue_timeout()
+    print("\nAll scheduler checks passed")
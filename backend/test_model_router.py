@@ -0,0 +1,58 @@
+from services.model_router import (
+    ModelRouter, VISION_LARGE, VISION_SMALL, MODEL_MIN_SAMPLES, MODEL_PROBE_EVERY, route_config
+)
+
+SITE = "vision_agent"
+_, SLO = route_config(SITE)
+FAST, SLOW = SLO / 4, SLO * 2
+
+def record(router: ModelRouter, model: str, seconds: float, count: int) -> None:
+    for _ in range(count):
+        router.record(SITE, model, seconds, ok=True, completeness=1.0)
+
+def test_preferred_until_enough_samples():
+    router = ModelRouter()
+    assert router.route(SITE) == (VISION_LARGE, "preferred")
+    record(router, VISION_LARGE, SLOW, MODEL_MIN_SAMPLES - 1)
+    assert router.route(SITE)[0] == VISION_LARGE, "too few samples to judge"
+    print("✓ preferred model until it has enough samples")
+
+def test_p90_not_max():
+    """One slow outlier in 20 calls stays within the p90 SLO; three do not"""
+    router = ModelRouter()
+    record(router, VISION_LARGE, FAST, 19)
+    record(router, VISION_LARGE, SLOW, 1)
+    assert router.route(SITE) == (VISION_LARGE, "preferred")
+    record(router, VISION_LARGE, SLOW, 2)
+    model, reason = router.route(SITE)
+    assert model == VISION_SMALL and reason.startswith("downgraded"), (model, reason)
+    print(f"✓ p90 SLO downgrade ({reason})")
+
+def test_probe_and_recovery():
+    router = ModelRouter()
+    record(router, VISION_LARGE, SLOW, MODEL_MIN_SAMPLES)
+    routes = [router.route(SITE) for _ in range(MODEL_PROBE_EVERY)]
+    assert [model for model, _ in routes[:-1]] == [VISION_SMALL] * (MODEL_PROBE_EVERY - 1)
+    assert routes[-1] == (VISION_LARGE, "probe"), routes[-1]
+    # Probes come back fast: p90 drops under the SLO and the site moves back
+    record(router, VISION_LARGE, FAST, MODEL_MIN_SAMPLES * 10)
+    assert router.route(SITE) == (VISION_LARGE, "preferred")
+    print("✓ periodic probe and recovery")
+
+def test_whole_chain_slow():
+    """Every model breaching: the last (fastest) model in the chain"""
+    router = ModelRouter()
+    record(router, VISION_LARGE, SLOW, MODEL_MIN_SAMPLES)
+    record(router, VISION_SMALL, SLOW, MODEL_MIN_SAMPLES)
+    assert router.route(SITE)[0] == VISION_SMALL
+    assert router.stats()[SITE]["downgraded"] is True
+    print("✓ whole chain breaching")
+
+if __name__ == "__main__":
+    print("🧭 Testing model routing...")
+    print("=" * 50)
+    test_preferred_until_enough_samples()
+    test_p90_not_max()
+    test_probe_and_recovery()
+    test_whole_chain_slow()
+    print("\nAll model routing checks passed")
@@ -0,0 +1,71 @@
+import random
+from tools.route_geometry import RouteGeometry, decode_polyline, encode_polyline
+
+# Worked example from Google's encoded polyline algorithm documentation
+GOOGLE_POINTS = [(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)]
+GOOGLE_ENCODED = "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+
+def assert_close(points, expected, precision):
+    assert len(points) == len(expected), (len(points), len(expected))
+    for (lat, lon), (want_lat, want_lon) in zip(points, expected):
+        assert abs(lat - want_lat) < 10 ** -precision and abs(lon - want_lon) < 10 ** -precision, \
+            ((lat, lon), (want_lat, want_lon))
+
+def test_google_vector():
+    """Encode and decode match the reference string exactly"""
+    assert encode_polyline(GOOGLE_POINTS) == GOOGLE_ENCODED
+    assert decode_polyline(GOOGLE_ENCODED) == GOOGLE_POINTS
+    print(f"✓ Google reference polyline {GOOGLE_ENCODED}")
+
+def test_negative_deltas():
+    """Routes heading south and west, across the equator and the prime meridian, round-trip"""
+    points = [(42.36, -71.06), (42.35, -71.07), (0.00001, -0.00001), (-0.5, 0.5), (-33.8688, 151.2093),
+              (-33.8688, 151.2093), (-89.99999, -179.99999)]
+    for precision in (5, 6):
+        assert_close(decode_polyline(encode_polyline(points, precision), precision), points, precision)
+    assert encode_polyline([(-0.00001, -0.00001)]) == "@@"
+    assert decode_polyline("@@") == [(-0.00001, -0.00001)]
+    print("✓ negative deltas, precision 5 and 6")
+
+def test_random_round_trip():
+    rng = random.Random(7)
+    lat, lon = 35.0, -90.0
+    points = []
+    for _ in range(2000):
+        lat += rng.uniform(-0.05, 0.05)
+        lon += rng.uniform(-0.05, 0.05)
+        points.append((round(lat, 6), round(lon, 6)))
+    for precision in (5, 6):
+        assert_close(decode_polyline(encode_polyline(points, precision), precision), points, precision)
+    assert encode_polyline([]) == "" and decode_polyline("") == []
+    print("✓ 2000-point random walk round trip")
+
+def test_malformed():
+    """Truncated strings and characters outside the alphabet raise ValueError"""
+    for encoded in (GOOGLE_ENCODED[:-1], GOOGLE_ENCODED[:3], "_p~iF~ps|U\x10", "_p~iF~ps|U ~"):
+        try:
+            decode_polyline(encoded)
+            raise AssertionError(f"{encoded!r} should not decode")
+        except ValueError:
+            pass
+    print("✓ malformed polylines rejected")
+
+def test_route_distances():
+    """Cumulative distances: positions at the ends and along the route"""
+    geometry = RouteGeometry.from_polyline(GOOGLE_ENCODED)
+    start, end = geometry.position_at(0), geometry.position_at(geometry.length_miles)
+    assert (round(start["latitude"], 5), round(start["longitude"], 5)) == GOOGLE_POINTS[0], start
+    assert (round(end["latitude"], 5), round(end["longitude"], 5)) == GOOGLE_POINTS[-1], end
+    middle = geometry.position_at(geometry.length_miles / 2)
+    assert 38.5 < middle["latitude"] < 43.252, middle
+    print(f"✓ route distances ({geometry.length_miles:.1f} miles)")
+
+if __name__ == "__main__":
+    print("🗺️ Testing route geometry...")
+    print("=" * 50)
+    test_google_vector()
+    test_negative_deltas()
+    test_random_round_trip()
+    test_malformed()
+    test_route_distances()
+    print("\nAll route geometry checks passed")
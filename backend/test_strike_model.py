@@ -0,0 +1,62 @@
+import numpy as np
+from agents.strike_model import (
+    strike_probabilities, STRIKE_SUSPENSION_MIN_INCHES, STRIKE_SUSPENSION_MAX_INCHES,
+    STRIKE_RESURFACING_MAX_INCHES, STRIKE_SIGN_SD_INCHES, STRIKE_SIGN_SD_LOW_CONFIDENCE_INCHES
+)
+
+VEHICLE = 150.0
+SAMPLES = 2_000_000
+# Monte Carlo standard error at p = 0.5 is 3.5e-4 with SAMPLES draws
+TOLERANCE = 2e-3
+
+def brute_force(margin: float, uncertainty: float, confidence: float, rng) -> float:
+    """Sample every error term directly and count strikes"""
+    sign_sd = STRIKE_SIGN_SD_INCHES + STRIKE_SIGN_SD_LOW_CONFIDENCE_INCHES * (1 - confidence)
+    loss = (rng.normal(0, uncertainty / 2, SAMPLES) + rng.normal(0, sign_sd, SAMPLES)
+            + rng.uniform(STRIKE_SUSPENSION_MIN_INCHES, STRIKE_SUSPENSION_MAX_INCHES, SAMPLES)
+            + rng.uniform(0, STRIKE_RESURFACING_MAX_INCHES, SAMPLES))
+    return float((loss > margin).mean())
+
+def test_closed_form_matches_brute_force():
+    """Small sigma, margins 1-7": the range where bounce + resurfacing decide the outcome"""
+    rng = np.random.default_rng(3)
+    margins = np.arange(1.0, 7.01, 0.5)
+    for uncertainty, confidence in ((0, 1.0), (1, 1.0), (2, 0.95)):
+        model = strike_probabilities(VEHICLE, VEHICLE + margins, uncertainty=uncertainty,
+                                     confidences=[confidence] * len(margins))
+        for margin, probability in zip(margins, model):
+            expected = brute_force(margin, uncertainty, confidence, rng)
+            assert abs(probability - expected) < TOLERANCE, (uncertainty, confidence, margin, probability, expected)
+        print(f"✓ uncertainty {uncertainty}\", confidence {confidence}: {np.round(model, 3).tolist()}")
+
+def test_no_false_clear():
+    """Any margin the worst-case losses can eat gets a non-zero probability"""
+    worst = STRIKE_SUSPENSION_MAX_INCHES + STRIKE_RESURFACING_MAX_INCHES
+    margins = np.arange(0.0, worst, 0.1)
+    model = strike_probabilities(VEHICLE, VEHICLE + margins, uncertainty=0, confidences=[1.0] * len(margins))
+    assert (model > 0).all(), margins[model <= 0]
+    print(f"✓ no zero probability below {worst}\" of margin")
+
+def test_certain_outcomes():
+    model = strike_probabilities(VEHICLE, [VEHICLE - 40, VEHICLE + 60], uncertainty=1, confidences=[1.0, 1.0],
+                                 settlement_means=[0.5, 0.5])
+    assert model.tolist() == [1.0, 0.0], model
+    print("✓ far-off bridges are certain either way")
+
+def test_settlement_only_adds_risk():
+    margins = np.arange(1.0, 9.01, 0.5)
+    without = strike_probabilities(VEHICLE, VEHICLE + margins, uncertainty=1, confidences=[1.0] * len(margins))
+    with_settlement = strike_probabilities(VEHICLE, VEHICLE + margins, uncertainty=1,
+                                           confidences=[1.0] * len(margins), settlement_means=[1.0] * len(margins))
+    assert (with_settlement >= without - 1e-9).all(), (without, with_settlement)
+    assert with_settlement[-1] > 0, "settlement can still reach a 9\" margin"
+    print("✓ settlement never lowers the probability")
+
+if __name__ == "__main__":
+    print("🎯 Testing strike probability model...")
+    print("=" * 50)
+    test_closed_form_matches_brute_force()
+    test_no_false_clear()
+    test_certain_outcomes()
+    test_settlement_only_adds_risk()
+    print("\nAll strike model checks passed")
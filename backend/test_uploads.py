@@ -0,0 +1,63 @@
+import asyncio
+import base64
+import io
+import os
+from fastapi import HTTPException
+from starlette.datastructures import Headers, UploadFile
+from services.uploads import read_upload_base64, CHUNK_BYTES
+
+def upload(data: bytes, size=None, content_type: str = "image/png") -> UploadFile:
+    return UploadFile(io.BytesIO(data), size=size, filename="photo",
+                      headers=Headers({"content-type": content_type}))
+
+def read(file: UploadFile, max_bytes: int):
+    return asyncio.run(read_upload_base64(file, max_bytes=max_bytes))
+
+def assert_rejected(file: UploadFile, max_bytes: int) -> None:
+    try:
+        read(file, max_bytes)
+        raise AssertionError("upload should be rejected")
+    except HTTPException as e:
+        assert e.status_code == 413 and str(max_bytes) in e.detail, e.detail
+
+def test_encodes_like_b64encode():
+    """Chunked encoding matches one-shot base64 at chunk and 3-byte boundaries"""
+    for length in (0, 1, 2, 3, CHUNK_BYTES - 1, CHUNK_BYTES, CHUNK_BYTES + 1, 2 * CHUNK_BYTES + 2):
+        data = os.urandom(length)
+        for size in (length, None):
+            encoded, media_type = read(upload(data, size=size), max_bytes=4 * CHUNK_BYTES)
+            assert encoded == base64.b64encode(data).decode("ascii"), (length, size)
+            assert media_type == "image/png"
+    print("✓ chunked base64 matches b64encode")
+
+def test_rejects_oversized_uploads():
+    """Declared too big: rejected before reading. Undeclared or under-declared: rejected while streaming"""
+    limit = CHUNK_BYTES + 10
+    data = os.urandom(limit + 1)
+    assert_rejected(upload(data, size=len(data)), limit)
+    assert_rejected(upload(data, size=None), limit)
+    assert_rejected(upload(data, size=100), limit)
+    encoded, _ = read(upload(os.urandom(limit), size=None), limit)
+    assert len(base64.b64decode(encoded)) == limit, "exactly at the limit is accepted"
+    print("✓ oversized uploads get 413")
+
+def test_under_declared_size_still_encodes():
+    """A client that under-reports its size (but stays under the cap) still gets the whole file"""
+    data = os.urandom(3 * CHUNK_BYTES + 5)
+    encoded, _ = read(upload(data, size=10), max_bytes=4 * CHUNK_BYTES)
+    assert base64.b64decode(encoded) == data
+    print("✓ under-declared size grows the buffer once")
+
+def test_default_media_type():
+    file = UploadFile(io.BytesIO(b"\xff\xd8\xff"), filename="photo")
+    assert read(file, max_bytes=1024)[1] == "image/jpeg"
+    print("✓ missing content type defaults to image/jpeg")
+
+if __name__ == "__main__":
+    print("📤 Testing upload reading...")
+    print("=" * 50)
+    test_encodes_like_b64encode()
+    test_rejects_oversized_uploads()
+    test_under_declared_size_still_encodes()
+    test_default_media_type()
+    print("\nAll upload checks passed")
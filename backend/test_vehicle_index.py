@@ -0,0 +1,45 @@
+from tools.vehicle_index import VehicleIndex
+
+index = VehicleIndex()
+
+def best(query: str):
+    matches = index.search(query, limit=1)
+    return matches[0]["entry"]["vehicle_id"] if matches else None
+
+def test_branded_queries():
+    """A make in the query beats the generic box-truck alias, even though the alias covers more of it"""
+    assert best("Penske box truck") == "penske_16ft"
+    assert best("Penske moving truck") == "penske_16ft"
+    assert best("U-Haul box truck").startswith("uhaul_")
+    print("✓ branded queries pick the make")
+
+def test_ties_prefer_taller():
+    """Same words matched: the tallest candidate is the cautious answer"""
+    assert best("U-Haul truck") == "uhaul_20ft"
+    heights = [m["entry"]["base_height_inches"] for m in index.search("U-Haul box truck", limit=4)]
+    assert heights[0] == max(heights), heights
+    print("✓ ties go to the taller vehicle")
+
+def test_specific_matches():
+    assert best("U-Haul 15' Truck") == "uhaul_15ft"
+    assert best("uhaul 15ft truck") == "uhaul_15ft"
+    assert best("class a rv") == "rv_class_a"
+    assert best("rv class c") == "rv_class_c"
+    assert best("box truck") == "box_truck_standard"
+    print("✓ model-specific queries")
+
+def test_generic_class_words_alone():
+    """Sharing only a class word ("truck") is not a match"""
+    for query in ("semi truck", "pickup truck", "truck", "school bus"):
+        assert best(query) is None, query
+    assert index.lookup("semi truck")["found"] is False
+    print("✓ class words alone don't match")
+
+if __name__ == "__main__":
+    print("🚚 Testing vehicle catalog lookup...")
+    print("=" * 50)
+    test_branded_queries()
+    test_ties_prefer_taller()
+    test_specific_matches()
+    test_generic_class_words_alone()
+    print("\nAll vehicle lookup checks passed")
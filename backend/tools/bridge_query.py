@@ -0,0 +1,289 @@
+import base64
+import binascii
+import hashlib
+import json
+import math
+import threading
+from bisect import bisect_left, bisect_right
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from .bridge_store import get_bridge_store, incident_total
+from .incident_store import get_incident_store
+from .geo import bounding_box, haversine_miles
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+DEFAULT_SORT = "-incidents"
+
+# Spatial grid cell size in degrees for bbox / radius queries
+GRID_CELL_DEGREES = 0.5
+
+# Sortable fields: name -> key function. "-field" sorts descending.
+# Ties are broken by bridge_id so every row has a unique keyset position.
+SORT_FIELDS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "clearance": lambda bridge: bridge["clearance_inches"],
+    "incidents": incident_total,
+    "name": lambda bridge: bridge["name"].lower()
+}
+
+# Key type per sort field; a cursor key of any other type can't be compared with the index
+SORT_KEY_TYPES: Dict[str, type] = {"clearance": int, "incidents": int, "name": str}
+
+# Numeric range filters that can narrow a scan of the matching sort index
+RANGE_FIELDS = ("clearance", "incidents")
+
+BBox = Tuple[float, float, float, float]
+
+def parse_sort(sort: str) -> Tuple[str, bool]:
+    """(field, descending) from "field" / "-field"; raises ValueError for unknown fields"""
+    descending = sort.startswith("-")
+    field = sort.lstrip("-")
+    if field not in SORT_FIELDS:
+        options = ", ".join(f"{name}, -{name}" for name in SORT_FIELDS)
+        raise ValueError(f"Unknown sort '{sort}'. Options: {options}")
+    return field, descending
+
+def encode_cursor(sort: str, key: Any, bridge_id: str) -> str:
+    """Opaque keyset cursor: the sort and the (key, id) of the last row served"""
+    raw = json.dumps([sort, key, bridge_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[Any, str]:
+    """(key, bridge_id) from a cursor; raises ValueError if malformed, mistyped or from another sort"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, key, bridge_id = json.loads(raw)
+    except (binascii.Error, ValueError, TypeError):
+        raise ValueError("Malformed cursor")
+    if cursor_sort != sort:
+        raise ValueError(f"Cursor was issued for sort '{cursor_sort}', not '{sort}'")
+    key_type = SORT_KEY_TYPES[parse_sort(sort)[0]]
+    if type(key) is not key_type or not isinstance(bridge_id, str):
+        raise ValueError("Malformed cursor")
+    return key, bridge_id
+
+def _cell(lat: float, lon: float) -> Tuple[int, int]:
+    return (math.floor(lat / GRID_CELL_DEGREES), math.floor(lon / GRID_CELL_DEGREES))
+
+class BridgeIndex:
+    """
+    Query index over one version of the bridge store
+
+    Every sort field has a precomputed (key, bridge_id) index, so a page is a
+    bisect to the cursor plus a forward scan, and range filters on the sort
+    field narrow the scan to a slice. Spatial filters go through a grid and
+    only visit the bridges in the area, ordered by their precomputed rank.
+    Edits to a few records are applied with patch() instead of a rebuild.
+    """
+
+    def __init__(self, bridges: Iterable[Dict[str, Any]], version: int = 0):
+        self.version = version
+        self.bridges: Dict[str, Dict[str, Any]] = {b["bridge_id"]: b for b in bridges}
+        self.sort_index: Dict[str, List[Tuple[Any, str]]] = {
+            field: sorted((key(b), b["bridge_id"]) for b in self.bridges.values())
+            for field, key in SORT_FIELDS.items()
+        }
+        # Position of each bridge in each sort index, so spatial candidates sort as ints
+        self.rank: Dict[str, Dict[str, int]] = {
+            field: {bridge_id: position for position, (_, bridge_id) in enumerate(index)}
+            for field, index in self.sort_index.items()
+        }
+        self.grid: Dict[Tuple[int, int], List[str]] = {}
+        for bridge in self.bridges.values():
+            self.grid.setdefault(_cell(bridge["latitude"], bridge["longitude"]), []).append(bridge["bridge_id"])
+
+    def __len__(self) -> int:
+        return len(self.bridges)
+
+    def patch(self, bridges: List[Dict[str, Any]], version: int) -> None:
+        """
+        Replace existing records in place, moving only their own sort index entries
+        Like any edit between pages, a row whose key changes may move across a cursor.
+        """
+        updates = {b["bridge_id"]: b for b in bridges if b["bridge_id"] in self.bridges}
+        for field, key in SORT_FIELDS.items():
+            moves = [
+                (old_key, new_key, bridge_id)
+                for bridge_id, old_key, new_key in ((i, key(self.bridges[i]), key(b)) for i, b in updates.items())
+                if old_key != new_key
+            ]
+            if not moves:
+                continue
+            index, rank = self.sort_index[field], self.rank[field]
+            for old_key, new_key, bridge_id in moves:
+                source = bisect_left(index, (old_key, bridge_id))
+                del index[source]
+                target = bisect_left(index, (new_key, bridge_id))
+                index.insert(target, (new_key, bridge_id))
+                # Only the entries between the two positions shift by one
+                for position in range(min(source, target), max(source, target) + 1):
+                    rank[index[position][1]] = position
+        for bridge_id, bridge in updates.items():
+            old = self.bridges[bridge_id]
+            cell, new_cell = _cell(old["latitude"], old["longitude"]), _cell(bridge["latitude"], bridge["longitude"])
+            if cell != new_cell:
+                self.grid[cell] = [i for i in self.grid[cell] if i != bridge_id]
+                self.grid.setdefault(new_cell, []).append(bridge_id)
+            self.bridges[bridge_id] = bridge
+        self.version = version
+
+    def etag(self, params: Dict[str, Any]) -> str:
+        """
+        ETag for a query: the data version plus the normalized parameters
+        A page is fully determined by both, so it can be checked before running the query
+        """
+        canonical = json.dumps(params, sort_keys=True, separators=(",", ":"))
+        return '"' + hashlib.sha1(f"{self.version}|{canonical}".encode("utf-8")).hexdigest()[:20] + '"'
+
+    def _spatial_candidates(self, bbox: BBox) -> List[str]:
+        min_lat, min_lon, max_lat, max_lon = bbox
+        lo, hi = _cell(min_lat, min_lon), _cell(max_lat, max_lon)
+        cells = (hi[0] - lo[0] + 1) * (hi[1] - lo[1] + 1)
+        if cells > len(self.grid):
+            # Huge box: walking the occupied cells is cheaper than the empty ones
+            return [
+                bridge_id for (i, j), ids in self.grid.items()
+                if lo[0] <= i <= hi[0] and lo[1] <= j <= hi[1] for bridge_id in ids
+            ]
+        candidates = []
+        for i in range(lo[0], hi[0] + 1):
+            for j in range(lo[1], hi[1] + 1):
+                candidates.extend(self.grid.get((i, j), ()))
+        return candidates
+
+    def within(self, bbox: BBox) -> List[Dict[str, Any]]:
+        """Bridges inside a bounding box, unordered"""
+        min_lat, min_lon, max_lat, max_lon = bbox
+        return [
+            bridge for bridge in (self.bridges[i] for i in self._spatial_candidates(bbox))
+            if min_lat <= bridge["latitude"] <= max_lat and min_lon <= bridge["longitude"] <= max_lon
+        ]
+
+    def nearest(self, lat: float, lon: float, radius_miles: float) -> Optional[Tuple[Dict[str, Any], float]]:
+        """(bridge, distance in miles) of the closest bridge within the radius, or None"""
+        best = None
+        for bridge_id in self._spatial_candidates(bounding_box(lat, lon, radius_miles)):
+            bridge = self.bridges[bridge_id]
+            distance = haversine_miles(lat, lon, bridge["latitude"], bridge["longitude"])
+            if distance <= radius_miles and (best is None or distance < best[1]):
+                best = (bridge, distance)
+        return best
+
+    def query(
+        self,
+        sort: str = DEFAULT_SORT,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        bbox: Optional[BBox] = None,
+        near: Optional[Tuple[float, float, float]] = None,
+        min_clearance: Optional[int] = None,
+        max_clearance: Optional[int] = None,
+        min_incidents: Optional[int] = None,
+        max_incidents: Optional[int] = None,
+        q: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        One page of bridges matching every filter, in sort order
+        near: (lat, lon, radius_miles). Raises ValueError for a bad sort or cursor.
+        """
+        field, descending = parse_sort(sort)
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        after = decode_cursor(cursor, sort) if cursor else None
+
+        bounds = {
+            "clearance": (min_clearance, max_clearance),
+            "incidents": (min_incidents, max_incidents)
+        }
+        # Spatial filters: a radius is pre-filtered by its bounding box
+        if near:
+            near_box = bounding_box(*near)
+            bbox = near_box if bbox is None else (
+                max(bbox[0], near_box[0]), max(bbox[1], near_box[1]),
+                min(bbox[2], near_box[2]), min(bbox[3], near_box[3])
+            )
+        needle = q.strip().lower() if q else None
+
+        def matches(bridge: Dict[str, Any]) -> bool:
+            for name, (low, high) in bounds.items():
+                value = SORT_FIELDS[name](bridge)
+                if (low is not None and value < low) or (high is not None and value > high):
+                    return False
+            if bbox and not (bbox[0] <= bridge["latitude"] <= bbox[2] and bbox[1] <= bridge["longitude"] <= bbox[3]):
+                return False
+            if near and haversine_miles(near[0], near[1], bridge["latitude"], bridge["longitude"]) > near[2]:
+                return False
+            if needle and needle not in bridge["name"].lower() and needle not in (bridge.get("road_name") or "").lower():
+                return False
+            return True
+
+        index = self.sort_index[field]
+        # Slice of the index inside the sort field's own range filter
+        start, end = 0, len(index)
+        if field in RANGE_FIELDS:
+            low, high = bounds[field]
+            if low is not None:
+                start = bisect_left(index, (low,))
+            if high is not None:
+                end = bisect_left(index, (math.floor(high) + 1,))
+        # Keyset position: strictly past the last row served
+        if after is not None:
+            position = tuple(after)
+            if descending:
+                end = min(end, bisect_left(index, position))
+            else:
+                start = max(start, bisect_right(index, position))
+
+        if bbox:
+            rank = self.rank[field]
+            positions = sorted(
+                position for position in (rank[i] for i in self._spatial_candidates(bbox))
+                if start <= position < end
+            )
+            if descending:
+                positions.reverse()
+        else:
+            positions = range(end - 1, start - 1, -1) if descending else range(start, end)
+        page: List[Dict[str, Any]] = []
+        last = None
+        has_more = False
+        for position in positions:
+            bridge = self.bridges[index[position][1]]
+            if not matches(bridge):
+                continue
+            if len(page) == limit:
+                has_more = True
+                break
+            page.append(bridge)
+            last = index[position]
+
+        return {
+            "bridges": page,
+            "count": len(page),
+            "sort": sort,
+            "next_cursor": encode_cursor(sort, *last) if has_more else None,
+            "version": self.version
+        }
+
+# Singleton instance, replaced whenever the bridge store reloads and patched for incident counts
+_index: Optional[BridgeIndex] = None
+_index_lock = threading.Lock()
+
+def _rebuild(_version: int = 0) -> None:
+    global _index
+    store = get_bridge_store()
+    _index = BridgeIndex(store.all(), store.version)
+
+def _patch_incidents(version: int, bridge_ids: List[str]) -> None:
+    store = get_bridge_store()
+    with _index_lock:
+        if _index is not None:
+            _index.patch([store.get(i) for i in bridge_ids], version)
+
+def get_bridge_index() -> BridgeIndex:
+    """Current bridge query index, built on first use"""
+    with _index_lock:
+        if _index is None:
+            get_incident_store()  # loads recorded strike counts into the bridge store
+            _rebuild()
+            get_bridge_store().subscribe(_rebuild)
+            get_bridge_store().subscribe_incidents(_patch_incidents)
+    return _index
@@ -0,0 +1,168 @@
+import csv
+import os
+import tempfile
+from collections import deque
+from typing import Callable, Deque, Dict, Any, List, Optional, Set, Tuple
+
+BRIDGES_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "bridges.csv")
+CSV_FIELDS = [
+    "bridge_id", "name", "latitude", "longitude", "clearance_inches", "confidence", "road_name",
+    "direction", "incident_count", "last_verified", "data_source", "warnings"
+]
+# Recent changes kept for subscribers that catch up by diffing only the changed bridges
+CHANGE_LOG_SIZE = 256
+
+def incident_total(bridge: Dict[str, Any]) -> int:
+    """Historical incidents from bridges.csv plus strikes recorded in the incident store"""
+    return bridge.get("incident_count", 0) + bridge.get("recorded_incidents", 0)
+
+class BridgeStore:
+    """
+    In-memory bridge clearance records loaded from data/bridges.csv
+    """
+
+    def __init__(self, csv_path: str = BRIDGES_CSV):
+        self.csv_path = csv_path
+        self._bridges: Dict[str, Dict[str, Any]] = {}
+        self._subscribers: List[Callable[[int], None]] = []
+        self._incident_subscribers: List[Callable[[int, List[str]], None]] = []
+        # bridge_id -> strikes recorded in the incident store (not written to the CSV)
+        self._recorded: Dict[str, int] = {}
+        # version changes on every edit; records_version skips incident-count-only updates
+        self.version = 0
+        self.records_version = 0
+        # (version, changed bridge_ids, or None for a full reload)
+        self._changes: Deque[Tuple[int, Optional[List[str]]]] = deque(maxlen=CHANGE_LOG_SIZE)
+        self.load()
+
+    def load(self) -> None:
+        """(Re)load all bridge records from the CSV file"""
+        bridges = {}
+        with open(self.csv_path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                bridge = BridgeStore._parse_row(row)
+                bridge["recorded_incidents"] = self._recorded.get(bridge["bridge_id"], 0)
+                bridges[bridge["bridge_id"]] = bridge
+        self._bridges = bridges
+        self.version += 1
+        self.records_version += 1
+        self._changes.append((self.version, None))
+        self._notify()
+
+    def upsert(self, bridges: List[Dict[str, Any]]) -> None:
+        """Add or replace records by bridge_id; subscribers are notified once for the whole batch"""
+        if not bridges:
+            return
+        updated = dict(self._bridges)
+        for bridge in bridges:
+            updated[bridge["bridge_id"]] = {**bridge, "recorded_incidents": self._recorded.get(bridge["bridge_id"], 0)}
+        self._bridges = updated
+        self.version += 1
+        self.records_version += 1
+        self._changes.append((self.version, [bridge["bridge_id"] for bridge in bridges]))
+        self._notify()
+
+    def set_recorded_incidents(self, counts: Dict[str, int]) -> None:
+        """
+        Update recorded strike counts per bridge (absolute, not increments)
+        Changed records are replaced in place and only incident subscribers are
+        notified, with the changed ids, so they can patch rather than rebuild.
+        """
+        self._recorded.update(counts)
+        changed = []
+        for bridge_id, count in counts.items():
+            bridge = self._bridges.get(bridge_id)
+            if bridge is not None and bridge.get("recorded_incidents", 0) != count:
+                self._bridges[bridge_id] = {**bridge, "recorded_incidents": count}
+                changed.append(bridge_id)
+        if not changed:
+            return
+        self.version += 1
+        self._changes.append((self.version, changed))
+        for callback in self._incident_subscribers:
+            callback(self.version, changed)
+
+    def save(self) -> None:
+        """Write all records back to the CSV file (atomic replace)"""
+        directory = os.path.dirname(self.csv_path)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".csv.tmp")
+        try:
+            with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction="ignore")
+                writer.writeheader()
+                for bridge in self._bridges.values():
+                    writer.writerow({**bridge, "warnings": ";".join(bridge.get("warnings") or [])})
+            os.replace(tmp_path, self.csv_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def changed_since(self, version: int) -> Tuple[int, Optional[Set[str]]]:
+        """
+        (latest version, bridge_ids changed after `version`)
+        The ids are None when a reload happened since, or the log no longer reaches back that far.
+        """
+        changes = list(self._changes)
+        latest = changes[-1][0] if changes else self.version
+        if version >= latest:
+            return latest, set()
+        if changes[0][0] > version + 1:
+            return latest, None
+        ids: Set[str] = set()
+        for change_version, changed in changes:
+            if change_version <= version:
+                continue
+            if changed is None:
+                return latest, None
+            ids.update(changed)
+        return latest, ids
+
+    def subscribe(self, callback: Callable[[int], None]) -> None:
+        """Call callback(version) whenever records are loaded or replaced (cache invalidation hook)"""
+        self._subscribers.append(callback)
+
+    def subscribe_incidents(self, callback: Callable[[int, List[str]], None]) -> None:
+        """Call callback(version, bridge_ids) when only recorded incident counts change"""
+        self._incident_subscribers.append(callback)
+
+    def _notify(self) -> None:
+        for callback in self._subscribers:
+            callback(self.version)
+
+    @staticmethod
+    def _parse_row(row: Dict[str, str]) -> Dict[str, Any]:
+        """Convert a CSV row into a typed bridge record"""
+        return {
+            "bridge_id": row["bridge_id"],
+            "name": row["name"],
+            "latitude": float(row["latitude"]),
+            "longitude": float(row["longitude"]),
+            "clearance_inches": int(row["clearance_inches"]),
+            "confidence": float(row["confidence"] or 1.0),
+            "road_name": row.get("road_name", ""),
+            "direction": row.get("direction", ""),
+            "incident_count": int(row.get("incident_count") or 0),
+            "last_verified": row.get("last_verified", ""),
+            "data_source": row.get("data_source", ""),
+            "warnings": [w for w in (row.get("warnings") or "").split(";") if w]
+        }
+
+    def all(self) -> List[Dict[str, Any]]:
+        """All bridge records"""
+        return list(self._bridges.values())
+
+    def get(self, bridge_id: str) -> Optional[Dict[str, Any]]:
+        """Single bridge record by id"""
+        return self._bridges.get(bridge_id)
+
+    def __len__(self) -> int:
+        return len(self._bridges)
+
+_store: Optional[BridgeStore] = None
+
+def get_bridge_store() -> BridgeStore:
+    """Shared BridgeStore instance, loaded on first use"""
+    global _store
+    if _store is None:
+        _store = BridgeStore()
+    return _store
@@ -1,17 +1,44 @@
-import requests
 import os
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, List, Optional, Tuple
 from dotenv import load_dotenv
+from .vehicle_index import get_vehicle_index
+from services.tracing import traced, traced_http
 
 load_dotenv()
 
 MAPBOX_TOKEN = os.getenv("VITE_MAPBOX_TOKEN")
 OPENWEATHER_KEY = os.getenv("OPENWEATHER_API_KEY")
 
+def _http():
+    """
+    requests, imported on the first outbound call to keep it off the startup path
+    In a traced request, calls are recorded as http spans (see services.tracing).
+    """
+    import requests
+    return traced_http(requests)
+
+def clearance_impact(condition: str, temperature: float) -> Tuple[int, List[str]]:
+    """
+    Clearance change in inches (negative = less room) and warnings for a weather reading
+    The worst applicable rule wins.
+    """
+    conditions = (condition or "").lower()
+    impact = 0
+    warnings = []
+    if "snow" in conditions or "ice" in conditions:
+        impact = -2  # Ice buildup reduces clearance
+        warnings.append("Ice/snow may reduce bridge clearance by 2 inches")
+    if temperature < 32:
+        impact = min(impact, -1)  # Freezing conditions
+        warnings.append("Freezing conditions - watch for ice")
+    return impact, warnings
+
 class ExternalTools:
     """Tools that agents can use"""
     
     @staticmethod
+    @traced("tool")
     def geocode_location(address: str) -> Dict[str, Any]:
         """
         Convert address to coordinates using Mapbox
@@ -27,7 +54,7 @@ class ExternalTools:
                 "access_token": MAPBOX_TOKEN,
                 "limit": 1
             }
-            response = requests.get(url, params=params, timeout=5)
+            response = _http().get(url, params=params, timeout=5)
             
             if response.status_code != 200:
                 print(f"Mapbox API error: {response.status_code}, using mock data")
@@ -87,6 +114,7 @@ class ExternalTools:
         }
     
     @staticmethod
+    @traced("tool")
     def query_bridges_nearby(lat: float, lon: float, radius_km: float = 10) -> Dict[str, Any]:
         """
         Query OpenStreetMap for bridges near location
@@ -106,7 +134,7 @@ class ExternalTools:
             """
             
             url = "https://overpass-api.de/api/interpreter"
-            response = requests.post(url, data=query, timeout=15)
+            response = _http().post(url, data=query, timeout=15)
             data = response.json()
             
             bridges = []
@@ -197,6 +225,7 @@ class ExternalTools:
         }
     
     @staticmethod
+    @traced("tool")
     def get_weather_conditions(lat: float, lon: float) -> Dict[str, Any]:
         """
         Get current weather conditions using OpenWeather API
@@ -214,7 +243,7 @@ class ExternalTools:
                 "appid": OPENWEATHER_KEY,
                 "units": "imperial"
             }
-            response = requests.get(url, params=params, timeout=5)
+            response = _http().get(url, params=params, timeout=5)
             
             if response.status_code != 200:
                 print(f"Weather API error: {response.status_code}, using mock data")
@@ -226,26 +255,15 @@ class ExternalTools:
             main = data.get("main", {})
             
             # Determine if conditions affect clearance
-            conditions = weather.get("main", "").lower()
             temp = main.get("temp", 50)
-            
-            clearance_impact = 0
-            warnings = []
-            
-            if "snow" in conditions or "ice" in conditions:
-                clearance_impact = -2  # Ice buildup reduces clearance
-                warnings.append("Ice/snow may reduce bridge clearance by 2 inches")
-            
-            if temp < 32:
-                clearance_impact = -1  # Freezing conditions
-                warnings.append("Freezing conditions - watch for ice")
+            impact, warnings = clearance_impact(weather.get("main", ""), temp)
             
             return {
                 "success": True,
                 "condition": weather.get("main"),
                 "description": weather.get("description"),
                 "temperature": temp,
-                "clearance_impact_inches": clearance_impact,
+                "clearance_impact_inches": impact,
                 "warnings": warnings,
                 "tool_used": "openweather_api"
             }
@@ -270,37 +288,70 @@ class ExternalTools:
         }
     
     @staticmethod
-    def lookup_vehicle_specs(vehicle_type: str) -> Dict[str, Any]:
+    @traced("tool")
+    def get_weather_forecast(lat: float, lon: float) -> Dict[str, Any]:
         """
-        Look up known vehicle specifications
-        Mock database for now - in production would query real database
+        Get the 5-day / 3-hour forecast for a point using OpenWeather API
+        Falls back to mock data if API fails
         """
-        vehicle_db = {
-            "u-haul 10": {"base_height": 83, "name": "U-Haul 10' Truck"},
-            "u-haul 15": {"base_height": 150, "name": "U-Haul 15' Truck"},
-            "u-haul 20": {"base_height": 162, "name": "U-Haul 20' Truck"},
-            "penske 16": {"base_height": 152, "name": "Penske 16' Truck"},
-            "box truck": {"base_height": 150, "name": "Standard Box Truck"},
-            "class a rv": {"base_height": 156, "name": "Class A RV"},
-            "class c rv": {"base_height": 138, "name": "Class C RV"}
-        }
-        
-        # Fuzzy match
-        vehicle_lower = vehicle_type.lower()
-        for key, specs in vehicle_db.items():
-            if key in vehicle_lower or vehicle_lower in key:
-                return {
-                    "success": True,
-                    "found": True,
-                    "vehicle_name": specs["name"],
-                    "base_height_inches": specs["base_height"],
-                    "tool_used": "vehicle_database"
-                }
-        
+        if not OPENWEATHER_KEY:
+            return ExternalTools._get_mock_forecast(lat, lon)
+
+        try:
+            url = "https://api.openweathermap.org/data/2.5/forecast"
+            params = {
+                "lat": lat,
+                "lon": lon,
+                "appid": OPENWEATHER_KEY,
+                "units": "imperial"
+            }
+            response = _http().get(url, params=params, timeout=5)
+
+            if response.status_code != 200:
+                print(f"Forecast API error: {response.status_code}, using mock data")
+                return ExternalTools._get_mock_forecast(lat, lon)
+
+            steps = []
+            for entry in response.json().get("list", []):
+                weather = (entry.get("weather") or [{}])[0]
+                steps.append({
+                    "time": entry.get("dt"),
+                    "condition": weather.get("main"),
+                    "description": weather.get("description"),
+                    "temperature": entry.get("main", {}).get("temp", 50)
+                })
+
+            return {
+                "success": True,
+                "steps": steps,
+                "tool_used": "openweather_forecast_api"
+            }
+        except Exception as e:
+            print(f"Forecast API failed: {e}, using mock data")
+            return ExternalTools._get_mock_forecast(lat, lon)
+
+    @staticmethod
+    def _get_mock_forecast(lat: float, lon: float) -> Dict[str, Any]:
+        """
+        Return a mock forecast matching the mock current weather
+        """
+        start = int(time.time()) // 10800 * 10800
         return {
             "success": True,
-            "found": False,
-            "vehicle_name": vehicle_type,
-            "base_height_inches": None,
-            "tool_used": "vehicle_database"
-        }
\ No newline at end of file
+            "steps": [
+                {"time": start + i * 10800, "condition": "Clear", "description": "clear sky", "temperature": 68}
+                for i in range(40)
+            ],
+            "tool_used": "mock_weather_data",
+            "note": "Using mock data - OpenWeather API unavailable"
+        }
+    
+    @staticmethod
+    @traced("tool")
+    def lookup_vehicle_specs(vehicle_type: str) -> Dict[str, Any]:
+        """
+        Look up known vehicle specifications
+        Ranked fuzzy match against the catalog in data/vehicles.json
+        (plus any files in VEHICLE_CATALOG_PATHS), including typical mods
+        """
+        return get_vehicle_index().lookup(vehicle_type or "")
@@ -0,0 +1,40 @@
+import math
+from typing import Tuple
+
+EARTH_RADIUS_MILES = 3959
+MILES_PER_DEGREE_LAT = 69.0
+
+def haversine_miles(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Great-circle distance between two coordinates in miles
+    Same formula as calculateDistance() in the frontend bridgeHelpers
+    """
+    d_lat = math.radians(lat2 - lat1)
+    d_lon = math.radians(lon2 - lon1)
+    a = (math.sin(d_lat / 2) ** 2 +
+         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
+         math.sin(d_lon / 2) ** 2)
+    return EARTH_RADIUS_MILES * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+def bearing_degrees(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Initial compass bearing (0-360, 0 = north) from point 1 to point 2"""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_lon = math.radians(lon2 - lon1)
+    x = math.sin(d_lon) * math.cos(phi2)
+    y = math.cos(phi1) * math.sin(phi2) - math.sin(phi1) * math.cos(phi2) * math.cos(d_lon)
+    return (math.degrees(math.atan2(x, y)) + 360) % 360
+
+def heading_difference(a: float, b: float) -> float:
+    """Smallest absolute angle between two headings in degrees (0-180)"""
+    diff = abs(a - b) % 360
+    return 360 - diff if diff > 180 else diff
+
+def bounding_box(lat: float, lon: float, radius_miles: float) -> Tuple[float, float, float, float]:
+    """
+    Cheap lat/lon box (min_lat, min_lon, max_lat, max_lon) containing a radius
+    Used as a pre-filter before exact haversine checks
+    """
+    d_lat = radius_miles / MILES_PER_DEGREE_LAT
+    d_lon = radius_miles / (MILES_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 0.01))
+    return (lat - d_lat, lon - d_lon, lat + d_lat, lon + d_lon)
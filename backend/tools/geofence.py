@@ -0,0 +1,196 @@
+import math
+import threading
+from typing import Dict, Any, List, Iterable, Optional, Set, Tuple
+from .geo import MILES_PER_DEGREE_LAT
+from .bridge_store import get_bridge_store
+
+# Vehicle height classes: name -> class ceiling in inches.
+# Vehicles are always assigned to the class at or above their height,
+# so a zone built for the class ceiling is never weaker than the real vehicle.
+HEIGHT_CLASSES = {
+    "up_to_10ft": 120,
+    "up_to_11ft6": 138,
+    "up_to_12ft6": 150,
+    "up_to_13ft6": 162,
+    "up_to_14ft6": 174,
+    "oversize": 216,
+}
+
+# Less than 6 inches of margin = dangerous (matches live monitoring)
+DANGER_MARGIN_INCHES = 6
+
+# Approach zone radius: larger when the class will not fit at all
+TIGHT_APPROACH_MILES = 0.25
+NO_FIT_APPROACH_MILES = 0.5
+# Inside this radius of a bridge the class cannot clear, a fix is a violation
+VIOLATION_RADIUS_MILES = 0.03
+
+# Spatial hash cell size in degrees; zones are added to every cell they overlap
+CELL_DEGREES = 0.02
+
+class GeofenceZone:
+    """Precomputed approach zone around one bridge for one height class"""
+
+    __slots__ = ("zone_id", "bridge", "height_class", "margin_inches", "radius_miles",
+                 "radius_sq", "violation_sq", "lat", "lon", "lon_scale")
+
+    def __init__(self, bridge: Dict[str, Any], height_class: str, class_height: int):
+        self.bridge = bridge
+        self.height_class = height_class
+        self.zone_id = f"{bridge['bridge_id']}:{height_class}"
+        self.margin_inches = bridge["clearance_inches"] - class_height
+        self.radius_miles = NO_FIT_APPROACH_MILES if self.margin_inches < 0 else TIGHT_APPROACH_MILES
+        self.radius_sq = self.radius_miles ** 2
+        self.violation_sq = VIOLATION_RADIUS_MILES ** 2 if self.margin_inches < 0 else -1.0
+        self.lat = bridge["latitude"]
+        self.lon = bridge["longitude"]
+        self.lon_scale = MILES_PER_DEGREE_LAT * math.cos(math.radians(self.lat))
+
+    def distance_sq(self, lat: float, lon: float) -> float:
+        """Squared equirectangular distance in miles (accurate at zone scale)"""
+        dy = (lat - self.lat) * MILES_PER_DEGREE_LAT
+        dx = (lon - self.lon) * self.lon_scale
+        return dx * dx + dy * dy
+
+def _cell(lat: float, lon: float) -> Tuple[int, int]:
+    return (math.floor(lat / CELL_DEGREES), math.floor(lon / CELL_DEGREES))
+
+def height_class_for(height_inches: float) -> str:
+    """Smallest height class whose ceiling is at or above the vehicle height"""
+    for name, ceiling in HEIGHT_CLASSES.items():
+        if height_inches <= ceiling:
+            return name
+    raise ValueError(f"Vehicle height {height_inches}\" exceeds every height class")
+
+class GeofenceEngine:
+    """
+    Fleet-scale geofencing against low-clearance bridge approach zones
+
+    Zones are precomputed per height class and bucketed into a spatial hash,
+    so each fix is only compared with the zones in its own grid cell instead
+    of every bridge. process_batch() emits enter/exit/violation events.
+    """
+
+    def __init__(self, bridges: List[Dict[str, Any]]):
+        self._grid: Dict[str, Dict[Tuple[int, int], List[GeofenceZone]]] = {}
+        self._vehicle_class: Dict[str, str] = {}
+        self._inside: Dict[str, Set[str]] = {}
+        self._violating: Dict[str, Set[str]] = {}
+        self.zone_count = 0
+        self.build(bridges)
+
+    def build(self, bridges: List[Dict[str, Any]]) -> None:
+        """Precompute approach zones for every height class"""
+        grid = {name: {} for name in HEIGHT_CLASSES}
+        zone_count = 0
+        for height_class, class_height in HEIGHT_CLASSES.items():
+            cells = grid[height_class]
+            for bridge in bridges:
+                if bridge["clearance_inches"] - class_height >= DANGER_MARGIN_INCHES:
+                    continue
+                zone = GeofenceZone(bridge, height_class, class_height)
+                zone_count += 1
+                d_lat = zone.radius_miles / MILES_PER_DEGREE_LAT
+                d_lon = zone.radius_miles / max(zone.lon_scale, 0.01)
+                min_cell = _cell(zone.lat - d_lat, zone.lon - d_lon)
+                max_cell = _cell(zone.lat + d_lat, zone.lon + d_lon)
+                for i in range(min_cell[0], max_cell[0] + 1):
+                    for j in range(min_cell[1], max_cell[1] + 1):
+                        cells.setdefault((i, j), []).append(zone)
+        self._grid = grid
+        self.zone_count = zone_count
+
+    def register_vehicle(self, vehicle_id: str, height_inches: float) -> str:
+        """Track a vehicle; returns the height class it was assigned"""
+        height_class = height_class_for(height_inches)
+        self._vehicle_class[vehicle_id] = height_class
+        self._inside.setdefault(vehicle_id, set())
+        self._violating.setdefault(vehicle_id, set())
+        return height_class
+
+    def remove_vehicle(self, vehicle_id: str) -> None:
+        """Stop tracking a vehicle"""
+        self._vehicle_class.pop(vehicle_id, None)
+        self._inside.pop(vehicle_id, None)
+        self._violating.pop(vehicle_id, None)
+
+    @property
+    def vehicle_count(self) -> int:
+        return len(self._vehicle_class)
+
+    def process_batch(self, fixes: Iterable[Tuple[str, float, float]]) -> List[Dict[str, Any]]:
+        """
+        Check one tick of (vehicle_id, lat, lon) fixes
+        Returns enter/exit/violation events; unregistered vehicles are skipped
+        """
+        events = []
+        grid = self._grid
+        vehicle_class = self._vehicle_class
+
+        for vehicle_id, lat, lon in fixes:
+            height_class = vehicle_class.get(vehicle_id)
+            if height_class is None:
+                continue
+
+            zones = grid[height_class].get(_cell(lat, lon), ())
+            inside = self._inside[vehicle_id]
+            violating = self._violating[vehicle_id]
+            now_inside: Optional[Set[str]] = None
+
+            for zone in zones:
+                dist_sq = zone.distance_sq(lat, lon)
+                if dist_sq > zone.radius_sq:
+                    continue
+                if now_inside is None:
+                    now_inside = set()
+                now_inside.add(zone.zone_id)
+                if zone.zone_id not in inside:
+                    events.append(GeofenceEngine._event("enter", vehicle_id, zone, dist_sq))
+                if dist_sq <= zone.violation_sq:
+                    if zone.zone_id not in violating:
+                        violating.add(zone.zone_id)
+                        events.append(GeofenceEngine._event("violation", vehicle_id, zone, dist_sq))
+                else:
+                    violating.discard(zone.zone_id)
+
+            if inside:
+                for zone_id in inside - (now_inside or set()):
+                    violating.discard(zone_id)
+                    events.append({
+                        "type": "exit",
+                        "vehicle_id": vehicle_id,
+                        "zone_id": zone_id,
+                        "bridge_id": zone_id.split(":", 1)[0],
+                        "height_class": height_class
+                    })
+            self._inside[vehicle_id] = now_inside or set()
+
+        return events
+
+    @staticmethod
+    def _event(event_type: str, vehicle_id: str, zone: GeofenceZone, dist_sq: float) -> Dict[str, Any]:
+        return {
+            "type": event_type,
+            "vehicle_id": vehicle_id,
+            "zone_id": zone.zone_id,
+            "bridge_id": zone.bridge["bridge_id"],
+            "bridge_name": zone.bridge["name"],
+            "height_class": zone.height_class,
+            "clearance_inches": zone.bridge["clearance_inches"],
+            "margin_inches": zone.margin_inches,
+            "distance_miles": round(math.sqrt(dist_sq), 3)
+        }
+
+# Singleton instance
+_engine: Optional[GeofenceEngine] = None
+_engine_lock = threading.Lock()
+
+def get_geofence_engine() -> GeofenceEngine:
+    """Shared GeofenceEngine built on first use; zones are rebuilt whenever the bridge store changes"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            store = get_bridge_store()
+            _engine = GeofenceEngine(store.all())
+            store.subscribe(lambda _version: _engine.build(store.all()))
+    return _engine
@@ -0,0 +1,266 @@
+import hashlib
+import math
+import os
+import struct
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from .bridge_store import BridgeStore, get_bridge_store, incident_total
+from .incident_store import get_incident_store
+from .geofence import HEIGHT_CLASSES, DANGER_MARGIN_INCHES
+
+# Tiles are precomputed for zooms TILE_MIN_ZOOM..TILE_MAX_ZOOM; deeper zooms
+# are cut from the max-zoom tile on request. Below the min zoom (continent
+# scale) tiles are empty, so no client ever downloads the whole country.
+TILE_MIN_ZOOM = int(os.getenv("TILE_MIN_ZOOM", "6"))
+TILE_MAX_ZOOM = int(os.getenv("TILE_MAX_ZOOM", "14"))
+# Coordinate resolution inside a tile (same convention as Mapbox vector tiles)
+TILE_EXTENT = 4096
+
+# Packed tile layout (little-endian):
+#   header: b"BGT1", uint8 format version, uint8 height class index, uint16 record count
+#   record: uint16 x, uint16 y, uint16 clearance_inches, uint16 incident_count,
+#           uint8 flags, uint8 id length, id bytes (utf-8)
+TILE_MAGIC = b"BGT1"
+TILE_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sBBH")
+_RECORD = struct.Struct("<HHHHBB")
+
+# Record flags
+FLAG_NO_FIT = 1          # clearance below the class ceiling
+FLAG_PROHIBITED = 2      # road closed to commercial vehicles
+FLAG_HIGH_INCIDENTS = 4  # 10+ recorded strikes
+
+HEIGHT_CLASS_NAMES = list(HEIGHT_CLASSES)
+
+TileKey = Tuple[int, int, int]
+
+def tile_coords(lat: float, lon: float, zoom: int) -> Tuple[float, float]:
+    """Fractional Web Mercator tile coordinates of a point"""
+    n = 2 ** zoom
+    lat = max(min(lat, 85.05112878), -85.05112878)
+    x = (lon + 180.0) / 360.0 * n
+    y = (1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n
+    return x, y
+
+def tile_for(lat: float, lon: float, zoom: int) -> TileKey:
+    x, y = tile_coords(lat, lon, zoom)
+    n = 2 ** zoom
+    return zoom, min(int(x), n - 1), min(int(y), n - 1)
+
+class HazardRecord:
+    """A bridge reduced to what tiles encode; world coordinates are zoom-0 tile units"""
+
+    __slots__ = ("bridge_id", "id_bytes", "world_x", "world_y", "clearance_inches", "incident_count", "flags")
+
+    def __init__(self, bridge: Dict[str, Any]):
+        self.bridge_id = bridge["bridge_id"]
+        self.id_bytes = self.bridge_id.encode("utf-8")[:255]
+        self.world_x, self.world_y = tile_coords(bridge["latitude"], bridge["longitude"], 0)
+        self.clearance_inches = min(bridge["clearance_inches"], 0xFFFF)
+        self.incident_count = min(incident_total(bridge), 0xFFFF)
+        self.flags = 0
+        if any(w.lower() == "commercial vehicles prohibited" for w in bridge.get("warnings") or []):
+            self.flags |= FLAG_PROHIBITED
+        if incident_total(bridge) >= 10:
+            self.flags |= FLAG_HIGH_INCIDENTS
+
+    def tile(self, zoom: int) -> TileKey:
+        n = 2 ** zoom
+        return zoom, min(int(self.world_x * n), n - 1), min(int(self.world_y * n), n - 1)
+
+def is_hazard(record: HazardRecord, class_height: int) -> bool:
+    """Less than DANGER_MARGIN_INCHES of room for a vehicle at the class ceiling"""
+    return record.clearance_inches - class_height < DANGER_MARGIN_INCHES
+
+def pack_tile(key: TileKey, class_index: int, records: List[HazardRecord]) -> bytes:
+    """Encode the hazards of one tile for one height class"""
+    z, tx, ty = key
+    n = 2 ** z
+    class_height = HEIGHT_CLASSES[HEIGHT_CLASS_NAMES[class_index]]
+    parts = [_HEADER.pack(TILE_MAGIC, TILE_FORMAT_VERSION, class_index, len(records))]
+    for record in records:
+        flags = record.flags | (FLAG_NO_FIT if record.clearance_inches < class_height else 0)
+        parts.append(_RECORD.pack(
+            min(int((record.world_x * n - tx) * TILE_EXTENT), TILE_EXTENT - 1),
+            min(int((record.world_y * n - ty) * TILE_EXTENT), TILE_EXTENT - 1),
+            record.clearance_inches,
+            record.incident_count,
+            flags,
+            len(record.id_bytes)
+        ))
+        parts.append(record.id_bytes)
+    return b"".join(parts)
+
+def etag_for(data: bytes) -> str:
+    """Strong ETag from the tile content"""
+    return '"' + hashlib.sha1(data).hexdigest()[:20] + '"'
+
+def unpack_tile(data: bytes) -> Dict[str, Any]:
+    """Decode a packed tile (used for ?format=json and tests)"""
+    magic, version, class_index, count = _HEADER.unpack_from(data, 0)
+    if magic != TILE_MAGIC:
+        raise ValueError("Not a hazard tile")
+    offset = _HEADER.size
+    records = []
+    for _ in range(count):
+        x, y, clearance, incidents, flags, id_len = _RECORD.unpack_from(data, offset)
+        offset += _RECORD.size
+        records.append({
+            "bridge_id": data[offset:offset + id_len].decode("utf-8"),
+            "x": x,
+            "y": y,
+            "clearance_inches": clearance,
+            "incident_count": incidents,
+            "no_fit": bool(flags & FLAG_NO_FIT),
+            "prohibited": bool(flags & FLAG_PROHIBITED),
+            "high_incidents": bool(flags & FLAG_HIGH_INCIDENTS)
+        })
+        offset += id_len
+    return {"version": version, "height_class": HEIGHT_CLASS_NAMES[class_index], "extent": TILE_EXTENT, "bridges": records}
+
+class HazardTileSet:
+    """
+    Precomputed hazard tiles for every height class
+
+    Only non-empty tiles are stored; each carries a content-hash ETag. When
+    the bridge store changes, sync() looks only at the bridges its change log
+    names, and only tiles covering added, removed or edited bridges are re-encoded.
+    """
+
+    def __init__(
+        self,
+        bridges: Iterable[Dict[str, Any]],
+        min_zoom: int = TILE_MIN_ZOOM,
+        max_zoom: int = TILE_MAX_ZOOM
+    ):
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self._lock = threading.Lock()
+        self._bridges: Dict[str, Dict[str, Any]] = {}
+        self._records: Dict[str, HazardRecord] = {}
+        self._tile_bridges: Dict[TileKey, Set[str]] = {}
+        self._tiles: Dict[Tuple[int, TileKey], Tuple[bytes, str]] = {}
+        self.tiles_rebuilt = 0
+        # Bridge store version this set last synced to (see sync)
+        self.store_version = 0
+        self.apply(bridges)
+
+    def _tiles_of(self, record: HazardRecord) -> List[TileKey]:
+        return [record.tile(z) for z in range(self.min_zoom, self.max_zoom + 1)]
+
+    def apply(self, bridges: Iterable[Dict[str, Any]]) -> int:
+        """Sync to a new bridge list, re-encoding only affected tiles; returns tiles rebuilt"""
+        with self._lock:
+            return self._apply(bridges)
+
+    def sync(self, store: BridgeStore) -> int:
+        """
+        Catch up with the bridge store; returns tiles rebuilt
+        Only bridges changed since the last sync are compared, unless the store
+        was reloaded (or changed too often to say which), then everything is.
+        """
+        with self._lock:
+            version, changed = store.changed_since(self.store_version)
+            if changed is None:
+                rebuilt = self._apply(store.all())
+            else:
+                dirty: Set[TileKey] = set()
+                for bridge_id in changed:
+                    bridge = store.get(bridge_id)
+                    self._replace(bridge_id, bridge, dirty)
+                    if bridge is None:
+                        self._bridges.pop(bridge_id, None)
+                    else:
+                        self._bridges[bridge_id] = bridge
+                rebuilt = self._rebuild_all(dirty)
+            self.store_version = version
+            return rebuilt
+
+    def _apply(self, bridges: Iterable[Dict[str, Any]]) -> int:
+        new = {b["bridge_id"]: b for b in bridges}
+        dirty: Set[TileKey] = set()
+        for bridge_id in set(self._bridges) | set(new):
+            self._replace(bridge_id, new.get(bridge_id), dirty)
+        self._bridges = new
+        return self._rebuild_all(dirty)
+
+    def _replace(self, bridge_id: str, new_bridge: Optional[Dict[str, Any]], dirty: Set[TileKey]) -> None:
+        old_bridge = self._bridges.get(bridge_id)
+        if old_bridge == new_bridge:
+            return
+        if old_bridge:
+            for key in self._tiles_of(self._records.pop(bridge_id)):
+                self._tile_bridges[key].discard(bridge_id)
+                dirty.add(key)
+        if new_bridge:
+            record = self._records[bridge_id] = HazardRecord(new_bridge)
+            for key in self._tiles_of(record):
+                self._tile_bridges.setdefault(key, set()).add(bridge_id)
+                dirty.add(key)
+
+    def _rebuild_all(self, dirty: Set[TileKey]) -> int:
+        for key in dirty:
+            self._rebuild(key)
+        self.tiles_rebuilt += len(dirty)
+        return len(dirty)
+
+    def _rebuild(self, key: TileKey) -> None:
+        ids = self._tile_bridges.get(key)
+        if not ids:
+            self._tile_bridges.pop(key, None)
+        in_tile = [self._records[i] for i in sorted(ids or ())]
+        for class_index, name in enumerate(HEIGHT_CLASS_NAMES):
+            hazards = [b for b in in_tile if is_hazard(b, HEIGHT_CLASSES[name])]
+            if not hazards:
+                self._tiles.pop((class_index, key), None)
+                continue
+            data = pack_tile(key, class_index, hazards)
+            self._tiles[(class_index, key)] = (data, etag_for(data))
+
+    def get(self, height_class: str, z: int, x: int, y: int) -> Tuple[bytes, str]:
+        """(tile bytes, ETag) for a height class; empty tiles are a bare header"""
+        class_index = HEIGHT_CLASS_NAMES.index(height_class)
+        with self._lock:
+            if z <= self.max_zoom:
+                tile = self._tiles.get((class_index, (z, x, y)))
+                if tile:
+                    return tile
+                data = pack_tile((z, x, y), class_index, [])
+                return data, etag_for(data)
+
+            # Overzoom: cut the tile from its max-zoom ancestor
+            shift = z - self.max_zoom
+            parent = (self.max_zoom, x >> shift, y >> shift)
+            ids = self._tile_bridges.get(parent, ())
+            records = [self._records[i] for i in sorted(ids)]
+        class_height = HEIGHT_CLASSES[height_class]
+        hazards = [r for r in records if is_hazard(r, class_height) and r.tile(z) == (z, x, y)]
+        data = pack_tile((z, x, y), class_index, hazards)
+        return data, etag_for(data)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "bridges": len(self._bridges),
+                "min_zoom": self.min_zoom,
+                "max_zoom": self.max_zoom,
+                "tiles": len(self._tiles),
+                "tiles_rebuilt": self.tiles_rebuilt
+            }
+
+# Singleton instance
+_tile_set: Optional[HazardTileSet] = None
+_tile_lock = threading.Lock()
+
+def get_hazard_tiles() -> HazardTileSet:
+    """Shared tile set, built on first use and kept in sync with the bridge store"""
+    global _tile_set
+    with _tile_lock:
+        if _tile_set is None:
+            get_incident_store()  # loads recorded strike counts into the bridge store
+            store = get_bridge_store()
+            _tile_set = HazardTileSet(())
+            _tile_set.sync(store)
+            store.subscribe(lambda _version: _tile_set.sync(store))
+            store.subscribe_incidents(lambda _version, _bridge_ids: _tile_set.sync(store))
+    return _tile_set
@@ -0,0 +1,232 @@
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from .bridge_store import get_bridge_store
+from .geofence import height_class_for
+
+INCIDENT_DB_PATH = os.getenv(
+    "INCIDENT_DB_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "incidents.db")
+)
+
+# Rollup scopes: every incident is counted once per scope under its key
+SCOPES = ("all", "bridge", "region", "vehicle_class")
+# Month bucket holding all-time totals
+ALL_TIME = "all"
+SEVERE_LEVELS = {"severe", "catastrophic"}
+# Coarse grid used as the region when a report doesn't name one
+REGION_GRID_DEGREES = 1.0
+
+Rollup = Dict[str, List[int]]  # month -> [strikes, severe strikes]
+
+def month_of(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m")
+
+def previous_months(month: str, count: int) -> List[str]:
+    """The count months ending at month, oldest first ("YYYY-MM")"""
+    year, mon = int(month[:4]), int(month[5:])
+    months = []
+    for _ in range(count):
+        months.append(f"{year:04d}-{mon:02d}")
+        year, mon = (year, mon - 1) if mon > 1 else (year - 1, 12)
+    return months[::-1]
+
+def region_for(latitude: Optional[float], longitude: Optional[float]) -> str:
+    if latitude is None or longitude is None:
+        return "unknown"
+    return f"grid:{math.floor(latitude / REGION_GRID_DEGREES)},{math.floor(longitude / REGION_GRID_DEGREES)}"
+
+def vehicle_class_for(height_inches: Optional[float]) -> str:
+    if not height_inches:
+        return "unknown"
+    try:
+        return height_class_for(height_inches)
+    except ValueError:
+        return "oversize"
+
+class IncidentStore:
+    """
+    SQLite store of bridge strike incidents with rollups kept current on insert
+
+    Each insert bumps its per-bridge, per-region and per-vehicle-class counters
+    (monthly and all-time) in the same transaction. The rollup table is mirrored
+    in memory, so dashboard reads never touch incident history.
+    """
+
+    def __init__(self, db_path: str = INCIDENT_DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS incidents (
+                incident_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                bridge_id TEXT,
+                region TEXT NOT NULL,
+                vehicle_class TEXT NOT NULL,
+                vehicle_height_inches REAL,
+                bridge_clearance_inches REAL,
+                severity TEXT,
+                latitude REAL,
+                longitude REAL,
+                occurred_at REAL NOT NULL,
+                analysis TEXT,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS rollups (
+                scope TEXT NOT NULL,
+                key TEXT NOT NULL,
+                month TEXT NOT NULL,
+                strikes INTEGER NOT NULL,
+                severe INTEGER NOT NULL,
+                PRIMARY KEY (scope, key, month)
+            );
+        """)
+        self._conn.commit()
+        # (scope, key) -> month -> [strikes, severe]
+        self._rollups: Dict[Tuple[str, str], Rollup] = {}
+        for scope, key, month, strikes, severe in self._conn.execute("SELECT * FROM rollups"):
+            self._rollups.setdefault((scope, key), {})[month] = [strikes, severe]
+        # Bridge sorting, filters and tile flags count these on top of bridges.csv
+        get_bridge_store().set_recorded_incidents({
+            key: rollup[ALL_TIME][0] for (scope, key), rollup in self._rollups.items()
+            if scope == "bridge" and ALL_TIME in rollup
+        })
+
+    def record(
+        self,
+        bridge_id: Optional[str] = None,
+        vehicle_height_inches: Optional[float] = None,
+        bridge_clearance_inches: Optional[float] = None,
+        severity: Optional[str] = None,
+        region: Optional[str] = None,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        occurred_at: Optional[float] = None,
+        analysis: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Persist an incident and update its rollups
+        Location and clearance default to the bridge record when the bridge is known.
+        """
+        bridge = get_bridge_store().get(bridge_id) if bridge_id else None
+        if bridge:
+            latitude = bridge["latitude"] if latitude is None else latitude
+            longitude = bridge["longitude"] if longitude is None else longitude
+            bridge_clearance_inches = bridge_clearance_inches or bridge["clearance_inches"]
+        now = time.time()
+        occurred_at = occurred_at or now
+        severity = (severity or "").strip().lower() or None
+        incident = {
+            "bridge_id": bridge_id,
+            "region": region or region_for(latitude, longitude),
+            "vehicle_class": vehicle_class_for(vehicle_height_inches),
+            "vehicle_height_inches": vehicle_height_inches,
+            "bridge_clearance_inches": bridge_clearance_inches,
+            "severity": severity,
+            "latitude": latitude,
+            "longitude": longitude,
+            "occurred_at": occurred_at
+        }
+
+        keys = [("all", ""), ("region", incident["region"]), ("vehicle_class", incident["vehicle_class"])]
+        if bridge_id:
+            keys.append(("bridge", bridge_id))
+        severe = int(severity in SEVERE_LEVELS)
+        month = month_of(occurred_at)
+
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO incidents (bridge_id, region, vehicle_class, vehicle_height_inches, "
+                "bridge_clearance_inches, severity, latitude, longitude, occurred_at, analysis, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (*incident.values(), json.dumps(analysis) if analysis else None, now)
+            )
+            self._conn.executemany(
+                "INSERT INTO rollups (scope, key, month, strikes, severe) VALUES (?, ?, ?, 1, ?) "
+                "ON CONFLICT (scope, key, month) DO UPDATE SET strikes = strikes + 1, severe = severe + excluded.severe",
+                [(scope, key, bucket, severe) for scope, key in keys for bucket in (month, ALL_TIME)]
+            )
+            self._conn.commit()
+            for scope_key in keys:
+                rollup = self._rollups.setdefault(scope_key, {})
+                for bucket in (month, ALL_TIME):
+                    counts = rollup.setdefault(bucket, [0, 0])
+                    counts[0] += 1
+                    counts[1] += severe
+            if bridge_id:
+                # Under the lock so concurrent records can't publish counts out of order
+                get_bridge_store().set_recorded_incidents({bridge_id: self._rollups[("bridge", bridge_id)][ALL_TIME][0]})
+        incident["incident_id"] = cursor.lastrowid
+        return incident
+
+    def rollup(self, scope: str, key: str = "", months: int = 6, until: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Totals and monthly strike trend for one scope key, from the precomputed rollups
+        Trend covers the `months` months ending at `until` (default: this month).
+        """
+        if scope not in SCOPES:
+            raise ValueError(f"Unknown scope '{scope}'. Options: {', '.join(SCOPES)}")
+        with self._lock:
+            rollup = {month: list(counts) for month, counts in self._rollups.get((scope, key), {}).items()}
+        strikes, severe = rollup.get(ALL_TIME, [0, 0])
+        trend = [
+            {"month": month, "strikes": rollup.get(month, [0, 0])[0], "severe": rollup.get(month, [0, 0])[1]}
+            for month in previous_months(until or month_of(time.time()), months)
+        ]
+        result = {
+            "scope": scope,
+            "key": key,
+            "strikes": strikes,
+            "severe": severe,
+            "trend": trend,
+            "trend_change": None
+        }
+        if len(trend) >= 2 and trend[-2]["strikes"]:
+            result["trend_change"] = round(trend[-1]["strikes"] / trend[-2]["strikes"] - 1, 3)
+        if scope == "bridge":
+            # Strikes recorded here on top of the historical count in bridges.csv
+            bridge = get_bridge_store().get(key) or {}
+            result["historical_incidents"] = bridge.get("incident_count", 0)
+            result["total_incidents"] = result["historical_incidents"] + strikes
+        return result
+
+    def breakdown(self, scope: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Keys of a scope with their all-time counts, most strikes first"""
+        with self._lock:
+            rows = [
+                {"key": key, "strikes": rollup[ALL_TIME][0], "severe": rollup[ALL_TIME][1]}
+                for (row_scope, key), rollup in self._rollups.items()
+                if row_scope == scope and ALL_TIME in rollup
+            ]
+        rows.sort(key=lambda row: (-row["strikes"], row["key"]))
+        return rows[:limit]
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Latest incidents, newest first"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT incident_id, bridge_id, region, vehicle_class, vehicle_height_inches, "
+                "bridge_clearance_inches, severity, latitude, longitude, occurred_at "
+                "FROM incidents ORDER BY incident_id DESC LIMIT ?", (limit,)
+            )
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+# Singleton instance
+_incident_store: Optional[IncidentStore] = None
+_store_lock = threading.Lock()
+
+def get_incident_store() -> IncidentStore:
+    """Get or create the incident store"""
+    global _incident_store
+    with _store_lock:
+        if _incident_store is None:
+            _incident_store = IncidentStore()
+    return _incident_store
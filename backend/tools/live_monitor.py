@@ -0,0 +1,169 @@
+from typing import Dict, Any, List, Optional
+from .geo import haversine_miles, bearing_degrees, heading_difference, bounding_box
+from .bridge_store import BridgeStore
+
+# Less than 6 inches of margin = dangerous (same rule as the frontend useAlertLevel hook)
+DANGER_MARGIN_INCHES = 6
+
+# (max distance in miles, level) - checked in order, closest first
+ALERT_DISTANCES = [
+    (0.1, "emergency"),
+    (0.25, "critical"),
+    (1.0, "warning"),
+    (2.0, "info"),
+]
+ALERT_RADIUS_MILES = ALERT_DISTANCES[-1][0]
+
+# Bridges inside this radius are kept on the watch list; the list is only
+# rebuilt once the vehicle has moved WATCH_REFRESH_MILES from where it was built
+WATCH_RADIUS_MILES = 5.0
+WATCH_REFRESH_MILES = WATCH_RADIUS_MILES - ALERT_RADIUS_MILES
+
+# Bridges within this angle of the heading count as "ahead"
+AHEAD_ANGLE_DEGREES = 90
+# Ignore GPS jitter smaller than this when deriving heading from consecutive fixes
+MIN_HEADING_MOVE_MILES = 0.005
+
+def format_clearance(inches: int) -> str:
+    """Format inches as feet/inches, e.g. 126 -> 10'6\""""
+    return f"{inches // 12}'{inches % 12}\""
+
+class ProximitySession:
+    """
+    Server-side proximity alerting for one live-monitoring session
+
+    Dangerous bridges are filtered for the session's vehicle height, and
+    filtered again whenever the store's records change mid-session.
+    Each GPS fix only evaluates a small watch list of nearby bridges ahead
+    of the vehicle; update() returns an alert only when the level changes.
+    """
+
+    def __init__(self, vehicle_height_inches: int, store: BridgeStore):
+        self.vehicle_height_inches = vehicle_height_inches
+        self.store = store
+        self.dangerous_bridges: List[Dict[str, Any]] = []
+        self._records_version: Optional[int] = None
+        self.level = "none"
+        self.heading: Optional[float] = None
+        self._last_fix: Optional[tuple] = None
+        self._watch_anchor: Optional[tuple] = None
+        self._watch_list: List[Dict[str, Any]] = []
+        self.fixes_processed = 0
+        self.watch_refreshes = 0
+        self._sync_bridges()
+
+    def _sync_bridges(self) -> None:
+        """Re-filter dangerous bridges if the store was reloaded or edited since the last fix"""
+        if self._records_version == self.store.records_version:
+            return
+        self._records_version = self.store.records_version
+        self.dangerous_bridges = [
+            b for b in self.store.all()
+            if b["clearance_inches"] - self.vehicle_height_inches < DANGER_MARGIN_INCHES
+        ]
+        self._watch_anchor = None
+
+    def _refresh_watch_list(self, lat: float, lon: float) -> None:
+        """Rebuild the watch list around the current position"""
+        min_lat, min_lon, max_lat, max_lon = bounding_box(lat, lon, WATCH_RADIUS_MILES)
+        self._watch_list = [
+            b for b in self.dangerous_bridges
+            if min_lat <= b["latitude"] <= max_lat and min_lon <= b["longitude"] <= max_lon
+        ]
+        self._watch_anchor = (lat, lon)
+        self.watch_refreshes += 1
+
+    def _update_heading(self, lat: float, lon: float, heading: Optional[float]) -> None:
+        """Use the reported heading, or derive it from the previous fix"""
+        if heading is not None:
+            self.heading = heading % 360
+        elif self._last_fix is not None:
+            prev_lat, prev_lon = self._last_fix
+            if haversine_miles(prev_lat, prev_lon, lat, lon) >= MIN_HEADING_MOVE_MILES:
+                self.heading = bearing_degrees(prev_lat, prev_lon, lat, lon)
+        self._last_fix = (lat, lon)
+
+    def closest_bridge_ahead(self, lat: float, lon: float) -> Optional[Dict[str, Any]]:
+        """Closest watched dangerous bridge in front of the vehicle"""
+        closest = None
+        for bridge in self._watch_list:
+            distance = haversine_miles(lat, lon, bridge["latitude"], bridge["longitude"])
+            if closest is not None and distance >= closest["distance_miles"]:
+                continue
+            if self.heading is not None and distance > 0:
+                bearing = bearing_degrees(lat, lon, bridge["latitude"], bridge["longitude"])
+                if heading_difference(bearing, self.heading) > AHEAD_ANGLE_DEGREES:
+                    continue
+            closest = {"bridge": bridge, "distance_miles": distance}
+        return closest
+
+    def update(self, lat: float, lon: float, heading: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Process one GPS fix
+        Returns an alert event if the alert level changed, otherwise None
+        """
+        self.fixes_processed += 1
+        self._sync_bridges()
+        self._update_heading(lat, lon, heading)
+
+        if (self._watch_anchor is None or
+                haversine_miles(self._watch_anchor[0], self._watch_anchor[1], lat, lon) > WATCH_REFRESH_MILES):
+            self._refresh_watch_list(lat, lon)
+
+        closest = self.closest_bridge_ahead(lat, lon)
+        level = "none"
+        if closest is not None:
+            for max_distance, candidate in ALERT_DISTANCES:
+                if closest["distance_miles"] <= max_distance:
+                    level = candidate
+                    break
+
+        if level == self.level:
+            return None
+
+        previous_level = self.level
+        self.level = level
+        return ProximitySession._build_alert(level, previous_level, closest)
+
+    @staticmethod
+    def _build_alert(level: str, previous_level: str, closest: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Alert payload pushed to the client on a level transition"""
+        if level == "none" or closest is None:
+            return {
+                "type": "alert",
+                "level": "none",
+                "previous_level": previous_level,
+                "message": "All clear",
+                "bridge": None,
+                "distance_miles": None
+            }
+
+        bridge = closest["bridge"]
+        distance = closest["distance_miles"]
+        clearance = format_clearance(bridge["clearance_inches"])
+
+        if level == "emergency":
+            message = f"STOP! {bridge['name']} in {distance * 5280:.0f} feet!"
+        elif level == "critical":
+            message = f"CRITICAL: {bridge['name']} ahead - {clearance} clearance"
+        elif level == "warning":
+            message = f"WARNING: Low bridge in {distance:.1f} miles"
+        else:
+            message = f"Bridge ahead in {distance:.1f} miles - stay alert"
+
+        return {
+            "type": "alert",
+            "level": level,
+            "previous_level": previous_level,
+            "message": message,
+            "bridge": {
+                "bridge_id": bridge["bridge_id"],
+                "name": bridge["name"],
+                "latitude": bridge["latitude"],
+                "longitude": bridge["longitude"],
+                "clearance_inches": bridge["clearance_inches"],
+                "clearance_display": clearance,
+                "warnings": bridge["warnings"]
+            },
+            "distance_miles": round(distance, 3)
+        }
@@ -0,0 +1,231 @@
+import heapq
+import math
+import os
+from bisect import bisect_right
+from typing import Dict, List, Optional, Sequence, Tuple
+from .geo import bearing_degrees, haversine_miles
+
+# Encoded polyline precision: 5 for Google / Mapbox "polyline", 6 for "polyline6"
+DEFAULT_PRECISION = 5
+# Simplification tolerance in screen pixels at the requested zoom
+SIMPLIFY_TOLERANCE_PIXELS = float(os.getenv("SIMPLIFY_TOLERANCE_PIXELS", "1.0"))
+# Ground meters per pixel at zoom 0 on the equator (512 px tiles, as Mapbox GL renders)
+METERS_PER_PIXEL_Z0 = 78271.517
+METERS_PER_DEGREE_LAT = 110574.0
+METERS_PER_DEGREE_LON_EQUATOR = 111320.0
+SIMPLIFY_METHODS = ("douglas_peucker", "visvalingam")
+# Douglas-Peucker spans up to this many points are scanned in plain Python
+SMALL_SPAN = 64
+
+Point = Tuple[float, float]  # (lat, lon)
+
+def encode_polyline(points: Sequence[Point], precision: int = DEFAULT_PRECISION) -> str:
+    """Encoded polyline string for (lat, lon) points"""
+    factor = 10 ** precision
+    chars: List[str] = []
+    append = chars.append
+    last_lat = last_lon = 0
+    for lat, lon in points:
+        ilat, ilon = int(round(lat * factor)), int(round(lon * factor))
+        for delta in (ilat - last_lat, ilon - last_lon):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                append(chr((0x20 | (value & 0x1f)) + 63))
+                value >>= 5
+            append(chr(value + 63))
+        last_lat, last_lon = ilat, ilon
+    return "".join(chars)
+
+def decode_polyline(encoded: str, precision: int = DEFAULT_PRECISION) -> List[Point]:
+    """(lat, lon) points from an encoded polyline; raises ValueError if truncated or malformed"""
+    factor = 10 ** precision
+    points: List[Point] = []
+    coordinates = [0, 0]
+    index, length = 0, len(encoded)
+    while index < length:
+        for axis in (0, 1):
+            result = shift = 0
+            while True:
+                if index >= length:
+                    raise ValueError("Truncated polyline")
+                byte = ord(encoded[index]) - 63
+                index += 1
+                if not 0 <= byte < 64:
+                    raise ValueError(f"Invalid polyline character at {index - 1}")
+                result |= (byte & 0x1f) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            coordinates[axis] += ~(result >> 1) if result & 1 else result >> 1
+        points.append((coordinates[0] / factor, coordinates[1] / factor))
+    return points
+
+def tolerance_meters(zoom: float, latitude: float = 0.0, pixels: float = SIMPLIFY_TOLERANCE_PIXELS) -> float:
+    """Ground distance covered by `pixels` screen pixels at a zoom level and latitude"""
+    return pixels * METERS_PER_PIXEL_Z0 * math.cos(math.radians(latitude)) / (2 ** zoom)
+
+def _project(points: Sequence[Point]) -> Tuple[List[float], List[float]]:
+    """Local equirectangular x/y in meters, accurate enough for tolerance checks along one route"""
+    mid_lat = math.radians(sum(lat for lat, _ in points) / len(points))
+    scale = METERS_PER_DEGREE_LON_EQUATOR * math.cos(mid_lat)
+    return [lon * scale for _, lon in points], [lat * METERS_PER_DEGREE_LAT for lat, _ in points]
+
+def _numpy():
+    """numpy, imported on first simplification to keep it off the startup path"""
+    import numpy
+    return numpy
+
+def simplify_douglas_peucker(points: Sequence[Point], tolerance: float) -> List[Point]:
+    """
+    Douglas-Peucker: keep the points that deviate more than tolerance meters
+    from the chord of their span. Iterative (long routes can't hit the recursion
+    limit), with each span's distances computed as one numpy expression.
+    """
+    count = len(points)
+    if count < 3 or tolerance <= 0:
+        return list(points)
+    np = _numpy()
+    xs, ys = _project(points)
+    xs_array, ys_array = np.asarray(xs), np.asarray(ys)
+    keep = [False] * count
+    keep[0] = keep[-1] = True
+    tolerance_sq = tolerance * tolerance
+    stack = [(0, count - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        ax, ay = xs[first], ys[first]
+        dx, dy = xs[last] - ax, ys[last] - ay
+        length_sq = dx * dx + dy * dy
+        if last - first > SMALL_SPAN:
+            px, py = xs_array[first + 1:last] - ax, ys_array[first + 1:last] - ay
+            if length_sq:
+                t = np.clip((px * dx + py * dy) / length_sq, 0.0, 1.0)
+                px, py = px - t * dx, py - t * dy
+            distances_sq = px * px + py * py
+            worst = int(distances_sq.argmax())
+            worst_sq, worst = distances_sq[worst], worst + first + 1
+        else:
+            # numpy call overhead beats the arithmetic on short spans
+            worst_sq, worst = -1.0, -1
+            for i in range(first + 1, last):
+                px, py = xs[i] - ax, ys[i] - ay
+                if length_sq:
+                    t = max(0.0, min(1.0, (px * dx + py * dy) / length_sq))
+                    px, py = px - t * dx, py - t * dy
+                if px * px + py * py > worst_sq:
+                    worst_sq, worst = px * px + py * py, i
+        if worst_sq > tolerance_sq:
+            keep[worst] = True
+            stack.append((first, worst))
+            stack.append((worst, last))
+    return [point for point, kept in zip(points, keep) if kept]
+
+def simplify_visvalingam(points: Sequence[Point], tolerance: float) -> List[Point]:
+    """
+    Visvalingam-Whyatt: repeatedly drop the point whose triangle with its
+    neighbours has the smallest area, until every remaining one exceeds tolerance^2
+    Smoother than Douglas-Peucker at low zooms, where it keeps the overall shape.
+    """
+    count = len(points)
+    if count < 3 or tolerance <= 0:
+        return list(points)
+    xs, ys = _project(points)
+    previous = list(range(-1, count - 1))
+    following = list(range(1, count + 1))
+    removed = [False] * count
+
+    def area(i: int) -> float:
+        a, c = previous[i], following[i]
+        return abs((xs[a] - xs[i]) * (ys[c] - ys[i]) - (xs[c] - xs[i]) * (ys[a] - ys[i])) / 2
+
+    heap = [(area(i), i) for i in range(1, count - 1)]
+    heapq.heapify(heap)
+    current = {i: value for value, i in heap}
+    threshold = tolerance * tolerance
+    while heap:
+        value, i = heapq.heappop(heap)
+        if removed[i] or current[i] != value:
+            continue  # stale entry from before a neighbour was removed
+        if value > threshold:
+            break
+        removed[i] = True
+        a, c = previous[i], following[i]
+        following[a], previous[c] = c, a
+        for neighbour in (a, c):
+            if 0 < neighbour < count - 1:
+                current[neighbour] = area(neighbour)
+                heapq.heappush(heap, (current[neighbour], neighbour))
+    return [point for point, gone in zip(points, removed) if not gone]
+
+def simplify(points: Sequence[Point], zoom: float, method: str = "douglas_peucker") -> List[Point]:
+    """Simplify a route for display at a zoom level (sub-pixel detail is dropped)"""
+    if method not in SIMPLIFY_METHODS:
+        raise ValueError(f"Unknown simplification '{method}'. Options: {', '.join(SIMPLIFY_METHODS)}")
+    if len(points) < 3:
+        return list(points)
+    latitude = sum(lat for lat, _ in points) / len(points)
+    tolerance = tolerance_meters(zoom, latitude)
+    if method == "visvalingam":
+        return simplify_visvalingam(points, tolerance)
+    return simplify_douglas_peucker(points, tolerance)
+
+class RouteGeometry:
+    """
+    A route polyline with precomputed cumulative distances
+
+    Distance-along-route lookups are a binary search over the cumulative
+    array plus interpolation inside one segment. Simplified and encoded forms
+    are cached per (zoom, method).
+    """
+
+    def __init__(self, points: Sequence[Point]):
+        if len(points) < 2:
+            raise ValueError("A route needs at least two points")
+        self.points: List[Point] = [(float(lat), float(lon)) for lat, lon in points]
+        self.cumulative_miles: List[float] = [0.0]
+        total = 0.0
+        for (lat1, lon1), (lat2, lon2) in zip(self.points, self.points[1:]):
+            total += haversine_miles(lat1, lon1, lat2, lon2)
+            self.cumulative_miles.append(total)
+        self._simplified: Dict[Tuple[float, str], List[Point]] = {}
+
+    @classmethod
+    def from_polyline(cls, encoded: str, precision: int = DEFAULT_PRECISION) -> "RouteGeometry":
+        return cls(decode_polyline(encoded, precision))
+
+    @property
+    def length_miles(self) -> float:
+        return self.cumulative_miles[-1]
+
+    def segment_at(self, miles: float) -> Tuple[int, float]:
+        """(segment index, fraction along it) for a distance from the start, clamped to the route"""
+        miles = max(0.0, min(miles, self.length_miles))
+        segment = min(bisect_right(self.cumulative_miles, miles) - 1, len(self.points) - 2)
+        length = self.cumulative_miles[segment + 1] - self.cumulative_miles[segment]
+        return segment, (miles - self.cumulative_miles[segment]) / length if length else 0.0
+
+    def position_at(self, miles: float) -> Dict[str, float]:
+        """Interpolated position and heading at a distance along the route"""
+        segment, t = self.segment_at(miles)
+        (lat1, lon1), (lat2, lon2) = self.points[segment], self.points[segment + 1]
+        return {
+            "latitude": lat1 + (lat2 - lat1) * t,
+            "longitude": lon1 + (lon2 - lon1) * t,
+            "heading": bearing_degrees(lat1, lon1, lat2, lon2),
+            "miles": max(0.0, min(miles, self.length_miles))
+        }
+
+    def simplified(self, zoom: Optional[float] = None, method: str = "douglas_peucker") -> List[Point]:
+        """Points for display at a zoom level; the full geometry when zoom is None"""
+        if zoom is None:
+            return self.points
+        key = (zoom, method)
+        if key not in self._simplified:
+            self._simplified[key] = simplify(self.points, zoom, method)
+        return self._simplified[key]
+
+    def encoded(self, zoom: Optional[float] = None, method: str = "douglas_peucker",
+                precision: int = DEFAULT_PRECISION) -> str:
+        return encode_polyline(self.simplified(zoom, method), precision)
@@ -0,0 +1,247 @@
+import math
+import os
+import time
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+from .bridge_query import get_bridge_index
+from .external_tools import ExternalTools, clearance_impact
+from .geo import MILES_PER_DEGREE_LAT, bounding_box
+from .route_geometry import RouteGeometry
+from services.tracing import traced
+
+# Average truck speed used to time-stamp the route when no schedule is given
+ROUTE_SPEED_MPH = float(os.getenv("ROUTE_SPEED_MPH", "50"))
+# Travel time between sampled waypoints
+ROUTE_SAMPLE_MINUTES = float(os.getenv("ROUTE_SAMPLE_MINUTES", "15"))
+# Weather is treated as uniform inside one cell; each cell is one forecast call
+WEATHER_CELL_DEGREES = float(os.getenv("WEATHER_CELL_DEGREES", "0.5"))
+# Upper bound on forecast calls per route: long routes get coarser cells instead of more calls
+MAX_WEATHER_CELLS = int(os.getenv("MAX_WEATHER_CELLS", "12"))
+WEATHER_FETCH_CONCURRENCY = int(os.getenv("WEATHER_FETCH_CONCURRENCY", "6"))
+# Bridges this close to the route are on it
+ROUTE_CORRIDOR_MILES = float(os.getenv("ROUTE_CORRIDOR_MILES", "0.25"))
+# Route segments are searched for bridges in chunks of this many, one grid lookup per chunk
+CORRIDOR_CHUNK_SEGMENTS = 32
+
+Point = Tuple[float, float]
+Route = Union[Sequence[Point], RouteGeometry]
+CellKey = Tuple[int, int]
+Forecast = List[Dict[str, Any]]
+
+def _geometry(route: Route) -> RouteGeometry:
+    return route if isinstance(route, RouteGeometry) else RouteGeometry(route)
+
+def sample_route(
+    route: Route,
+    departure_time: float,
+    speed_mph: float = ROUTE_SPEED_MPH,
+    sample_minutes: float = ROUTE_SAMPLE_MINUTES
+) -> List[Dict[str, Any]]:
+    """
+    Time-stamped waypoints every sample_minutes of driving along a (lat, lon) polyline
+    Always includes the start and the end of the route.
+    """
+    if speed_mph <= 0:
+        raise ValueError("Speed must be positive")
+    geometry = _geometry(route)
+    step_miles = speed_mph * sample_minutes / 60
+    marks = [i * step_miles for i in range(int(geometry.length_miles / step_miles) + 1)]
+    if geometry.length_miles > marks[-1]:
+        marks.append(geometry.length_miles)
+    waypoints = []
+    for miles in marks:
+        position = geometry.position_at(miles)
+        waypoints.append({
+            "latitude": position["latitude"],
+            "longitude": position["longitude"],
+            "miles": round(miles, 2),
+            "eta": departure_time + miles / speed_mph * 3600
+        })
+    return waypoints
+
+def _cell_key(lat: float, lon: float, size: float) -> CellKey:
+    return (math.floor(lat / size), math.floor(lon / size))
+
+def _cell_center(key: CellKey, size: float) -> Point:
+    return ((key[0] + 0.5) * size, (key[1] + 0.5) * size)
+
+def weather_cells(waypoints: List[Dict[str, Any]], max_cells: int = MAX_WEATHER_CELLS) -> Tuple[float, List[CellKey]]:
+    """
+    (cell size in degrees, unique cells in route order) for the waypoints
+    Cells double in size until the route fits in max_cells.
+    """
+    size = WEATHER_CELL_DEGREES
+    while True:
+        cells = list(dict.fromkeys(_cell_key(w["latitude"], w["longitude"], size) for w in waypoints))
+        if len(cells) <= max_cells:
+            return size, cells
+        size *= 2
+
+def fetch_forecasts(
+    cells: List[CellKey],
+    size: float,
+    fetch: Callable[[float, float], Dict[str, Any]] = ExternalTools.get_weather_forecast,
+    concurrency: int = WEATHER_FETCH_CONCURRENCY
+) -> Dict[CellKey, Optional[Forecast]]:
+    """Forecast steps (sorted by time) for every cell, fetched concurrently; None if a fetch failed"""
+    def fetch_cell(key: CellKey) -> Optional[Forecast]:
+        try:
+            result = fetch(*_cell_center(key, size))
+        except Exception as e:
+            print(f"Forecast fetch failed for cell {key}: {e}")
+            return None
+        steps = [s for s in result.get("steps", []) if s.get("time") is not None] if result.get("success") else []
+        return sorted(steps, key=lambda s: s["time"]) or None
+
+    if not cells:
+        return {}
+    # One context copy per cell so each fetch is traced under the caller's span
+    contexts = [copy_context() for _ in cells]
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(cells)))) as pool:
+        return dict(zip(cells, pool.map(lambda context, key: context.run(fetch_cell, key), contexts, cells)))
+
+def conditions_at(steps: Optional[Forecast], when: float) -> Dict[str, Any]:
+    """
+    Weather and clearance impact at a time, interpolated between forecast steps
+    Temperature is linear between the two steps around the time; the impact is
+    the worse of the two steps' conditions at that temperature.
+    """
+    if not steps:
+        return {"temperature": None, "condition": None, "clearance_impact_inches": 0,
+                "warnings": ["No forecast available for this stretch of the route"]}
+    times = [s["time"] for s in steps]
+    after = min(bisect_right(times, when), len(steps) - 1)
+    before = max(after - 1, 0)
+    a, b = steps[before], steps[after]
+    if b["time"] > a["time"] and a["time"] <= when <= b["time"]:
+        fraction = (when - a["time"]) / (b["time"] - a["time"])
+    else:
+        # Outside the forecast window: hold the nearest step
+        a = b = a if abs(when - a["time"]) <= abs(when - b["time"]) else b
+        fraction = 0.0
+    temperature = a["temperature"] + (b["temperature"] - a["temperature"]) * fraction
+    impact_a, warnings_a = clearance_impact(a.get("condition"), temperature)
+    impact_b, warnings_b = clearance_impact(b.get("condition"), temperature)
+    worse = a if impact_a <= impact_b else b
+    return {
+        "temperature": round(temperature, 1),
+        "condition": worse.get("condition"),
+        "clearance_impact_inches": min(impact_a, impact_b),
+        "warnings": warnings_a if impact_a <= impact_b else warnings_b
+    }
+
+def _project(lat: float, lon: float, start: Point, end: Point) -> Tuple[float, float]:
+    """(fraction along the segment, distance in miles) of a point's projection onto it"""
+    scale = MILES_PER_DEGREE_LAT * math.cos(math.radians(start[0]))
+    dx, dy = (end[1] - start[1]) * scale, (end[0] - start[0]) * MILES_PER_DEGREE_LAT
+    px, py = (lon - start[1]) * scale, (lat - start[0]) * MILES_PER_DEGREE_LAT
+    length_sq = dx * dx + dy * dy
+    t = max(0.0, min(1.0, (px * dx + py * dy) / length_sq)) if length_sq else 0.0
+    return t, math.hypot(px - t * dx, py - t * dy)
+
+def bridges_on_route(route: Route, corridor_miles: float = ROUTE_CORRIDOR_MILES) -> List[Dict[str, Any]]:
+    """
+    Bridges within corridor_miles of the polyline, in driving order
+    Each is a copy with miles_along_route and offset_miles added.
+    """
+    geometry = _geometry(route)
+    points, cumulative = geometry.points, geometry.cumulative_miles
+    index = get_bridge_index()
+    best: Dict[str, Tuple[float, float, Dict[str, Any]]] = {}
+    for chunk_start in range(0, len(points) - 1, CORRIDOR_CHUNK_SEGMENTS):
+        chunk = points[chunk_start:chunk_start + CORRIDOR_CHUNK_SEGMENTS + 1]
+        lo = bounding_box(min(p[0] for p in chunk), min(p[1] for p in chunk), corridor_miles)
+        hi = bounding_box(max(p[0] for p in chunk), max(p[1] for p in chunk), corridor_miles)
+        candidates = index.within((lo[0], lo[1], hi[2], hi[3]))
+        if not candidates:
+            continue
+        for segment in range(chunk_start, chunk_start + len(chunk) - 1):
+            start, end = points[segment], points[segment + 1]
+            length = cumulative[segment + 1] - cumulative[segment]
+            for bridge in candidates:
+                t, offset = _project(bridge["latitude"], bridge["longitude"], start, end)
+                if offset <= corridor_miles and (bridge["bridge_id"] not in best or offset < best[bridge["bridge_id"]][1]):
+                    best[bridge["bridge_id"]] = (cumulative[segment] + t * length, offset, bridge)
+    return [
+        {**bridge, "miles_along_route": round(miles, 2), "offset_miles": round(offset, 3)}
+        for miles, offset, bridge in sorted(best.values(), key=lambda entry: entry[0])
+    ]
+
+@traced("tool")
+def route_weather(
+    route: Route,
+    departure_time: Optional[float] = None,
+    speed_mph: float = ROUTE_SPEED_MPH,
+    bridges: Optional[List[Dict[str, Any]]] = None,
+    corridor_miles: float = ROUTE_CORRIDOR_MILES,
+    fetch: Callable[[float, float], Dict[str, Any]] = ExternalTools.get_weather_forecast
+) -> Dict[str, Any]:
+    """
+    Weather along a route at the time the truck gets there, and the clearance
+    adjustment at each bridge it passes
+
+    The route is sampled into time-stamped waypoints, the waypoints are
+    deduplicated into weather cells, and each cell's forecast is fetched once,
+    concurrently. Bridges (default: those on the route from the bridge store)
+    look up their own cell, or the nearest fetched one, at their arrival time,
+    so the number of forecast calls depends on the route, never on the bridges.
+    """
+    departure_time = time.time() if departure_time is None else departure_time
+    geometry = _geometry(route)
+    waypoints = sample_route(geometry, departure_time, speed_mph)
+    size, cells = weather_cells(waypoints)
+    fetch_start = time.time()
+    forecasts = fetch_forecasts(cells, size, fetch)
+    fetch_seconds = time.time() - fetch_start
+    centers = {key: _cell_center(key, size) for key in cells}
+
+    def forecast_for(lat: float, lon: float) -> Optional[Forecast]:
+        key = _cell_key(lat, lon, size)
+        if key not in forecasts:
+            key = min(centers, key=lambda k: (centers[k][0] - lat) ** 2 + (centers[k][1] - lon) ** 2)
+        return forecasts[key]
+
+    warnings: List[str] = []
+    for waypoint in waypoints:
+        weather = conditions_at(forecast_for(waypoint["latitude"], waypoint["longitude"]), waypoint["eta"])
+        warnings.extend(weather.pop("warnings"))
+        waypoint.update(weather)
+
+    if bridges is None:
+        bridges = bridges_on_route(geometry, corridor_miles)
+    bridge_weather = []
+    for bridge in bridges:
+        miles = bridge.get("miles_along_route", 0.0)
+        eta = departure_time + miles / speed_mph * 3600
+        weather = conditions_at(forecast_for(bridge["latitude"], bridge["longitude"]), eta)
+        warnings.extend(f"{bridge.get('name', 'Bridge')}: {w}" for w in weather.pop("warnings"))
+        entry = {
+            "bridge_id": bridge.get("bridge_id"),
+            "name": bridge.get("name"),
+            "latitude": bridge["latitude"],
+            "longitude": bridge["longitude"],
+            "miles_along_route": miles,
+            "eta": eta,
+            **weather
+        }
+        if bridge.get("clearance_inches") is not None:
+            entry["clearance_inches"] = bridge["clearance_inches"]
+            entry["effective_clearance_inches"] = bridge["clearance_inches"] + weather["clearance_impact_inches"]
+        bridge_weather.append(entry)
+
+    impacts = [w["clearance_impact_inches"] for w in waypoints] + [b["clearance_impact_inches"] for b in bridge_weather]
+    return {
+        "success": True,
+        "departure_time": departure_time,
+        "distance_miles": waypoints[-1]["miles"],
+        "duration_hours": round(waypoints[-1]["miles"] / speed_mph, 2),
+        "clearance_impact_inches": min(impacts),
+        "warnings": list(dict.fromkeys(warnings)),
+        "waypoints": waypoints,
+        "bridges": bridge_weather,
+        "cell_degrees": size,
+        "upstream_calls": len(cells),
+        "fetch_seconds": round(fetch_seconds, 3)
+    }
@@ -0,0 +1,269 @@
+import json
+import os
+import re
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, Any, List, Iterable, Optional, Set
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+DEFAULT_CATALOG_PATHS = [os.path.join(DATA_DIR, "vehicles.json")]
+
+# Minimum score (0-1) for a catalog entry to count as a match
+MIN_MATCH_SCORE = 0.65
+# Vehicle class words: sharing only these ("semi truck" vs "box truck") is not a match
+GENERIC_TOKENS = {"truck", "trucks", "van", "vans", "bus", "trailer"}
+# Only the rarest query terms are used to gather candidates
+CANDIDATE_TERMS = 8
+# Terms found in more than this fraction of entries don't help pick candidates
+COMMON_TERM_FRACTION = 0.25
+# Only the entries hit by the most of those terms are scored
+MAX_CANDIDATES = 32
+# Source files are re-checked for changes at most this often (seconds)
+RELOAD_CHECK_INTERVAL = 5.0
+LOOKUP_CACHE_SIZE = 1024
+
+_TOKEN_RE = re.compile(r"[a-z]+|\d+")
+
+def tokenize(text: str) -> Set[str]:
+    """Lowercase word/number tokens ("U-Haul 15ft" -> {"u", "haul", "15", "ft"})"""
+    return set(_TOKEN_RE.findall(text.lower()))
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of each token (tokens shorter than 3 chars are kept whole)"""
+    grams = set()
+    for token in _TOKEN_RE.findall(text.lower()):
+        if len(token) < 3:
+            grams.add(token)
+        else:
+            grams.update(token[i:i + 3] for i in range(len(token) - 2))
+    return grams
+
+def query_trigrams(text: str) -> Set[str]:
+    """
+    Query-side trigrams: per-token trigrams plus trigrams of the run-together
+    text, so "uhaul" in a query still matches "U-Haul" in the catalog
+    """
+    compact = "".join(_TOKEN_RE.findall(text.lower()))
+    return trigrams(text) | {compact[i:i + 3] for i in range(len(compact) - 2)}
+
+def catalog_paths_from_env() -> List[str]:
+    """Default catalog plus any extra files listed in VEHICLE_CATALOG_PATHS"""
+    extra = os.getenv("VEHICLE_CATALOG_PATHS", "")
+    return DEFAULT_CATALOG_PATHS + [p for p in extra.split(os.pathsep) if p]
+
+class VehicleIndex:
+    """
+    Vehicle specification index with ranked fuzzy matching
+
+    Entries come from JSON catalog files (a list of objects) or JSONL files
+    (one object per line) in the data/vehicles.json format. Lookups gather
+    candidates from a token + trigram inverted index and rank them by how
+    much of each entry's name, vehicle_id or aliases is covered by the query.
+    """
+
+    def __init__(self, paths: Optional[List[str]] = None):
+        self.paths = list(paths) if paths is not None else catalog_paths_from_env()
+        self._entries: List[Dict[str, Any]] = []
+        self._file_entries: List[Dict[str, Any]] = []
+        self._added: Dict[str, Dict[str, Any]] = {}
+        self._entry_phrases: List[List[tuple]] = []
+        self._postings: Dict[str, List[int]] = {}
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._mtimes: Dict[str, float] = {}
+        self._last_reload_check = 0.0
+        self.load()
+
+    # ----- loading -----
+
+    @staticmethod
+    def read_catalog(path: str) -> List[Dict[str, Any]]:
+        """Read one catalog file (.json list or .jsonl)"""
+        with open(path, encoding="utf-8") as f:
+            if path.endswith(".jsonl"):
+                return [json.loads(line) for line in f if line.strip()]
+            return json.load(f)
+
+    def load(self) -> None:
+        """(Re)build the index from all catalog files"""
+        entries = []
+        mtimes = {}
+        for path in self.paths:
+            if not os.path.exists(path):
+                print(f"Vehicle catalog not found: {path}")
+                continue
+            mtimes[path] = os.path.getmtime(path)
+            entries.extend(VehicleIndex.read_catalog(path))
+        self._mtimes = mtimes
+        self._file_entries = entries
+        self._rebuild()
+
+    def add_entries(self, entries: Iterable[Dict[str, Any]]) -> int:
+        """
+        Bulk-add catalog entries in one index rebuild
+        Added entries survive hot reloads and replace file entries with the same vehicle_id
+        """
+        batch = {entry["vehicle_id"]: entry for entry in entries}
+        self._added.update(batch)
+        self._rebuild()
+        return len(batch)
+
+    def reload_if_changed(self) -> bool:
+        """Reload when any catalog file was modified; returns True if reloaded"""
+        self._last_reload_check = time.monotonic()
+        for path in self.paths:
+            mtime = os.path.getmtime(path) if os.path.exists(path) else None
+            if mtime != self._mtimes.get(path):
+                self.load()
+                return True
+        return False
+
+    @staticmethod
+    def _phrases(entry: Dict[str, Any]) -> List[str]:
+        """Searchable phrases: display name, vehicle_id and any aliases"""
+        phrases = [entry.get("name", ""), entry.get("vehicle_id", "").replace("_", " ")]
+        return [p for p in phrases + entry.get("aliases", []) if p]
+
+    def _rebuild(self) -> None:
+        merged = {e["vehicle_id"]: e for e in self._file_entries}
+        merged.update(self._added)
+        entries = list(merged.values())
+        entry_phrases = []
+        postings: Dict[str, List[int]] = {}
+        for i, entry in enumerate(entries):
+            phrases = []
+            for phrase in VehicleIndex._phrases(entry):
+                tokens = tokenize(phrase)
+                # Specific (non-class) word -> its trigrams (none for words under 3 chars)
+                specific = {t: trigrams(t) if len(t) >= 3 else None for t in tokens - GENERIC_TOKENS}
+                phrases.append((tokens, trigrams(phrase), specific, trigrams(" ".join(specific))))
+            entry_phrases.append(phrases)
+            terms = set()
+            for tokens, grams, _, _ in phrases:
+                terms |= tokens | {"#" + g for g in grams}
+            for term in terms:
+                postings.setdefault(term, []).append(i)
+        self._entries = entries
+        self._entry_phrases = entry_phrases
+        self._postings = postings
+        self._cache.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """All indexed catalog entries"""
+        return list(self._entries)
+
+    # ----- lookup -----
+
+    def _score(self, i: int, query_tokens: Set[str], query_grams: Set[str]) -> tuple:
+        """
+        Best (score, specific words matched) over the entry's phrases
+        Score is the fraction of the phrase's tokens and trigrams found in the query.
+        A phrase only counts if the query shares one of its specific (non-class)
+        words, or most of their trigrams for run-together or misspelt queries.
+        A specific word is matched if it is a query token or all its trigrams are
+        in the query ("haul" in "uhaul").
+        """
+        score, matched = 0.0, 0
+        for tokens, grams, specific, specific_grams in self._entry_phrases[i]:
+            if specific and not specific.keys() & query_tokens and \
+                    len(specific_grams & query_grams) * 2 < len(specific_grams):
+                continue
+            token_cover = len(tokens & query_tokens) / len(tokens) if tokens else 0.0
+            gram_cover = len(grams & query_grams) / len(grams) if grams else 0.0
+            score = max(score, 0.5 * token_cover + 0.5 * gram_cover)
+            matched = max(matched, sum(
+                1 for token, token_grams in specific.items()
+                if token in query_tokens or (token_grams and token_grams <= query_grams)
+            ))
+        return score, matched
+
+    def search(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Ranked matches (entry + score) at or above MIN_MATCH_SCORE
+        Entries matching more of the query's specific words rank first, so a make
+        ("Penske box truck") beats a generic class alias; among those, the taller
+        vehicle ranks first (the cautious answer), then the higher score.
+        """
+        query_tokens = tokenize(query)
+        query_grams = query_trigrams(query)
+        # Whole tokens are the most selective terms; trigrams are only used
+        # to find candidates when no query token is in the index (typos, "uhaul")
+        postings = self._postings
+        terms = [t for t in query_tokens if t in postings]
+        if not terms:
+            terms = ["#" + g for g in query_grams if "#" + g in postings]
+        terms.sort(key=lambda t: len(postings[t]))
+        # Drop near-stopword terms ("ft", "truck") when rarer ones exist
+        common = max(len(self._entries) * COMMON_TERM_FRACTION, MAX_CANDIDATES)
+        terms = [t for t in terms if len(postings[t]) <= common] or terms[:1]
+
+        hits = Counter()
+        for term in terms[:CANDIDATE_TERMS]:
+            hits.update(postings[term])
+        if len(hits) > MAX_CANDIDATES:
+            # Keep entries within one term of the best hit count
+            threshold = max(hits.values()) - 1
+            candidates = [i for i, count in hits.items() if count >= threshold][:MAX_CANDIDATES * 2]
+        else:
+            candidates = list(hits)
+
+        scored = []
+        for i in candidates:
+            score, matched = self._score(i, query_tokens, query_grams)
+            if score >= MIN_MATCH_SCORE:
+                scored.append((matched, self._entries[i].get("base_height_inches") or 0, score, i))
+        scored.sort(reverse=True)
+        return [{"entry": self._entries[i], "score": round(score, 3)} for _, _, score, i in scored[:limit]]
+
+    def lookup(self, query: str) -> Dict[str, Any]:
+        """Best match in the lookup_vehicle_specs result format"""
+        if time.monotonic() - self._last_reload_check > RELOAD_CHECK_INTERVAL:
+            self.reload_if_changed()
+
+        key = query.strip().lower()
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+
+        matches = self.search(query, limit=1)
+        if matches:
+            entry = matches[0]["entry"]
+            mods = entry.get("typical_mods", [])
+            result = {
+                "success": True,
+                "found": True,
+                "vehicle_id": entry.get("vehicle_id"),
+                "vehicle_name": entry.get("name"),
+                "base_height_inches": entry.get("base_height_inches"),
+                "typical_mods": mods,
+                "typical_total_height_inches": entry.get("base_height_inches", 0) + sum(
+                    m.get("height_added", 0) for m in mods),
+                "match_score": matches[0]["score"],
+                "tool_used": "vehicle_database"
+            }
+        else:
+            result = {
+                "success": True,
+                "found": False,
+                "vehicle_name": query,
+                "base_height_inches": None,
+                "typical_mods": [],
+                "tool_used": "vehicle_database"
+            }
+
+        self._cache[key] = result
+        if len(self._cache) > LOOKUP_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return result
+
+_index: Optional[VehicleIndex] = None
+
+def get_vehicle_index() -> VehicleIndex:
+    """Shared VehicleIndex, built on first use"""
+    global _index
+    if _index is None:
+        _index = VehicleIndex()
+    return _index
@@ -39,9 +39,9 @@ export function useGPSSimulation(route, isActive, speed = 60) {
 
     console.log('Starting simulation with route:', route.coordinates.length, 'points');
 
-    // Create a line from route coordinates
-    const line = turf.lineString(route.coordinates);
-    const totalDistance = turf.length(line, { units: 'miles' });
+    // Cumulative distance at each vertex, computed once; each tick is a binary search
+    const cumulativeMiles = route.cumulativeMiles || buildCumulativeMiles(route.coordinates);
+    const totalDistance = cumulativeMiles[cumulativeMiles.length - 1];
     
     console.log('Total route distance:', totalDistance, 'miles');
     
@@ -78,13 +78,9 @@ export function useGPSSimulation(route, isActive, speed = 60) {
         return;
       }
       
-      // Get point along the line
-      const alongLine = turf.along(line, currentDistance, { units: 'miles' });
-      const coords = alongLine.geometry.coordinates;
-      
-      // Calculate heading for vehicle rotation
-      const nextPoint = turf.along(line, currentDistance + 0.01, { units: 'miles' });
-      const heading = calculateHeading(coords, nextPoint.geometry.coordinates);
+      // Get point along the line; heading is the current segment's bearing
+      const { coords, segment } = positionAlong(route.coordinates, cumulativeMiles, currentDistance);
+      const heading = calculateHeading(route.coordinates[segment], route.coordinates[segment + 1]);
       
       const newPosition = {
         lat: coords[1],
@@ -129,6 +125,35 @@ export function useGPSSimulation(route, isActive, speed = 60) {
   };
 }
 
+// Distance in miles from the start of the route to each coordinate
+export function buildCumulativeMiles(coordinates) {
+  const cumulative = [0];
+  for (let i = 1; i < coordinates.length; i++) {
+    const step = turf.distance(coordinates[i - 1], coordinates[i], { units: 'miles' });
+    cumulative.push(cumulative[i - 1] + step);
+  }
+  return cumulative;
+}
+
+// Interpolated [lon, lat] at a distance along the route, by binary search over cumulative miles
+export function positionAlong(coordinates, cumulativeMiles, miles) {
+  let low = 0;
+  let high = cumulativeMiles.length - 2;
+  while (low < high) {
+    const mid = (low + high + 1) >> 1;
+    if (cumulativeMiles[mid] <= miles) {
+      low = mid;
+    } else {
+      high = mid - 1;
+    }
+  }
+  const length = cumulativeMiles[low + 1] - cumulativeMiles[low];
+  const t = length > 0 ? Math.min(Math.max((miles - cumulativeMiles[low]) / length, 0), 1) : 0;
+  const [lon1, lat1] = coordinates[low];
+  const [lon2, lat2] = coordinates[low + 1];
+  return { coords: [lon1 + (lon2 - lon1) * t, lat1 + (lat2 - lat1) * t], segment: low };
+}
+
 // Calculate heading between two points
 function calculateHeading(from, to) {
   const fromPoint = turf.point(from);
@@ -9,11 +9,13 @@ const api = axios.create({
   }
 });
 
-export const analyzeVehicleImage = async (imageFile) => {
+export const analyzeVehicleImage = async (imageFile, options = {}) => {
   const formData = new FormData();
   formData.append('file', imageFile);
   
+  // options: { profile: 'full' | 'fast', latency_slo_ms, vehicle_description, location }
   const response = await api.post('/analyze-vehicle', formData, {
+    params: options,
     headers: { 'Content-Type': 'multipart/form-data' }
   });
   
@@ -31,6 +33,19 @@ export const analyzeBridgeSign = async (imageFile) => {
   return response.data;
 };
 
+// Queue a .zip/.tar of survey sign photos; follow progress with watchJob(job_id, ...)
+export const submitBridgeSignBatch = async (archiveFile, options = {}) => {
+  const formData = new FormData();
+  formData.append('file', archiveFile);
+
+  const response = await api.post('/bridge-signs/batch', formData, {
+    headers: { 'Content-Type': 'multipart/form-data' },
+    params: options
+  });
+
+  return response.data;
+};
+
 export const checkClearance = async (data) => {
   const response = await api.post('/check-clearance', data);
   return response.data;
@@ -54,4 +69,78 @@ export const analyzeIncident = async (imageFile, vehicleHeight, bridgeClearance)
   return response.data;
 };
 
+// Tile URL template for map libraries; tiles hold only bridges dangerous for the height class
+export const hazardTileUrl = (heightClass) =>
+  `${API_BASE}/tiles/{z}/{x}/{y}?height_class=${encodeURIComponent(heightClass)}`;
+
+// One page of the bridge database; pass the previous page's next_cursor as params.cursor
+export const fetchBridges = async (params = {}) => {
+  const response = await api.get('/bridges', { params });
+  return response.data;
+};
+
+// Dashboard aggregates from the incident store's precomputed rollups
+export const fetchIncidentStats = async (months = 6) => {
+  const response = await api.get('/incidents/stats', { params: { months } });
+  return response.data;
+};
+
+export const openLiveMonitoring = (vehicleHeight, onMessage) => {
+  const wsBase = API_BASE.replace(/^http/, 'ws');
+  const socket = new WebSocket(`${wsBase}/ws/live-monitoring?vehicle_height_inches=${vehicleHeight}`);
+
+  socket.onmessage = (event) => onMessage(JSON.parse(event.data));
+
+  return {
+    sendFix: (position) => {
+      if (socket.readyState === WebSocket.OPEN) {
+        socket.send(JSON.stringify(position));
+      }
+    },
+    close: () => socket.close()
+  };
+};
+
+export const resumeVehicleAnalysis = async (runId) => {
+  const response = await api.post(`/runs/${runId}/resume`);
+  return response.data;
+};
+
+export const submitVehicleAnalysisJob = async (imageFile, options = {}) => {
+  const formData = new FormData();
+  formData.append('file', imageFile);
+
+  const response = await api.post('/jobs/analyze-vehicle', formData, {
+    headers: { 'Content-Type': 'multipart/form-data' },
+    params: options
+  });
+
+  return response.data;
+};
+
+export const simplifyRouteGeometry = async (coordinates, zoom = null) => {
+  // coordinates: [[lon, lat], ...] as returned by Mapbox Directions
+  const response = await api.post('/routes/geometry', { coordinates, zoom });
+  return response.data;
+};
+
+export const watchJob = (jobId, onUpdate) => {
+  const source = new EventSource(`${API_BASE}/jobs/${jobId}/events`);
+
+  ['queued', 'running', 'succeeded', 'failed'].forEach((status) => {
+    source.addEventListener(status, (event) => {
+      const job = JSON.parse(event.data);
+      onUpdate(job);
+      if (status === 'succeeded' || status === 'failed') {
+        source.close();
+      }
+    });
+  });
+  source.addEventListener('progress', (event) => {
+    onUpdate({ job_id: jobId, status: 'running', progress: JSON.parse(event.data) });
+  });
+
+  return () => source.close();
+};
+
 export default api;
\ No newline at end of file